@@ -1,13 +1,20 @@
 import asyncio
 import logging
+import multiprocessing
+import os
+import socket
 import uvicorn
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from src.connection.bluetooth_server import BluetoothConnection
+from src.connection.bluetooth_server import BluetoothConnection, DeviceManager
+from src.connection.shared_state import SharedStatePublisher, SharedStateMirror
+from src.connection.simulator import DeviceSimulator
 from src.connection.websocket_manager import WebSocketManager
+from src.utils.health import HealthMonitor
 from src.utils.logging import Logger
+from src.utils.profiling import Profiler
 from src.web.routes import register_routes
 
 load_dotenv()
@@ -20,6 +27,90 @@ templates = Jinja2Templates(directory="templates")
 
 register_routes(app, templates, websocket_manager)
 
+HOST = "0.0.0.0"
+PORT = 5000
+
+
+def run_web_worker(index, prefix, pubsub_path):
+    """
+    Entry point of a web worker process in multi-worker mode.
+
+    Args:
+        index (int): Worker number, for logging
+        prefix (str): Prefix of the shared memory segments
+        pubsub_path (str): Path of the shared state notification socket
+    """
+    try:
+        asyncio.run(serve_web_worker(index, prefix, pubsub_path))
+    except KeyboardInterrupt:
+        pass
+
+
+async def serve_web_worker(index, prefix, pubsub_path):
+    """
+    Serve REST and WebSocket clients from a mirror of the shared sensor state.
+
+    Every worker binds the same port with SO_REUSEPORT, so the kernel spreads
+    incoming connections across workers.
+
+    Args:
+        index (int): Worker number, for logging
+        prefix (str): Prefix of the shared memory segments
+        pubsub_path (str): Path of the shared state notification socket
+    """
+    HealthMonitor.start()
+    Profiler.start_from_env()
+    mirror = SharedStateMirror(prefix, pubsub_path)
+    asyncio.create_task(mirror.run())
+    asyncio.create_task(DeviceManager.monitor_sensor_status())
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((HOST, PORT))
+
+    Logger.log_message(f"Web worker {index} (pid {os.getpid()}) serving on {HOST}:{PORT}")
+    server = uvicorn.Server(uvicorn.Config(app, host=HOST, port=PORT))
+    await server.serve(sockets=[sock])
+
+
+async def run_web_workers(worker_count):
+    """
+    Publish sensor state to shared memory and supervise web worker processes.
+
+    Args:
+        worker_count (int): Number of web worker processes
+    """
+    prefix = f"pub_{os.getpid()}"
+    pubsub_path = os.getenv("SHARED_PUBSUB_PATH", f"/tmp/{prefix}.sock")
+
+    publisher = SharedStatePublisher(prefix, pubsub_path)
+    await publisher.start()
+
+    context = multiprocessing.get_context("spawn")
+    workers = {}
+
+    def start_worker(index):
+        process = context.Process(target=run_web_worker, args=(index, prefix, pubsub_path), daemon=True)
+        process.start()
+        workers[index] = process
+
+    for index in range(worker_count):
+        start_worker(index)
+    Logger.log_message(f"Started {worker_count} web workers over shared state '{prefix}'")
+
+    try:
+        while True:
+            await asyncio.sleep(1)
+            for index, process in list(workers.items()):
+                if not process.is_alive():
+                    Logger.log_error(f"Web worker {index} exited with code {process.exitcode}, restarting")
+                    start_worker(index)
+    finally:
+        for process in workers.values():
+            process.terminate()
+        publisher.close()
+
 
 async def main():
     """
@@ -27,15 +118,31 @@ async def main():
 
     Initializes and runs:
     - Bluetooth server for device connections
-    - FastAPI web server for the user interface
+    - Simulated devices, when SIMULATED_DEVICES > 0
+    - Sensor status monitor pushing liveness transitions
+    - Event-loop lag probe feeding the health report
+    - FastAPI web server for the user interface, in this process or, when
+      WEB_WORKERS > 1, in worker processes reading shared memory
     """
     bluetooth_server = BluetoothConnection()
-    config = uvicorn.Config(app, host="0.0.0.0", port=5000)
-    server = uvicorn.Server(config)
+    web_workers = int(os.getenv("WEB_WORKERS", 1))
 
+    HealthMonitor.start()
+    Profiler.start_from_env()
     asyncio.create_task(bluetooth_server.start_server())
+    asyncio.create_task(DeviceManager.monitor_sensor_status())
+
+    simulated_devices = int(os.getenv("SIMULATED_DEVICES", 0))
+    if simulated_devices > 0:
+        sample_rate = float(os.getenv("SIMULATED_SAMPLE_RATE", 50))
+        asyncio.create_task(DeviceSimulator(bluetooth_server, simulated_devices, sample_rate).run())
 
-    await server.serve()
+    if web_workers > 1:
+        await run_web_workers(web_workers)
+    else:
+        config = uvicorn.Config(app, host=HOST, port=PORT)
+        server = uvicorn.Server(config)
+        await server.serve()
 
 
 if __name__ == "__main__":
@@ -45,4 +152,4 @@ if __name__ == "__main__":
         Logger.log_message("Server interrupted by user")
     except Exception as e:
         Logger.log_error(f"Fatal error: {e}")
-        logging.exception("Fatal error occurred")
\ No newline at end of file
+        logging.exception("Fatal error occurred")
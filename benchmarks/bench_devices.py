@@ -0,0 +1,71 @@
+from benchmarks.harness import benchmark
+from src.connection.bluetooth_server import DeviceManager
+from src.sensors.sensor_factory import SensorFactory
+
+# Registered device counts the serialization benchmarks run at
+DEVICE_COUNTS = (10, 100, 500)
+
+SENSOR_TYPES = ("accelerometer", "gyroscope", "magnetometer")
+
+
+def _register_devices(count):
+    """
+    Register devices with three sensors holding a few samples each.
+
+    Args:
+        count (int): Number of devices
+
+    Returns:
+        list: Registered device IDs
+    """
+    device_ids = []
+    for index in range(count):
+        device_id = f"bench{index:04d}"
+        DeviceManager.register_device(device_id, f"Bench device {index}")
+        sensors = {sensor_type: SensorFactory.create_sensor(sensor_type, device_id, 100)
+                   for sensor_type in SENSOR_TYPES}
+        for sensor in sensors.values():
+            for sample in range(10):
+                sensor.store_sample(sample * 0.01, (0.1, 0.2, 0.3))
+        DeviceManager.add_sensors(device_id, sensors)
+        for sensor_type in SENSOR_TYPES:
+            DeviceManager.note_sensor_data(device_id, sensor_type)
+        device_ids.append(device_id)
+    return device_ids
+
+
+def _serializable_devices(count, changing):
+    """
+    Build a get_serializable_devices benchmark.
+
+    Args:
+        count (int): Number of registered devices
+        changing (bool): Store a sample on one device before every call, as while streaming,
+            so that device's summary is rebuilt
+
+    Returns:
+        tuple: Callable serializing the device list 100 times, and the cleanup unregistering the devices
+    """
+    device_ids = _register_devices(count)
+    devices = DeviceManager.get_all_devices()
+    sensors = [devices[device_id]["sensors"]["accelerometer"] for device_id in device_ids]
+
+    def run():
+        for call in range(100):
+            if changing:
+                sensor = sensors[call % count]
+                sensor.store_sample(sensor.sample_count * 0.01, (0.1, 0.2, 0.3))
+            DeviceManager.get_serializable_devices()
+
+    def cleanup():
+        for device_id in device_ids:
+            DeviceManager.unregister_device(device_id)
+
+    return run, cleanup
+
+
+for _count in DEVICE_COUNTS:
+    benchmark(f"devices.serializable[{_count}]", ops=100)(
+        lambda count=_count: _serializable_devices(count, changing=False))
+    benchmark(f"devices.serializable_changing[{_count}]", ops=100)(
+        lambda count=_count: _serializable_devices(count, changing=True))
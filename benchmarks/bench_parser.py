@@ -0,0 +1,122 @@
+import json
+import os
+import random
+from benchmarks.harness import benchmark
+from src.connection.bluetooth_server import BluetoothMessageParser
+
+# Messages in each generated stream
+MESSAGE_COUNT = 2000
+
+SENSOR_TYPES = ("accelerometer", "gyroscope", "magnetometer")
+
+
+def _messages(seed=1):
+    """
+    Generate encoded sensor messages like the ones devices send.
+
+    Args:
+        seed (int): Random seed, so every run parses the same bytes
+
+    Returns:
+        list: Encoded JSON messages
+    """
+    rng = random.Random(seed)
+    return [
+        json.dumps({
+            "type": SENSOR_TYPES[index % len(SENSOR_TYPES)],
+            "x": round(rng.uniform(-20, 20), 6),
+            "y": round(rng.uniform(-20, 20), 6),
+            "z": round(rng.uniform(-20, 20), 6),
+        }).encode()
+        for index in range(MESSAGE_COUNT)
+    ]
+
+
+def _chunks(stream, min_size, max_size, seed=2):
+    """
+    Split a byte stream into reads of random sizes.
+
+    Args:
+        stream (bytes): Stream to split
+        min_size (int): Smallest read
+        max_size (int): Largest read
+        seed (int): Random seed
+
+    Returns:
+        list: Consecutive chunks of the stream
+    """
+    rng = random.Random(seed)
+    chunks = []
+    position = 0
+    while position < len(stream):
+        size = rng.randint(min_size, max_size)
+        chunks.append(stream[position:position + size])
+        position += size
+    return chunks
+
+
+def _receive_loop(chunks):
+    """
+    Build a callable that feeds chunks through the parser like BluetoothConnection._receive_messages.
+
+    Args:
+        chunks (list): Received chunks
+
+    Returns:
+        callable: Parses the whole stream once
+    """
+    json_start_pattern = os.getenv("BT_JSON_START_PATTERN", '{"type"')
+    max_message_size = int(os.getenv("BT_MAX_MESSAGE_SIZE", 2048))
+
+    def run():
+        parser = BluetoothMessageParser(json_start_pattern=json_start_pattern,
+                                        max_message_size=max_message_size, device_id="bench")
+        for data in chunks:
+            parser.feed(data)
+
+    return run
+
+
+@benchmark("parser.clean", ops=MESSAGE_COUNT)
+def parser_clean():
+    """Well-formed messages received in full recv-sized chunks."""
+    return _receive_loop(_chunks(b"".join(_messages()), 1024, 1024))
+
+
+@benchmark("parser.fragmented", ops=MESSAGE_COUNT)
+def parser_fragmented():
+    """Well-formed messages arriving in small reads that split most messages."""
+    return _receive_loop(_chunks(b"".join(_messages()), 8, 48))
+
+
+@benchmark("parser.interleaved", ops=MESSAGE_COUNT)
+def parser_interleaved():
+    """Every fifth message has the next one written into its middle, as with concurrent sensor writes."""
+    messages = _messages()
+    stream = []
+    index = 0
+    while index < len(messages):
+        message = messages[index]
+        if index % 5 == 0 and index + 1 < len(messages):
+            middle = len(message) // 2
+            stream.append(message[:middle] + messages[index + 1] + message[middle:])
+            index += 2
+        else:
+            stream.append(message)
+            index += 1
+    return _receive_loop(_chunks(b"".join(stream), 64, 1024))
+
+
+@benchmark("parser.corrupted", ops=MESSAGE_COUNT)
+def parser_corrupted():
+    """One message in twenty is truncated or followed by line noise."""
+    rng = random.Random(3)
+    stream = []
+    for index, message in enumerate(_messages()):
+        if index % 20 == 0:
+            stream.append(message[:rng.randint(1, len(message) - 1)])
+        elif index % 20 == 10:
+            stream.append(message + bytes(rng.randrange(256) for _ in range(rng.randint(1, 32))))
+        else:
+            stream.append(message)
+    return _receive_loop(_chunks(b"".join(stream), 64, 1024))
@@ -0,0 +1,294 @@
+import os
+import random
+import tempfile
+from benchmarks.harness import benchmark
+from src.sensors.recording import RecordingWriter
+from src.sensors.sensor_factory import SensorFactory
+
+# Ring capacities (MAX_DATA_POINTS) the storage benchmarks run at
+DATA_POINT_SIZES = (100, 1000, 10000)
+
+# Samples per timed call
+SAMPLE_COUNT = 1000
+
+
+def _samples(seed=4):
+    """
+    Generate decoded sensor messages.
+
+    Args:
+        seed (int): Random seed
+
+    Returns:
+        list: Message dicts with x, y and z
+    """
+    rng = random.Random(seed)
+    return [
+        {"type": "accelerometer", "x": rng.uniform(-20, 20), "y": rng.uniform(-20, 20), "z": rng.uniform(-20, 20)}
+        for _ in range(SAMPLE_COUNT)
+    ]
+
+
+def _filled_sensor(max_data_points):
+    """
+    Create an accelerometer whose ring is already full.
+
+    Args:
+        max_data_points (int): Ring capacity
+
+    Returns:
+        Sensor: Accelerometer holding max_data_points samples
+    """
+    sensor = SensorFactory.create_sensor("accelerometer", "bench", max_data_points)
+    rng = random.Random(5)
+    for index in range(max_data_points):
+        sensor.store_sample(index * 0.01, (rng.random(), rng.random(), rng.random()))
+    return sensor
+
+
+def _process_data(max_data_points):
+    """
+    Build a process_data benchmark: store, downsample and publish each sample.
+
+    Args:
+        max_data_points (int): Ring capacity
+
+    Returns:
+        callable: Processes SAMPLE_COUNT messages
+    """
+    sensor = _filled_sensor(max_data_points)
+    samples = _samples()
+
+    def run():
+        for sample in samples:
+            sensor.process_data(sample)
+
+    return run
+
+
+def _get_data(max_data_points):
+    """
+    Build a get_data benchmark: read the latest window of a full ring.
+
+    Args:
+        max_data_points (int): Ring capacity
+
+    Returns:
+        callable: Calls get_data SAMPLE_COUNT times
+    """
+    sensor = _filled_sensor(max_data_points)
+
+    def run():
+        for _ in range(SAMPLE_COUNT):
+            sensor.get_data()
+
+    return run
+
+
+for _size in DATA_POINT_SIZES:
+    benchmark(f"sensor.process_data[{_size}]", ops=SAMPLE_COUNT)(lambda size=_size: _process_data(size))
+    benchmark(f"sensor.get_data[{_size}]", ops=SAMPLE_COUNT)(lambda size=_size: _get_data(size))
+
+
+def _save_to_file(drain):
+    """
+    Build a save_to_file benchmark writing into a temporary directory.
+
+    Args:
+        drain (bool): Also wait until the writer thread has written and closed the file
+
+    Returns:
+        tuple: Callable saving SAMPLE_COUNT rows, and the cleanup restoring DATA_FILE_PATH
+    """
+    directory = tempfile.TemporaryDirectory()
+    previous = os.environ.get("DATA_FILE_PATH")
+    # File paths are DATA_FILE_PATH followed by the file name, so keep the trailing separator
+    os.environ["DATA_FILE_PATH"] = directory.name + os.sep
+    sensor = SensorFactory.create_sensor("accelerometer", "bench", 100)
+    samples = _samples()
+
+    def run():
+        for sample in samples:
+            sensor.save_to_file(sample, "bench", "bench")
+        if drain:
+            RecordingWriter.shutdown()
+
+    def cleanup():
+        RecordingWriter.shutdown()
+        directory.cleanup()
+        if previous is None:
+            os.environ.pop("DATA_FILE_PATH", None)
+        else:
+            os.environ["DATA_FILE_PATH"] = previous
+
+    return run, cleanup
+
+
+@benchmark("recording.save_to_file", ops=SAMPLE_COUNT)
+def recording_enqueue():
+    """Cost of save_to_file on the ingest path: format a row and queue it."""
+    return _save_to_file(drain=False)
+
+
+@benchmark("recording.throughput", ops=SAMPLE_COUNT)
+def recording_throughput():
+    """Rows queued and written to disk by the writer thread, end to end."""
+    return _save_to_file(drain=True)
+
+
+# Filters the filter benchmarks configure, at the rate FILTER_SAMPLE_RATE fixes
+BENCH_FILTERS = "accelerometer.lp=lowpass:5,accelerometer.hp=highpass:0.5,accelerometer.avg=moving_average:10"
+BENCH_FILTER_RATE = "100"
+
+# Samples per batch in the batch filter benchmark (a worker flush at 100 Hz)
+FILTER_BATCH_SIZE = 50
+
+
+def _filter_bank():
+    """
+    Create a filter bank for BENCH_FILTERS, designed at BENCH_FILTER_RATE.
+
+    Returns:
+        FilterBank: Lowpass, highpass and moving average on x, y and z
+    """
+    from src.sensors.filters import FilterBank
+
+    previous = {name: os.environ.get(name) for name in ("SENSOR_FILTERS", "FILTER_SAMPLE_RATE")}
+    os.environ.update(SENSOR_FILTERS=BENCH_FILTERS, FILTER_SAMPLE_RATE=BENCH_FILTER_RATE)
+    try:
+        return FilterBank("accelerometer", ("x", "y", "z"))
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+@benchmark("filters.process", ops=SAMPLE_COUNT)
+def filters_process():
+    """Per-sample filtering on the direct ingest path."""
+    bank = _filter_bank()
+    rows = [(index * 0.01, (sample["x"], sample["y"], sample["z"])) for index, sample in enumerate(_samples())]
+
+    def run():
+        for timestamp, values in rows:
+            bank.process(timestamp, values)
+
+    return run
+
+
+@benchmark("filters.process_batch", ops=SAMPLE_COUNT)
+def filters_process_batch():
+    """Vectorized filtering of worker batches."""
+    bank = _filter_bank()
+    samples = _samples()
+    batches = []
+    for start in range(0, SAMPLE_COUNT, FILTER_BATCH_SIZE):
+        chunk = samples[start:start + FILTER_BATCH_SIZE]
+        times = [(start + offset) * 0.01 for offset in range(len(chunk))]
+        batches.append((times, [[sample[channel] for sample in chunk] for channel in ("x", "y", "z")]))
+
+    def run():
+        for times, columns in batches:
+            bank.process_batch(times, columns)
+
+    return run
+
+
+@benchmark("spectrum.follow", ops=SAMPLE_COUNT)
+def spectrum_follow():
+    """Store samples and keep a spectrum analyzer following them, reading the Welch PSD after every update."""
+    from src.sensors.spectrum import SpectrumAnalyzer
+
+    sensor = _filled_sensor(1000)
+    analyzer = SpectrumAnalyzer("bench", "accelerometer", sensor)
+    rows = [(sample["x"], sample["y"], sample["z"]) for sample in _samples()]
+
+    def run():
+        for start in range(0, SAMPLE_COUNT, FILTER_BATCH_SIZE):
+            for values in rows[start:start + FILTER_BATCH_SIZE]:
+                sensor.store_sample(sensor.sample_count * 0.01, values)
+            if analyzer.update():
+                analyzer.result("welch")
+
+    return run
+
+
+def _calibration():
+    """
+    Create a magnetometer calibration with hard- and soft-iron parameters in effect.
+
+    Returns:
+        Calibration: Calibration applying an offset and a full 3x3 matrix
+    """
+    from src.sensors.calibration import Calibration
+
+    return Calibration("bench", "bench", "magnetometer", {
+        "offset": [30.0, -12.0, 55.0],
+        "matrix": [[0.85, -0.09, -0.04], [-0.09, 1.12, 0.08], [-0.04, 0.08, 0.96]],
+    })
+
+
+@benchmark("calibration.apply", ops=SAMPLE_COUNT)
+def calibration_apply():
+    """Per-sample calibration on the direct ingest path, queueing each raw sample for the fitter."""
+    calibration = _calibration()
+    rows = [(sample["x"], sample["y"], sample["z"]) for sample in _samples()]
+
+    def run():
+        for values in rows:
+            calibration.observe(values)
+            calibration.apply(values)
+        calibration.pending.clear()
+
+    return run
+
+
+@benchmark("calibration.apply_batch", ops=SAMPLE_COUNT)
+def calibration_apply_batch():
+    """Vectorized calibration of worker batches, queueing each batch for the fitter."""
+    calibration = _calibration()
+    samples = _samples()
+    batches = [[[sample[channel] for sample in samples[start:start + FILTER_BATCH_SIZE]] for channel in ("x", "y", "z")]
+               for start in range(0, SAMPLE_COUNT, FILTER_BATCH_SIZE)]
+
+    def run():
+        for columns in batches:
+            calibration.observe_batch(columns)
+            calibration.apply_batch(columns)
+        calibration.pending.clear()
+
+    return run
+
+
+BENCH_TRIGGERS = ("accelerometer.shake=magnitude:25,accelerometer.fall=freefall:2:0.1,"
+                  "accelerometer.spike=zscore:x:6,accelerometer.tilt=above:y:15")
+
+
+@benchmark("triggers.process_batch", ops=SAMPLE_COUNT)
+def triggers_process_batch():
+    """Evaluate a magnitude, free-fall, z-score and threshold trigger on worker batches."""
+    from src.sensors.triggers import TriggerSet
+
+    previous = os.environ.get("SENSOR_TRIGGERS")
+    os.environ["SENSOR_TRIGGERS"] = BENCH_TRIGGERS
+    try:
+        triggers = TriggerSet("accelerometer", ("x", "y", "z"))
+    finally:
+        if previous is None:
+            os.environ.pop("SENSOR_TRIGGERS", None)
+        else:
+            os.environ["SENSOR_TRIGGERS"] = previous
+    samples = _samples()
+    batches = []
+    for start in range(0, SAMPLE_COUNT, FILTER_BATCH_SIZE):
+        chunk = samples[start:start + FILTER_BATCH_SIZE]
+        times = [(start + offset) * 0.01 for offset in range(len(chunk))]
+        batches.append((times, [[sample[channel] for sample in chunk] for channel in ("x", "y", "z")]))
+
+    def run():
+        for times, columns in batches:
+            triggers.process_batch(times, columns)
+
+    return run
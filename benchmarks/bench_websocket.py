@@ -0,0 +1,66 @@
+from benchmarks.harness import benchmark
+from src.connection.websocket_manager import WebSocketManager
+
+# Subscribed clients the fan-out benchmarks run with
+CLIENT_COUNTS = (1, 10, 100, 500)
+
+# Updates per timed call
+UPDATE_COUNT = 100
+
+# Shared by every fan-out benchmark, since managers stay subscribed to the EventBus
+_manager = None
+
+
+class FakeWebSocket:
+    """WebSocket stand-in that accepts every message without doing I/O."""
+
+    def __init__(self):
+        """Initialize the client."""
+        self.sent_bytes = 0
+
+    async def send_text(self, text):
+        """
+        Accept one message.
+
+        Args:
+            text (str): Message
+        """
+        self.sent_bytes += len(text)
+
+
+def _fan_out(client_count):
+    """
+    Build a send_sensor_update benchmark with subscribed fake clients.
+
+    Args:
+        client_count (int): Clients subscribed to the sensor
+
+    Returns:
+        tuple: Coroutine function sending UPDATE_COUNT updates, and the cleanup clearing the clients
+    """
+    global _manager
+    if _manager is None:
+        _manager = WebSocketManager()
+    manager = _manager
+    client_key = "bench_accelerometer"
+    manager.active_connections[client_key] = [FakeWebSocket() for _ in range(client_count)]
+    data = {
+        "time": [index * 0.01 for index in range(100)],
+        "x": [0.1] * 100,
+        "y": [0.2] * 100,
+        "z": [0.3] * 100,
+    }
+
+    async def run():
+        for _ in range(UPDATE_COUNT):
+            await manager.send_sensor_update("bench", "accelerometer", data)
+
+    def cleanup():
+        manager.active_connections.clear()
+
+    return run, cleanup
+
+
+for _count in CLIENT_COUNTS:
+    benchmark(f"websocket.send_sensor_update[{_count}]", ops=UPDATE_COUNT)(
+        lambda count=_count: _fan_out(count))
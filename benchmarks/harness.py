@@ -0,0 +1,144 @@
+import asyncio
+import json
+import platform
+import statistics
+import time
+
+# Default number of timed runs per benchmark, after one warm-up run
+DEFAULT_REPEAT = 7
+
+# A benchmark regresses when its median is this many times its baseline median
+DEFAULT_TOLERANCE = 1.3
+
+BENCHMARKS = {}
+
+
+def benchmark(name, ops=1):
+    """
+    Register a benchmark.
+
+    The decorated function prepares the benchmark and returns the callable
+    to time (a plain or coroutine function taking no arguments), or a
+    (callable, cleanup) tuple when state has to be torn down afterwards.
+
+    Args:
+        name (str): Unique benchmark name, grouped by its dotted prefix
+        ops (int): Operations performed by one call, for per-operation results
+
+    Returns:
+        callable: Decorator
+    """
+    def decorator(setup):
+        BENCHMARKS[name] = (setup, ops)
+        return setup
+    return decorator
+
+
+def run_benchmark(name, repeat=DEFAULT_REPEAT):
+    """
+    Time one registered benchmark.
+
+    Args:
+        name (str): Benchmark name
+        repeat (int): Number of timed runs
+
+    Returns:
+        dict: Median and minimum time per operation in microseconds and operations per second
+    """
+    setup, ops = BENCHMARKS[name]
+    prepared = setup()
+    function, cleanup = prepared if isinstance(prepared, tuple) else (prepared, None)
+
+    loop = None
+    if asyncio.iscoroutinefunction(function):
+        loop = asyncio.new_event_loop()
+        coroutine_function = function
+
+        def function():
+            loop.run_until_complete(coroutine_function())
+
+    try:
+        function()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - start)
+    finally:
+        if cleanup is not None:
+            cleanup()
+        if loop is not None:
+            loop.close()
+
+    median = statistics.median(timings)
+    return {
+        "median_us": round(median / ops * 1e6, 3),
+        "min_us": round(min(timings) / ops * 1e6, 3),
+        "ops_per_sec": round(ops / median, 1) if median > 0 else None,
+    }
+
+
+def machine_info():
+    """
+    Describe the machine a baseline was recorded on.
+
+    Returns:
+        dict: Python version, implementation, platform and processor
+    """
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def load_baseline(path):
+    """
+    Load stored baseline results.
+
+    Args:
+        path (str): Baseline JSON file
+
+    Returns:
+        dict: Baseline with "machine" and "results" entries, empty results if the file does not exist
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"machine": None, "results": {}}
+
+
+def save_baseline(path, results, baseline=None):
+    """
+    Store results as the new baseline, keeping baseline entries of benchmarks that did not run.
+
+    Args:
+        path (str): Baseline JSON file
+        results (dict): Results per benchmark name
+        baseline (dict, optional): Previously loaded baseline
+    """
+    merged = dict(baseline["results"]) if baseline else {}
+    merged.update(results)
+    with open(path, "w") as f:
+        json.dump({"machine": machine_info(), "results": dict(sorted(merged.items()))}, f, indent=2)
+        f.write("\n")
+
+
+def compare(result, baseline_result, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare a result with its baseline.
+
+    Args:
+        result (dict): Result of run_benchmark
+        baseline_result (dict): Baseline entry, or None
+        tolerance (float): Allowed median slowdown ratio
+
+    Returns:
+        tuple: (ratio of median to baseline median or None, True if it regressed)
+    """
+    if not baseline_result or not baseline_result.get("median_us"):
+        return None, False
+    ratio = result["median_us"] / baseline_result["median_us"]
+    return ratio, ratio > tolerance
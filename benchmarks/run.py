@@ -0,0 +1,89 @@
+"""
+Run the microbenchmarks and compare them with the stored baseline.
+
+Usage (from the repository root):
+    python -m benchmarks.run                 # run all, fail on regressions
+    python -m benchmarks.run -k parser       # only benchmarks whose name contains "parser"
+    python -m benchmarks.run --save          # record the results as the new baseline
+
+Baselines are only comparable on the machine they were recorded on;
+record one on the deployment hardware before relying on the check.
+"""
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+
+BENCHMARK_MODULES = ("bench_parser", "bench_sensors", "bench_devices", "bench_websocket")
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def main():
+    """
+    Parse arguments, run the selected benchmarks and report them against the baseline.
+
+    Returns:
+        int: Exit status, 1 if a benchmark regressed beyond the tolerance
+    """
+    parser = argparse.ArgumentParser(description="Run the server microbenchmarks")
+    parser.add_argument("-k", "--filter", action="append", default=[],
+                        help="Only run benchmarks whose name contains this text (repeatable)")
+    parser.add_argument("--repeat", type=int, default=None, help="Timed runs per benchmark")
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="Allowed median slowdown ratio against the baseline")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--list", action="store_true", help="List the benchmarks and exit")
+    args = parser.parse_args()
+
+    # Keep benchmark logs and recordings out of the working directory
+    scratch = tempfile.mkdtemp(prefix="pub_bench_")
+    os.environ.setdefault("SERVER_LOG_FILE_PATH", os.path.join(scratch, "server.log"))
+    os.environ.setdefault("DATA_FILE_PATH", scratch + os.sep)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from benchmarks import harness
+
+    for module in BENCHMARK_MODULES:
+        try:
+            importlib.import_module(f"benchmarks.{module}")
+        except ImportError as e:
+            print(f"Skipping {module}: {e}")
+
+    names = [name for name in harness.BENCHMARKS
+             if not args.filter or any(text in name for text in args.filter)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    repeat = args.repeat or harness.DEFAULT_REPEAT
+    tolerance = args.tolerance or harness.DEFAULT_TOLERANCE
+    baseline = harness.load_baseline(args.baseline)
+    results = {}
+    regressions = []
+
+    print(f"{'benchmark':<44} {'median us/op':>13} {'ops/s':>12} {'baseline':>10} {'ratio':>7}")
+    for name in names:
+        result = results[name] = harness.run_benchmark(name, repeat)
+        baseline_result = baseline["results"].get(name)
+        ratio, regressed = harness.compare(result, baseline_result, tolerance)
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<44} {result['median_us']:>13.3f} {result['ops_per_sec'] or 0:>12.1f} "
+              f"{baseline_result['median_us'] if baseline_result else '-':>10} "
+              f"{f'{ratio:.2f}' if ratio is not None else '-':>7}{'  REGRESSION' if regressed else ''}")
+
+    if args.save:
+        harness.save_baseline(args.baseline, results, baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than {tolerance}x baseline: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
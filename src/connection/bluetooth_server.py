@@ -6,16 +6,62 @@ import bluetooth
 import json
 import time
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+from src.utils.health import HealthMonitor
 from src.utils.logging import Logger
+from src.utils.metrics import Metrics
+from src.utils.profiling import Profiler
+from src.utils.tracing import LatencyTracker
 from src.connection.event_bus import EventBus
+from src.sensors.calibration import Calibration
+from src.sensors.capture import Capture, recording_mode
+from src.sensors.clock_sync import ClockSync
+from src.sensors.orientation import Orientation
+from src.sensors.sample_stats import SampleStats
 from src.sensors.sensor_factory import SensorFactory
+from src.sensors.triggers import TriggerLog
+
+# Ingest metrics
+BYTES_RECEIVED = Metrics.counter("pub_bytes_received_total", "Bytes received from devices", ("device_id",))
+FRAMES = Metrics.counter("pub_frames_total", "Framed messages by outcome (parsed, rejected)", ("device_id", "result"))
+PARSER_DISCARDS = Metrics.counter("pub_parser_discards_total",
+                                  "Stream segments dropped by the framer (garbage, oversize, resync)",
+                                  ("device_id", "reason"))
+DISCARDED_BYTES = Metrics.counter("pub_parser_discarded_bytes_total", "Received bytes dropped by the framer",
+                                  ("device_id",))
+SAMPLES = Metrics.counter("pub_sensor_samples_total", "Samples accepted", ("device_id", "sensor_type"))
+FILE_WRITE_SECONDS = Metrics.histogram("pub_file_write_seconds", "Time to queue one sample for its CSV file",
+                                       ("sensor_type",))
+INGEST_BACKLOG = Metrics.gauge("pub_ingest_backlog_bytes", "Received bytes not yet framed into messages",
+                               ("device_id",))
 
 
 class DeviceManager:
-    """Manages Bluetooth device registration and tracking."""
+    """
+    Manages Bluetooth device registration and tracking.
+
+    Every change that affects the device list (device added or removed,
+    sensors attached, sensor status flipping) bumps a global version and
+    stamps the affected device with it, so consumers can ask for only the
+    entries that changed since the version they last saw.
+    """
     devices = {}
 
+    # Registry versioning
+    version = 0
+    device_versions = {}
+    removed_versions = {}
+    max_removed_tracked = 1000
+    pruned_removed_version = 0
+    _sensor_status = {}
+    _summary_cache = {}
+
+    # Sensor liveness: seconds without data before a sensor becomes stale / inactive
+    SENSOR_STATUSES = ("no_data", "active", "stale", "inactive")
+    stale_threshold = 4.0
+    inactive_threshold = 10.0
+    status_check_interval = 0.5
+
     @staticmethod
     def generate_device_id():
         """
@@ -26,6 +72,24 @@ class DeviceManager:
         """
         return secrets.token_hex(4).upper()
 
+    @classmethod
+    def _bump_version(cls, device_id, publish=True):
+        """
+        Mark a device as changed in the registry.
+
+        Args:
+            device_id (str): Device identifier
+            publish (bool): Publish a device_changed event
+        """
+        cls.version += 1
+        cls.device_versions[device_id] = cls.version
+
+        if publish:
+            EventBus.publish("device_changed", {
+                "device_id": device_id,
+                "version": cls.version
+            })
+
     @classmethod
     def register_device(cls, device_id, device_name):
         """
@@ -41,6 +105,8 @@ class DeviceManager:
                 "connected_at": datetime.now().isoformat(),
                 "sensors": {},
             }
+            cls.removed_versions.pop(device_id, None)
+            cls._bump_version(device_id, publish=False)
             Logger.log_message(f"Device registered: {device_name} ({device_id})")
 
             EventBus.publish("device_connected", {
@@ -60,6 +126,25 @@ class DeviceManager:
         if device_id in cls.devices:
             device_name = cls.devices[device_id]["name"]
             del cls.devices[device_id]
+
+            for sensor_key in [key for key in cls._sensor_status if key[0] == device_id]:
+                del cls._sensor_status[sensor_key]
+            cls._summary_cache.pop(device_id, None)
+            Metrics.remove_label("device_id", device_id)
+            LatencyTracker.forget_device(device_id)
+            ClockSync.forget_device(device_id)
+            Calibration.forget_device(device_id)
+            Capture.forget_device(device_id)
+            TriggerLog.forget_device(device_id)
+            SampleStats.forget_device(device_id)
+
+            cls.version += 1
+            cls.device_versions.pop(device_id, None)
+            cls.removed_versions[device_id] = cls.version
+            if len(cls.removed_versions) > cls.max_removed_tracked:
+                oldest = min(cls.removed_versions, key=cls.removed_versions.get)
+                cls.pruned_removed_version = cls.removed_versions.pop(oldest)
+
             Logger.log_message(f"Device removed: {device_name} ({device_id})")
 
             EventBus.publish("device_disconnected", {
@@ -68,250 +153,579 @@ class DeviceManager:
             })
 
     @classmethod
-    def get_all_devices(cls):
+    def add_sensors(cls, device_id, sensors):
         """
-        Get all connected devices.
+        Attach sensor objects to a registered device.
 
-        Returns:
-            dict: Dictionary containing all registered devices
+        Args:
+            device_id (str): Device identifier
+            sensors (dict): Sensor objects keyed by sensor type
         """
-        return cls.devices
+        if device_id in cls.devices:
+            cls.devices[device_id]["sensors"].update(sensors)
+            cls._bump_version(device_id)
 
     @classmethod
-    def get_serializable_devices(cls):
+    def note_sensor_data(cls, device_id, sensor_type):
         """
-        Get a serializable version of all devices with sensor status.
+        Record that a sensor just produced data.
+
+        Only acts when the sensor was not already active, so steady
+        streaming costs a single dict lookup per sample.
+
+        Args:
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type that received data
+        """
+        key = (device_id, sensor_type)
+        if cls._sensor_status.get(key) != "active" and device_id in cls.devices:
+            cls._set_sensor_status(device_id, sensor_type, "active", time.time())
+            cls._bump_version(device_id)
+
+    @classmethod
+    def get_sensor_status(cls, device_id, sensor_type):
+        """
+        Get the liveness status of a sensor.
+
+        Args:
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type
 
         Returns:
-            dict: Dictionary with device info and sensor summaries
+            str: One of no_data, active, stale or inactive
         """
-        serializable_devices = {}
-        current_time = time.time()
+        return cls._sensor_status.get((device_id, sensor_type), "no_data")
 
-        for device_id, device_info in cls.devices.items():
-            sensor_summary = {}
+    @classmethod
+    def get_sensor_statuses(cls, device_id):
+        """
+        Get liveness details of every sensor of a device.
 
-            for sensor_type, sensor_obj in device_info.get("sensors", {}).items():
-                try:
-                    data = sensor_obj.get_data()
-                    data_points = len(data.get("time", []))
-
-                    has_recent_data = False
-                    time_since_update = None
-
-                    if data_points > 0 and data.get("time"):
-                        last_relative_time = data["time"][-1]
-                        sensor_start_time = getattr(sensor_obj, 'start_time', current_time)
-                        last_data_time = sensor_start_time + last_relative_time
-                        time_since_update = current_time - last_data_time
-                        has_recent_data = time_since_update < 5.0
-
-                    sensor_summary[sensor_type] = {
-                        "type": sensor_type,
-                        "data_points": data_points,
-                        "has_data": data_points > 0,
-                        "has_recent_data": has_recent_data,
-                        "time_since_update": time_since_update,
-                        "last_values": {
-                            "x": data.get("x", [None])[-1] if data.get("x") else None,
-                            "y": data.get("y", [None])[-1] if data.get("y") else None,
-                            "z": data.get("z", [None])[-1] if data.get("z") else None,
-                        } if data_points > 0 else None
-                    }
+        Args:
+            device_id (str): Device identifier
 
-                except Exception as e:
-                    Logger.log_error(f"Error serializing sensor {sensor_type}: {e}")
-                    sensor_summary[sensor_type] = {
-                        "type": sensor_type,
-                        "data_points": 0,
-                        "has_data": False,
-                        "has_recent_data": False,
-                        "error": str(e)
-                    }
-
-            active_sensors = sum(1 for s in sensor_summary.values() if s.get("has_recent_data", False))
-
-            serializable_devices[device_id] = {
-                "name": device_info["name"],
-                "connected_at": device_info["connected_at"],
-                "sensors": sensor_summary,
-                "sensor_count": len(sensor_summary),
-                "active_sensor_count": active_sensors,
-                "last_updated": current_time
+        Returns:
+            dict: Status, data point count and last update time per sensor type
+        """
+        statuses = {}
+        for sensor_type, sensor in cls.devices.get(device_id, {}).get("sensors", {}).items():
+            summary = sensor.get_summary()
+            last_update = None
+            if summary["last_time"] is not None:
+                last_update = getattr(sensor, 'start_time', 0) + summary["last_time"]
+            statuses[sensor_type] = {
+                "status": cls.get_sensor_status(device_id, sensor_type),
+                "data_points": summary["data_points"],
+                "last_update_absolute": last_update
             }
+        return statuses
 
-        return serializable_devices
+    @classmethod
+    def _set_sensor_status(cls, device_id, sensor_type, status, current_time):
+        """
+        Store a sensor status transition and publish it.
 
+        Args:
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type
+            status (str): New status
+            current_time (float): Transition time
+        """
+        previous_status = cls._sensor_status.get((device_id, sensor_type), "no_data")
+        cls._sensor_status[(device_id, sensor_type)] = status
+
+        sensor = cls.devices.get(device_id, {}).get("sensors", {}).get(sensor_type)
+        summary = sensor.get_summary() if sensor is not None else {"data_points": 0, "last_time": None}
+        last_update = None
+        if summary["last_time"] is not None:
+            last_update = getattr(sensor, 'start_time', current_time) + summary["last_time"]
+
+        EventBus.publish("sensor_status", {
+            "device_id": device_id,
+            "sensor_type": sensor_type,
+            "status": status,
+            "previous_status": previous_status,
+            "data_points": summary["data_points"],
+            "last_update_absolute": last_update,
+            "timestamp": current_time
+        })
 
-class BluetoothMessageParser:
-    """
-    Specialized parser for concurrent JSON messages in Bluetooth streams.
+    @classmethod
+    def refresh_sensor_status(cls, publish=True):
+        """
+        Re-evaluate liveness of active and stale sensors.
 
-    Handles message interleaving, fragmentation, and corruption that occurs
-    when multiple sensors send data simultaneously through the same socket.
-    """
+        A sensor is active while its last sample is younger than
+        stale_threshold, stale until inactive_threshold, then inactive.
+        Each transition is published as a sensor_status event and bumps
+        the device version.
+
+        Args:
+            publish (bool): Publish device_changed events for bumped devices
 
-    def __init__(self, json_start_pattern: str, max_buffer_size: int, fallback_size: int):
+        Returns:
+            int: Number of sensors whose status changed
         """
-        Initialize the message parser.
+        current_time = time.time()
+        changed_devices = set()
+        changed = 0
 
-        Args:
-            json_start_pattern (str): Pattern to identify JSON message start
-            max_buffer_size (int): Maximum buffer size before cleanup
-            fallback_size (int): Size to keep during buffer cleanup
+        for (device_id, sensor_type), status in list(cls._sensor_status.items()):
+            if status not in ("active", "stale"):
+                continue
+            sensor = cls.devices.get(device_id, {}).get("sensors", {}).get(sensor_type)
+            if sensor is None:
+                continue
+
+            last_time = sensor.get_summary()["last_time"]
+            if last_time is None:
+                new_status = "inactive"
+            else:
+                age = current_time - (getattr(sensor, 'start_time', current_time) + last_time)
+                if age < cls.stale_threshold:
+                    new_status = "active"
+                elif age < cls.inactive_threshold:
+                    new_status = "stale"
+                else:
+                    new_status = "inactive"
+
+            if new_status != status:
+                cls._set_sensor_status(device_id, sensor_type, new_status, current_time)
+                changed_devices.add(device_id)
+                changed += 1
+
+        for device_id in changed_devices:
+            cls._bump_version(device_id, publish=publish)
+
+        return changed
+
+    @classmethod
+    async def monitor_sensor_status(cls):
+        """Periodically detect sensors going stale or inactive and publish the transitions."""
+        cls.stale_threshold = float(os.getenv("SENSOR_STALE_THRESHOLD", cls.stale_threshold))
+        cls.inactive_threshold = float(os.getenv("SENSOR_INACTIVE_THRESHOLD", cls.inactive_threshold))
+        Logger.log_message(f"Sensor status monitor started (stale after {cls.stale_threshold}s, "
+                           f"inactive after {cls.inactive_threshold}s)")
+
+        try:
+            while True:
+                await asyncio.sleep(cls.status_check_interval)
+                try:
+                    cls.refresh_sensor_status()
+                except Exception as e:
+                    Logger.log_error(f"Error refreshing sensor status: {e}")
+        except asyncio.CancelledError:
+            Logger.log_warning("Sensor status monitor cancelled")
+
+    @classmethod
+    def get_all_devices(cls):
         """
-        self.json_start_pattern = json_start_pattern.encode('utf-8')
-        self.max_buffer_size = max_buffer_size
-        self.fallback_size = fallback_size
+        Get all connected devices.
 
-        # Regex for potential valid JSON messages
-        self.json_regex = re.compile(
-            rb'\{\s*"type"\s*:\s*"[^"]+"\s*,.*?\}',
-            re.DOTALL
-        )
+        Returns:
+            dict: Dictionary containing all registered devices
+        """
+        return cls.devices
 
-    def extract_complete_jsons(self, buffer: bytes) -> Tuple[List[bytes], bytes]:
+    @classmethod
+    def get_changes_since(cls, since_version):
         """
-        Extract complete JSON messages from buffer.
+        Get device list entries changed after a given registry version.
 
         Args:
-            buffer (bytes): Raw data buffer containing potential JSON messages
+            since_version (int): Last version the consumer has applied
 
         Returns:
-            Tuple[List[bytes], bytes]: List of valid JSON messages and remaining buffer
+            dict: Current version, changed device summaries, removed device ids
+                and whether the result is a full snapshot
         """
-        complete_jsons = []
-
-        matches = list(self.json_regex.finditer(buffer))
+        # Removals older than the pruned tombstones can no longer be diffed
+        full = since_version is None or since_version < cls.pruned_removed_version
+
+        if full:
+            return {
+                "version": cls.version,
+                "full": True,
+                "changed": cls.get_serializable_devices(),
+                "removed": []
+            }
 
-        if matches:
-            last_end = 0
-            for match in matches:
-                json_candidate = match.group()
+        changed = {
+            device_id: cls.get_device_summary(device_id)
+            for device_id, device_version in cls.device_versions.items()
+            if device_version > since_version and device_id in cls.devices
+        }
+        removed = [
+            device_id for device_id, removed_version in cls.removed_versions.items()
+            if removed_version > since_version
+        ]
+
+        return {
+            "version": cls.version,
+            "full": False,
+            "changed": changed,
+            "removed": removed
+        }
 
-                if self._is_valid_json(json_candidate):
-                    complete_jsons.append(json_candidate)
-                    last_end = match.end()
+    @classmethod
+    def get_data_version(cls, device_id):
+        """
+        Get a counter that changes whenever any sensor of a device stores data.
 
-            remaining_buffer = buffer[last_end:] if last_end > 0 else buffer
-        else:
-            # Fallback: manual extraction when regex fails
-            complete_jsons, remaining_buffer = self._manual_json_extraction(buffer)
+        Args:
+            device_id (str): Device identifier
 
-        return complete_jsons, remaining_buffer
+        Returns:
+            int: Sum of the sample counters of the device sensors
+        """
+        device_info = cls.devices.get(device_id)
+        if device_info is None:
+            return 0
+        return sum(getattr(sensor, "sample_count", 0) for sensor in device_info.get("sensors", {}).values())
 
-    def _manual_json_extraction(self, buffer: bytes) -> Tuple[List[bytes], bytes]:
+    @classmethod
+    def get_device_etag(cls, device_id):
         """
-        Extract JSON messages manually when regex approach fails.
+        Get an entity tag for the current state of a device.
 
         Args:
-            buffer (bytes): Raw data buffer
+            device_id (str): Device identifier
 
         Returns:
-            Tuple[List[bytes], bytes]: List of valid JSON messages and remaining buffer
+            str: Weak ETag built from the registry and data versions
         """
-        complete_jsons = []
-        start = 0
-
-        while True:
-            json_start = buffer.find(self.json_start_pattern, start)
-            if json_start == -1:
-                break
+        return f'W/"{device_id}-{cls.device_versions.get(device_id, 0)}-{cls.get_data_version(device_id)}"'
 
-            json_end = self._find_json_end(buffer, json_start)
-            if json_end == -1:
-                # Incomplete JSON remains in buffer
-                break
+    @classmethod
+    def get_devices_etag(cls):
+        """
+        Get an entity tag for the current state of the whole device list.
 
-            json_candidate = buffer[json_start:json_end + 1]
+        Returns:
+            str: Weak ETag built from the registry and data versions
+        """
+        data_version = sum(cls.get_data_version(device_id) for device_id in cls.devices)
+        return f'W/"devices-{cls.version}-{data_version}"'
 
-            if self._is_valid_json(json_candidate):
-                complete_jsons.append(json_candidate)
+    @classmethod
+    def get_device_summary(cls, device_id):
+        """
+        Get the serializable summary of one device, rebuilt only when it changed.
 
-            start = json_end + 1
+        Args:
+            device_id (str): Device identifier
 
-        remaining_buffer = buffer[start:] if start < len(buffer) else b""
+        Returns:
+            dict: Device info and sensor summaries
+        """
+        cache_key = (cls.device_versions.get(device_id, 0), cls.get_data_version(device_id))
+        cached = cls._summary_cache.get(device_id)
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
 
-        return complete_jsons, remaining_buffer
+        summary = cls._summarize_device(device_id, time.time())
+        cls._summary_cache[device_id] = (cache_key, summary)
+        return summary
 
-    def _find_json_end(self, buffer: bytes, start: int) -> int:
+    @classmethod
+    def _summarize_device(cls, device_id, current_time):
         """
-        Find JSON end using brace balancing.
+        Build the serializable summary of one device.
+
+        Uses constant-time sensor summaries instead of copying data buffers.
 
         Args:
-            buffer (bytes): Data buffer
-            start (int): Starting position for search
+            device_id (str): Device identifier
+            current_time (float): Reference time for recency checks
 
         Returns:
-            int: Position of JSON end or -1 if incomplete
+            dict: Device info and sensor summaries
         """
-        brace_count = 0
-        in_string = False
-        escape_next = False
+        device_info = cls.devices[device_id]
+        sensor_summary = {}
+
+        for sensor_type, sensor_obj in device_info.get("sensors", {}).items():
+            try:
+                summary = sensor_obj.get_summary()
+                data_points = summary["data_points"]
+
+                status = cls.get_sensor_status(device_id, sensor_type)
+                time_since_update = None
+
+                if data_points > 0 and summary["last_time"] is not None:
+                    sensor_start_time = getattr(sensor_obj, 'start_time', current_time)
+                    last_data_time = sensor_start_time + summary["last_time"]
+                    time_since_update = current_time - last_data_time
+
+                sensor_summary[sensor_type] = {
+                    "type": sensor_type,
+                    "data_points": data_points,
+                    "has_data": data_points > 0,
+                    "has_recent_data": status == "active",
+                    "status": status,
+                    "time_since_update": time_since_update,
+                    "last_values": summary["last_values"] if data_points > 0 else None
+                }
+
+            except Exception as e:
+                Logger.log_error(f"Error serializing sensor {sensor_type}: {e}")
+                sensor_summary[sensor_type] = {
+                    "type": sensor_type,
+                    "data_points": 0,
+                    "has_data": False,
+                    "has_recent_data": False,
+                    "error": str(e)
+                }
+
+        active_sensors = sum(1 for s in sensor_summary.values() if s.get("has_recent_data", False))
+
+        return {
+            "name": device_info["name"],
+            "connected_at": device_info["connected_at"],
+            "sensors": sensor_summary,
+            "sensor_count": len(sensor_summary),
+            "active_sensor_count": active_sensors,
+            "last_updated": current_time,
+            "version": cls.device_versions.get(device_id, 0)
+        }
 
-        for i in range(start, len(buffer)):
-            byte_char = chr(buffer[i]) if buffer[i] < 128 else None
+    @classmethod
+    def get_serializable_devices(cls):
+        """
+        Get a serializable version of all devices with sensor status.
 
-            if escape_next:
-                escape_next = False
-                continue
+        Returns:
+            dict: Dictionary with device info and sensor summaries
+        """
+        return {
+            device_id: cls.get_device_summary(device_id)
+            for device_id in cls.devices
+        }
 
-            if byte_char == '\\':
-                escape_next = True
-                continue
 
-            if byte_char == '"' and not escape_next:
-                in_string = not in_string
-                continue
+def _ingest_check():
+    """
+    Report the received bytes each device connection has not framed yet.
+
+    Returns:
+        dict: Status, largest backlog and backlog per device
+    """
+    devices = {labels[0]: size for labels, size in INGEST_BACKLOG.values.items()}
+    largest = max(devices.values(), default=0)
+    return {
+        "status": HealthMonitor.classify(largest, "INGEST_BACKLOG", 1024, 2048),
+        "max_backlog_bytes": largest,
+        "devices": devices,
+    }
+
 
-            if not in_string:
-                if byte_char == '{':
-                    brace_count += 1
-                elif byte_char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        return i
+HealthMonitor.register_check("ingest", _ingest_check)
 
-        return -1  # Incomplete JSON
 
-    def _is_valid_json(self, json_bytes: bytes) -> bool:
+class BluetoothMessageParser:
+    """
+    Incremental framer for concurrent JSON messages in one device's Bluetooth stream.
+
+    Handles message interleaving, fragmentation, and corruption that occurs
+    when multiple sensors send data simultaneously through the same socket.
+
+    Work per received byte is bounded: the scan position and brace/string
+    state persist across chunks, so no byte is scanned twice, and the
+    Python loop only visits structural bytes ({, }, ", backslash) while
+    the regex engine skips everything else. Flat messages already complete
+    in the buffer are framed with a few bounded byte searches instead. A message longer than the
+    maximum size is dropped. A start pattern seen inside an unfinished
+    message abandons it and starts over there only where it cannot be part
+    of that message: inside a string (the pattern's unescaped quote would
+    end it) or where no value may start (not after ":", "[" or ","). A
+    nested object that begins like a message is therefore kept inside its
+    parent, while a message truncated mid-value costs at most its own bytes.
+    A message cut right after a ":" or "," is only dropped once the message
+    that follows closes, so the next frame is lost along with it.
+    Discarded bytes are counted per device and reason (garbage, oversize,
+    resync).
+    """
+
+    _whitespace = frozenset(b" \t\r\n")
+
+    _structural = re.compile(rb'[{}"\\]')
+
+    def __init__(self, json_start_pattern: str, max_message_size: int, device_id: str = ""):
         """
-        Validate if bytes represent syntactically valid JSON with expected structure.
+        Initialize the message parser.
 
         Args:
-            json_bytes (bytes): Bytes to validate as JSON
+            json_start_pattern (str): Pattern to identify JSON message start
+            max_message_size (int): Maximum size of one message in bytes
+            device_id (str): Device whose stream is parsed, for the discard counters
+        """
+        self.json_start_pattern = json_start_pattern.encode('utf-8')
+        self.max_message_size = max_message_size
+        self.device_id = device_id
+
+        self.buffer = bytearray()
+        self.scan_pos = 0
+        self.message_start = -1
+        self.depth = 0
+        self.in_string = False
+
+    @property
+    def buffered(self) -> int:
+        """int: Bytes received but not framed into messages yet."""
+        return len(self.buffer)
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        Add received bytes and extract the messages they complete.
+
+        Args:
+            data (bytes): Received chunk
 
         Returns:
-            bool: True if valid JSON with required structure
+            List[bytes]: Complete messages, in stream order
         """
-        try:
-            data = json.loads(json_bytes.decode('utf-8'))
-            return isinstance(data, dict) and "type" in data
-        except (json.JSONDecodeError, UnicodeDecodeError, ValueError):
-            return False
+        buf = self.buffer
+        buf += data
+        pattern = self.json_start_pattern
+        limit = self.max_message_size
+        frames = []
+        pos = self.scan_pos
+        start = self.message_start
+        depth = self.depth
+        in_string = self.in_string
+
+        while True:
+            if start < 0:
+                found = buf.find(pattern, pos)
+                if found == -1:
+                    # Keep a start pattern that may be cut at the end of the chunk
+                    keep_from = max(pos, len(buf) - len(pattern) + 1)
+                    self._discard(pos, keep_from, "garbage")
+                    pos = keep_from
+                    break
+                self._discard(pos, found, "garbage")
+                start = pos = found
+                depth = 0
+                in_string = False
+
+                # Fast path for flat messages: one object, no escapes, and the first
+                # closing brace outside any string (every quote before it is paired)
+                end = buf.find(b"}", start, start + limit)
+                if (end >= 0 and buf.count(b"{", start, end) == 1 and buf.find(b"\\", start, end) == -1
+                        and buf.count(b'"', start, end) % 2 == 0):
+                    frames.append(bytes(buf[start:end + 1]))
+                    start = -1
+                    pos = end + 1
+                    continue
+
+            end = -1
+            skip = -1
+            resume = -1
+            for match in self._structural.finditer(buf, pos):
+                i = match.start()
+                if i == skip:
+                    continue
+                if i - start >= limit:
+                    resume = i
+                    break
+                char = buf[i]
+                if char == 0x7B and depth > 0 and (
+                        buf.startswith(pattern, i)
+                        or (len(buf) - i < len(pattern) and pattern.startswith(buf[i:]))) and (
+                        in_string or not self._value_position(buf, start, i)):
+                    # A new message (or, at the end of the chunk, possibly one) starts inside this one
+                    resume = i
+                    break
+                if in_string:
+                    if char == 0x5C:  # backslash escapes the next byte
+                        if i + 1 == len(buf):
+                            resume = i
+                            break
+                        skip = i + 1
+                    elif char == 0x22:
+                        in_string = False
+                elif char == 0x22:
+                    in_string = True
+                elif char == 0x7B:
+                    depth += 1
+                elif char == 0x7D:
+                    depth -= 1
+                    if depth == 0:
+                        end = i
+                        break
+
+            if end >= 0:
+                if end - start + 1 > limit:
+                    self._discard(start, end + 1, "oversize")
+                else:
+                    frames.append(bytes(buf[start:end + 1]))
+                start = -1
+                pos = end + 1
+            elif resume >= 0 and resume - start >= limit:
+                # Oversized: drop what was scanned and look for the next message after it
+                self._discard(start, resume, "oversize")
+                start = -1
+                pos = resume
+            elif resume >= 0 and buf[resume] == 0x7B and buf.startswith(pattern, resume):
+                self._discard(start, resume, "resync")
+                start = -1
+                pos = resume
+            elif resume >= 0:
+                pos = resume
+                break
+            elif len(buf) - start > limit:
+                self._discard(start, len(buf), "oversize")
+                start = -1
+                pos = len(buf)
+            else:
+                pos = len(buf)
+                break
 
-    def cleanup_buffer(self, buffer: bytes) -> bytes:
+        # Drop everything before the pending message (or the unscanned tail)
+        cut = start if start >= 0 else pos
+        if cut:
+            del buf[:cut]
+        self.scan_pos = pos - cut
+        self.message_start = start - cut if start >= 0 else -1
+        self.depth = depth
+        self.in_string = in_string
+        return frames
+
+    def _value_position(self, buf: bytearray, start: int, i: int) -> bool:
         """
-        Clean buffer while preserving potentially useful data.
+        Check whether a nested value may start at a position of the pending message.
 
         Args:
-            buffer (bytes): Buffer to clean
+            buf (bytearray): Receive buffer
+            start (int): Position of the pending message
+            i (int): Position of the opening brace, outside any string
 
         Returns:
-            bytes: Cleaned buffer
+            bool: True if the brace follows ":", "[" or ","
         """
-        if len(buffer) <= self.max_buffer_size:
-            return buffer
+        j = i - 1
+        while j > start and buf[j] in self._whitespace:
+            j -= 1
+        return buf[j] in b":[,"
 
-        # Find last JSON end marker
-        last_brace = buffer.rfind(b'}')
+    def _discard(self, begin: int, end: int, reason: str):
+        """
+        Count bytes of the buffer that are dropped instead of framed.
 
-        if last_brace != -1 and last_brace < len(buffer) - 1:
-            # Keep data after last complete JSON
-            return buffer[last_brace + 1:]
-        else:
-            # Fallback: keep only last bytes
-            return buffer[-self.fallback_size:]
+        Args:
+            begin (int): First dropped position
+            end (int): Position after the last dropped byte
+            reason (str): "garbage" (outside any message), "oversize" or "resync"
+        """
+        if end <= begin:
+            return
+        if reason == "garbage" and self.buffer[begin:end].isspace():
+            # Whitespace between messages is a separator, not corruption
+            return
+        PARSER_DISCARDS.inc(self.device_id, reason)
+        DISCARDED_BYTES.inc(self.device_id, amount=end - begin)
+        Logger.log_warning(f"Discarded {end - begin} bytes ({reason}) from {self.device_id}",
+                           key=f"parser_discard_{self.device_id}")
 
 
 class BluetoothConnection:
@@ -323,100 +737,166 @@ class BluetoothConnection:
     fragmentation and message overlap.
     """
 
-    def __init__(self):
-        """Initialize Bluetooth connection manager with environment configurations."""
+    def __init__(self, ingest_workers=None):
+        """
+        Initialize Bluetooth connection manager with environment configurations.
+
+        Args:
+            ingest_workers (int, optional): Worker processes handling device connections,
+                0 to handle them on this event loop. Defaults to INGEST_WORKERS.
+        """
         # Buffer and network settings loaded from .env
         self.recv_chunk_size = int(os.getenv("BT_RECV_CHUNK_SIZE", 1024))
-        self.max_buffer_size = int(os.getenv("BT_MAX_BUFFER_SIZE", 8192))
-        self.buffer_cleanup_threshold = int(os.getenv("BT_BUFFER_CLEANUP_THRESHOLD", 4096))
-        self.buffer_fallback_size = int(os.getenv("BT_BUFFER_FALLBACK_SIZE", 256))
         self.max_message_size = int(os.getenv("BT_MAX_MESSAGE_SIZE", 2048))
         self.connection_timeout = int(os.getenv("BT_CONNECTION_TIMEOUT", 30))
         self.json_start_pattern = os.getenv("BT_JSON_START_PATTERN", '{"type"')
+        # In triggered mode samples are only written by captures, not per sample
+        self.recording_mode = recording_mode()
 
-        self.message_parser = BluetoothMessageParser(
-            json_start_pattern=self.json_start_pattern,
-            max_buffer_size=self.max_buffer_size,
-            fallback_size=self.buffer_fallback_size
-        )
+        if ingest_workers is None:
+            ingest_workers = int(os.getenv("INGEST_WORKERS", 0))
+        self.ingest_pool = None
+        if ingest_workers > 0:
+            from src.connection.ingest_pool import IngestPool
+            self.ingest_pool = IngestPool(ingest_workers)
 
-        Logger.log_message(f"BluetoothConnection initialized with buffer_size={self.max_buffer_size}, "
+        Logger.log_message(f"BluetoothConnection initialized with max_message_size={self.max_message_size}, "
                            f"chunk_size={self.recv_chunk_size}, timeout={self.connection_timeout}s")
 
-    async def handle_client(self, socket, device_id: str):
+    @Profiler.timed("handle_client")
+    async def handle_client(self, socket, device_id: str, device_name: str = None):
         """
         Handle Bluetooth client connection with multi-sensor support.
 
-        Resolves:
-        - Message interleaving (overlapping messages)
-        - Data fragmentation
-        - Buffer overflow
-        - Concurrent JSON parsing
+        Registers the device and its sensors, then either reads the
+        connection here or hands it to an ingest worker process.
 
         Args:
             socket: Bluetooth socket for the connected client
             device_id (str): Unique identifier for the device
+            device_name (str, optional): Device name, looked up from the peer address if omitted
         """
-        device_name = "Unknown"
-        buffer = b""
         message_count = 0
         error_count = 0
+        handed_off = False
 
         try:
-            device_name = bluetooth.lookup_name(socket.getpeername()[0]) or "Unknown"
+            address = self._peer_address(socket)
+            if device_name is None:
+                device_name = (bluetooth.lookup_name(address) if address else None) or "Unknown"
             DeviceManager.register_device(device_id, device_name)
             Logger.log_message(f"Connected: {device_name} (ID: {device_id})")
 
             sensors = await self._initialize_sensors(device_id)
-            DeviceManager.devices[device_id]["sensors"].update(sensors)
-
-            while True:
-                try:
-                    data = await asyncio.wait_for(
-                        asyncio.to_thread(socket.recv, self.recv_chunk_size),
-                        timeout=self.connection_timeout
-                    )
-                    if not data:
-                        Logger.log_message(f"Connection closed by client: {device_name}")
-                        break
-                    buffer += data
-
-                    complete_jsons, buffer = self.message_parser.extract_complete_jsons(buffer)
-                    for json_data in complete_jsons:
-                        success = await self._process_sensor_message(
-                            json_data, sensors, device_name, device_id
-                        )
-                        if success:
-                            message_count += 1
-                        else:
-                            error_count += 1
-                    if len(buffer) > self.buffer_cleanup_threshold:
-                        old_size = len(buffer)
-                        buffer = self.message_parser.cleanup_buffer(buffer)
-                        Logger.log_message(f"Buffer cleaned: {old_size} -> {len(buffer)} bytes")
-
-                except asyncio.TimeoutError as timeout_err:
-                    Logger.log_error(f"Connection timeout with {device_name}. Error: {timeout_err}")
-                    break
-                except bluetooth.btcommon.BluetoothError as bluetooth_err:
-                    Logger.log_error(f"Bluetooth error with {device_name}: {bluetooth_err}")
-                    break
-                except Exception as e:
-                    error_count += 1
-                    Logger.log_error(f"Error in {device_name} loop: {e}")
-
-                    if error_count > 10:
-                        Logger.log_error(f"Too many errors ({error_count}), terminating {device_name}")
-                        break
+            DeviceManager.add_sensors(device_id, sensors)
+            Calibration.attach(device_id, device_name, sensors, address)
+            # Derived sensors are fed from the stored samples, never from device messages
+            derived = Orientation.attach(device_id, sensors)
+            if derived:
+                DeviceManager.add_sensors(device_id, derived)
+            if self.recording_mode == "triggered":
+                Capture.attach(device_id, device_name, dict(sensors, **derived))
+
+            if self.ingest_pool is not None:
+                handed_off = self.ingest_pool.dispatch(socket, device_id, device_name, sensors)
+                if handed_off:
+                    return
+
+            message_count, error_count = await self._receive_messages(socket, device_id, device_name, sensors)
 
         except Exception as e:
             Logger.log_error(f"Critical error with {device_name}: {e}")
         finally:
-            await self._cleanup_connection(socket, device_id, device_name, message_count, error_count)
+            if not handed_off:
+                await self._cleanup_connection(socket, device_id, device_name, message_count, error_count)
+
+    @staticmethod
+    def _peer_address(socket) -> Optional[str]:
+        """
+        Get the Bluetooth address of a connected client.
+
+        Args:
+            socket: Connected client socket
+
+        Returns:
+            Optional[str]: Peer address, or None for sockets without one (the simulator's socket pairs)
+        """
+        try:
+            peer = socket.getpeername()
+        except OSError:
+            return None
+        return peer[0] if isinstance(peer, tuple) and peer else None
+
+    async def _receive_messages(self, socket, device_id: str, device_name: str, sensors: Dict) -> Tuple[int, int]:
+        """
+        Read, frame and process messages until the connection ends.
+
+        Each connection gets its own incremental BluetoothMessageParser,
+        which resolves:
+        - Message interleaving (overlapping messages)
+        - Data fragmentation
+        - Oversized or unterminated messages
+        - Concurrent JSON parsing
+
+        Args:
+            socket: Connected client socket
+            device_id (str): Unique identifier for the device
+            device_name (str): Human-readable device name
+            sensors (Dict): Sensor objects of the device
+
+        Returns:
+            Tuple[int, int]: Number of processed messages and number of errors
+        """
+        parser = BluetoothMessageParser(
+            json_start_pattern=self.json_start_pattern,
+            max_message_size=self.max_message_size,
+            device_id=device_id
+        )
+        message_count = 0
+        error_count = 0
+
+        while True:
+            try:
+                data = await asyncio.wait_for(
+                    asyncio.to_thread(socket.recv, self.recv_chunk_size),
+                    timeout=self.connection_timeout
+                )
+                if not data:
+                    Logger.log_message(f"Connection closed by client: {device_name}")
+                    break
+                BYTES_RECEIVED.inc(device_id, amount=len(data))
+                LatencyTracker.mark_received()
+                for json_data in parser.feed(data):
+                    success = await self._process_sensor_message(
+                        json_data, sensors, device_name, device_id
+                    )
+                    if success:
+                        message_count += 1
+                        FRAMES.inc(device_id, "parsed")
+                    else:
+                        error_count += 1
+                        FRAMES.inc(device_id, "rejected")
+                INGEST_BACKLOG.set(parser.buffered, device_id)
+
+            except asyncio.TimeoutError as timeout_err:
+                Logger.log_error(f"Connection timeout with {device_name}. Error: {timeout_err}")
+                break
+            except (bluetooth.btcommon.BluetoothError, ConnectionError) as bluetooth_err:
+                Logger.log_error(f"Bluetooth error with {device_name}: {bluetooth_err}")
+                break
+            except Exception as e:
+                error_count += 1
+                Logger.log_error(f"Error in {device_name} loop: {e}")
+
+                if error_count > 10:
+                    Logger.log_error(f"Too many errors ({error_count}), terminating {device_name}")
+                    break
+
+        return message_count, error_count
 
     async def _initialize_sensors(self, device_id: str) -> Dict:
         """
-        Initialize sensors for the device.
+        Initialize sensors for the device, sharing one estimate of the device clock.
 
         Args:
             device_id (str): Unique device identifier
@@ -430,6 +910,9 @@ class BluetoothConnection:
             "gyroscope": SensorFactory.create_sensor("gyroscope", device_id, max_data_points),
             "magnetometer": SensorFactory.create_sensor("magnetometer", device_id, max_data_points)
         }
+        clock = ClockSync(device_id)
+        for sensor in sensors.values():
+            sensor.clock = clock
 
         Logger.log_message(f"Sensors initialized for {device_id}: {list(sensors.keys())}")
         return sensors
@@ -450,33 +933,65 @@ class BluetoothConnection:
         """
         try:
             message = json.loads(json_data.decode('utf-8'))
+            LatencyTracker.record_since_received("parse", device_id)
 
             if not isinstance(message, dict) or "type" not in message:
-                Logger.log_warning(f"Invalid message from {device_name}: incorrect structure")
+                Logger.log_warning(f"Invalid message from {device_name}: incorrect structure",
+                                   key=f"parse_error_{device_id}")
                 return False
 
             sensor_type = message.get("type")
 
             if sensor_type not in sensors:
-                Logger.log_warning(f"Unknown sensor type from {device_name}: {sensor_type}")
+                Logger.log_warning(f"Unknown sensor type from {device_name}: {sensor_type}",
+                                   key=f"parse_error_{device_id}")
                 return False
 
-            sensor = sensors[sensor_type]
-
-            if sensor.process_data(message):
-                sensor.save_to_file(message, device_name, device_id)
+            if self._apply_sample(sensors[sensor_type], sensor_type, message, device_name, device_id):
                 return True
             else:
-                Logger.log_warning(f"Failed to process {sensor_type} data from {device_name}")
+                Logger.log_warning(f"Failed to process {sensor_type} data from {device_name}",
+                                   key=f"parse_error_{device_id}")
                 return False
 
         except (json.JSONDecodeError, UnicodeDecodeError) as e:
-            Logger.log_error(f"Decoding error from {device_name}: {e}")
+            Logger.log_error(f"Decoding error from {device_name}: {e}", key=f"parse_error_{device_id}")
             return False
         except Exception as e:
             Logger.log_error(f"Error processing message from {device_name}: {e}")
             return False
 
+    def _apply_sample(self, sensor, sensor_type: str, message: Dict, device_name: str, device_id: str) -> bool:
+        """
+        Store, publish and record a decoded sensor message.
+
+        Recording is skipped in triggered mode, where captures write the stored samples.
+
+        Args:
+            sensor: Sensor the message belongs to
+            sensor_type (str): Sensor type
+            message (Dict): Decoded message
+            device_name (str): Human-readable device name
+            device_id (str): Unique device identifier
+
+        Returns:
+            bool: True if the sample was accepted
+        """
+        process_start = time.perf_counter()
+        if not sensor.process_data(message):
+            return False
+        LatencyTracker.record("process", device_id, time.perf_counter() - process_start)
+        DeviceManager.note_sensor_data(device_id, sensor_type)
+        SAMPLES.inc(device_id, sensor_type)
+
+        if self.recording_mode == "continuous":
+            write_start = time.perf_counter()
+            sensor.save_to_file(message, device_name, device_id)
+            write_time = time.perf_counter() - write_start
+            FILE_WRITE_SECONDS.observe(write_time, sensor_type)
+            LatencyTracker.record("record", device_id, write_time)
+        return True
+
     async def _cleanup_connection(self, socket, device_id: str, device_name: str,
                                   message_count: int, error_count: int):
         """
@@ -499,6 +1014,10 @@ class BluetoothConnection:
 
     async def start_server(self):
         """Start the Bluetooth server and accept incoming connections."""
+        # Started first so simulated devices are served even without a Bluetooth adapter
+        if self.ingest_pool is not None:
+            self.ingest_pool.start()
+
         server_socket = bluetooth.BluetoothSocket(bluetooth.RFCOMM)
         server_socket.bind(("", bluetooth.PORT_ANY))
         server_socket.listen(1)
@@ -1,4 +1,9 @@
+import time
 from src.utils.logging import Logger
+from src.utils.metrics import Metrics
+
+DISPATCH_SECONDS = Metrics.histogram("pub_eventbus_dispatch_seconds",
+                                     "Time to run every subscriber of one published event", ("event_type",))
 
 
 class EventBus:
@@ -29,8 +34,10 @@ class EventBus:
             data (dict): Event data
         """
         if event_type in cls._subscribers:
+            dispatch_start = time.perf_counter()
             for callback in cls._subscribers[event_type]:
                 try:
                     callback(data)
                 except Exception as e:
-                    Logger.log_error(f"Error processing event {event_type}: {e}")
\ No newline at end of file
+                    Logger.log_error(f"Error processing event {event_type}: {e}")
+            DISPATCH_SECONDS.observe(time.perf_counter() - dispatch_start, event_type)
\ No newline at end of file
@@ -0,0 +1,401 @@
+import asyncio
+import multiprocessing
+import os
+import time
+import zlib
+from array import array
+from multiprocessing import reduction
+from src.connection.bluetooth_server import (BluetoothConnection, DeviceManager, FILE_WRITE_SECONDS, INGEST_BACKLOG,
+                                             SAMPLES)
+from src.connection.event_bus import EventBus
+from src.sensors.clock_sync import ClockSync
+from src.sensors.recording import RecordingWriter
+from src.sensors.sample_stats import SampleStats
+from src.sensors.sensor_factory import SensorFactory
+from src.utils.logging import Logger
+from src.utils.metrics import Metrics
+from src.utils.tracing import LatencyTracker
+
+# Seconds between forwarding worker metrics and backlogs to the main process
+METRICS_FORWARD_INTERVAL = 1.0
+
+
+class _DescriptorStream:
+    """Minimal socket-like reader over a connection file descriptor received from another process."""
+
+    def __init__(self, fd):
+        """
+        Initialize the stream.
+
+        Args:
+            fd (int): Connected socket file descriptor
+        """
+        self.fd = fd
+
+    def recv(self, size):
+        """
+        Read up to size bytes.
+
+        Args:
+            size (int): Maximum number of bytes
+
+        Returns:
+            bytes: Data read, empty when the peer closed the connection
+        """
+        return os.read(self.fd, size)
+
+    def close(self):
+        """Close the file descriptor."""
+        os.close(self.fd)
+
+
+class ShardConnection(BluetoothConnection):
+    """
+    Device connection handling inside an ingest worker process.
+
+    Framing, decoding, validation and CSV recording run in the worker;
+    accepted samples are collected per device and forwarded to the main
+    process as column batches, one pipe message per processed chunk.
+    """
+
+    def __init__(self, conn):
+        """
+        Initialize the worker side connection handler.
+
+        Args:
+            conn (Connection): Pipe to the main process
+        """
+        super().__init__(ingest_workers=0)
+        self.conn = conn
+        self.pending = {}
+        self.flush_scheduled = False
+        self.metrics_sent_at = 0.0
+
+    async def run_session(self, fd, device_id, device_name, start_times):
+        """
+        Read one device connection until it ends.
+
+        Args:
+            fd (int): Connected socket file descriptor
+            device_id (str): Unique device identifier
+            device_name (str): Human-readable device name
+            start_times (dict): Start time of each sensor in the main process, keyed by sensor type
+        """
+        # Local sensors only validate and record; the main process keeps the data
+        sensors = {}
+        clock = ClockSync(device_id)
+        for sensor_type, start_time in start_times.items():
+            sensor = SensorFactory.create_sensor(sensor_type, device_id, 1)
+            sensor.start_time = start_time
+            sensor.clock = clock
+            sensors[sensor_type] = sensor
+
+        stream = _DescriptorStream(fd)
+        message_count = 0
+        error_count = 0
+        try:
+            message_count, error_count = await self._receive_messages(stream, device_id, device_name, sensors)
+        except Exception as e:
+            Logger.log_error(f"Critical error with {device_name}: {e}")
+        finally:
+            stream.close()
+            LatencyTracker.forget_device(device_id)
+            ClockSync.forget_device(device_id)
+            SampleStats.forget_device(device_id)
+            INGEST_BACKLOG.remove("device_id", device_id)
+            self.metrics_sent_at = 0.0
+            self.flush()
+            self.conn.send(("closed", device_id, message_count, error_count))
+
+    def _apply_sample(self, sensor, sensor_type, message, device_name, device_id):
+        """
+        Queue a decoded message for the main process and record it unless in triggered mode.
+
+        Args:
+            sensor: Sensor the message belongs to
+            sensor_type (str): Sensor type
+            message (Dict): Decoded message
+            device_name (str): Human-readable device name
+            device_id (str): Unique device identifier
+
+        Returns:
+            bool: True if the sample was accepted
+        """
+        values = sensor.extract_values(message)
+        if values is None:
+            return False
+
+        batches = self.pending.setdefault(device_id, {})
+        columns = batches.get(sensor_type)
+        if columns is None:
+            columns = batches[sensor_type] = [array("d") for _ in range(len(values) + 1)]
+        columns[0].append(sensor.sample_time(message))
+        for column, value in zip(columns[1:], values):
+            column.append(value)
+
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+        if self.recording_mode == "continuous":
+            write_start = time.perf_counter()
+            sensor.save_to_file(message, device_name, device_id)
+            write_time = time.perf_counter() - write_start
+            FILE_WRITE_SECONDS.observe(write_time, sensor_type)
+            LatencyTracker.record("record", device_id, write_time)
+        return True
+
+    def flush(self):
+        """Send queued sample batches to the main process, and once per interval metrics, backlogs and timing."""
+        self.flush_scheduled = False
+        pending, self.pending = self.pending, {}
+        for device_id, batches in pending.items():
+            self.conn.send(("samples", device_id, batches))
+
+        now = time.monotonic()
+        if now - self.metrics_sent_at >= METRICS_FORWARD_INTERVAL:
+            self.metrics_sent_at = now
+            drained = Metrics.drain()
+            if drained:
+                self.conn.send(("metrics", drained))
+            self.conn.send(("backlog", dict(INGEST_BACKLOG.values), RecordingWriter.backlog()))
+            if ClockSync.states or SampleStats.trackers:
+                self.conn.send(("timing", ClockSync.states, SampleStats.snapshots()))
+
+
+def run_ingest_worker(conn):
+    """
+    Entry point of an ingest worker process.
+
+    Args:
+        conn (Connection): Pipe to the main process
+    """
+    try:
+        asyncio.run(serve_ingest_worker(conn))
+    except KeyboardInterrupt:
+        pass
+
+
+async def serve_ingest_worker(conn):
+    """
+    Accept device connections handed over by the main process until the pipe closes.
+
+    Args:
+        conn (Connection): Pipe to the main process
+    """
+    connection = ShardConnection(conn)
+    loop = asyncio.get_running_loop()
+    closed = loop.create_future()
+
+    def on_command():
+        try:
+            while conn.poll():
+                command = conn.recv()
+                if command[0] == "connect":
+                    _, device_id, device_name, start_times = command
+                    fd = reduction.recv_handle(conn)
+                    asyncio.create_task(connection.run_session(fd, device_id, device_name, start_times))
+        except (EOFError, OSError):
+            loop.remove_reader(conn.fileno())
+            if not closed.done():
+                closed.set_result(None)
+
+    loop.add_reader(conn.fileno(), on_command)
+    Logger.log_message(f"Ingest worker {os.getpid()} ready")
+    await closed
+
+
+class IngestPool:
+    """
+    Shards device connections across ingest worker processes.
+
+    The main process still accepts connections and owns the device
+    registry, sensors and web-facing state; each accepted socket is passed
+    to the worker chosen by a hash of the device ID, and the samples that
+    worker decodes come back in batches that are stored and published here.
+    """
+
+    def __init__(self, worker_count):
+        """
+        Initialize the pool.
+
+        Args:
+            worker_count (int): Number of ingest worker processes
+        """
+        self.worker_count = worker_count
+        self.context = multiprocessing.get_context("spawn")
+        self.workers = [None] * worker_count
+        self.devices = {}
+
+    def start(self):
+        """Spawn the worker processes (must be called from the running event loop)."""
+        for index in range(self.worker_count):
+            self._start_worker(index)
+        Logger.log_message(f"Ingest pool started with {self.worker_count} workers")
+
+    def _start_worker(self, index):
+        """
+        Spawn one worker process and listen to its pipe.
+
+        Args:
+            index (int): Worker slot
+        """
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(target=run_ingest_worker, args=(child_conn,), daemon=True)
+        process.start()
+        child_conn.close()
+        self.workers[index] = (process, parent_conn)
+        asyncio.get_running_loop().add_reader(parent_conn.fileno(), self._on_worker_message, index)
+
+    def shard_for(self, device_id):
+        """
+        Get the worker slot of a device.
+
+        Args:
+            device_id (str): Device identifier
+
+        Returns:
+            int: Worker slot
+        """
+        return zlib.crc32(device_id.encode()) % self.worker_count
+
+    def dispatch(self, client_socket, device_id, device_name, sensors):
+        """
+        Hand a connected socket over to the worker of its shard.
+
+        Args:
+            client_socket: Connected Bluetooth socket, closed here once handed over
+            device_id (str): Unique device identifier
+            device_name (str): Human-readable device name
+            sensors (dict): Sensors registered for the device in this process
+
+        Returns:
+            bool: True if a worker took the connection
+        """
+        index = self.shard_for(device_id)
+        process, conn = self.workers[index]
+        if not process.is_alive():
+            Logger.log_warning(f"Ingest worker {index} unavailable, handling {device_name} in process")
+            return False
+
+        start_times = {sensor_type: sensor.start_time for sensor_type, sensor in sensors.items()}
+        conn.send(("connect", device_id, device_name, start_times))
+        reduction.send_handle(conn, client_socket.fileno(), process.pid)
+        client_socket.close()
+
+        self.devices[device_id] = (index, device_name)
+        Logger.log_message(f"{device_name} (ID: {device_id}) handed to ingest worker {index}")
+        return True
+
+    def _on_worker_message(self, index):
+        """
+        Apply every message waiting on a worker pipe.
+
+        Args:
+            index (int): Worker slot
+        """
+        _, conn = self.workers[index]
+        try:
+            while conn.poll():
+                message = conn.recv()
+                if message[0] == "samples":
+                    self._apply_samples(message[1], message[2])
+                elif message[0] == "metrics":
+                    Metrics.merge(message[1])
+                elif message[0] == "backlog":
+                    self._apply_backlog(index, message[1], message[2])
+                elif message[0] == "timing":
+                    self._apply_timing(message[1], message[2])
+                elif message[0] == "closed":
+                    self._close_device(message[1], message[2], message[3])
+        except (EOFError, OSError):
+            self._restart_worker(index)
+
+    def _apply_samples(self, device_id, batches):
+        """
+        Store a batch of worker-decoded samples and publish one update per sensor.
+
+        Args:
+            device_id (str): Device identifier
+            batches (dict): Per sensor type columns [times, channel values...]
+        """
+        device = DeviceManager.get_all_devices().get(device_id)
+        if device is None:
+            return
+
+        for sensor_type, columns in batches.items():
+            sensor = device["sensors"].get(sensor_type)
+            if sensor is None:
+                continue
+            start_time = sensor.start_time
+            sensor.store_samples([t - start_time for t in columns[0]], columns[1:])
+            SAMPLES.inc(device_id, sensor_type, amount=len(columns[0]))
+
+            # Trace the batch by its oldest sample, the one that waited longest
+            token = LatencyTracker.mark_received(columns[0][0])
+            LatencyTracker.record_since_received("handoff", device_id)
+            DeviceManager.note_sensor_data(device_id, sensor_type)
+            EventBus.publish("sensor_update", {
+                "device_id": device_id,
+                "sensor_type": sensor_type,
+                "data": sensor.get_data(),
+            })
+            LatencyTracker.reset(token)
+
+    def _apply_backlog(self, index, ingest_backlogs, recording_backlog):
+        """
+        Publish the backlogs reported by a worker in this process's metrics and health report.
+
+        Args:
+            index (int): Worker slot
+            ingest_backlogs (dict): Unframed bytes per (device_id,) label tuple
+            recording_backlog (int): Rows waiting for the worker's CSV writer
+        """
+        for labels, size in ingest_backlogs.items():
+            if labels[0] in self.devices:
+                INGEST_BACKLOG.set(size, *labels)
+        RecordingWriter.remote_backlogs[index] = recording_backlog
+
+    def _apply_timing(self, clocks, stats):
+        """
+        Keep the clock estimates and sample statistics reported by a worker for the info API and metrics.
+
+        Args:
+            clocks (dict): ClockSync states keyed by device ID
+            stats (dict): SampleStats snapshots keyed by device ID, then sensor type
+        """
+        ClockSync.states.update({device_id: state for device_id, state in clocks.items() if device_id in self.devices})
+        SampleStats.remote.update({device_id: sensors for device_id, sensors in stats.items()
+                                   if device_id in self.devices})
+
+    def _close_device(self, device_id, message_count, error_count):
+        """
+        Unregister a device whose connection ended in a worker.
+
+        Args:
+            device_id (str): Device identifier
+            message_count (int): Number of processed messages
+            error_count (int): Number of errors encountered
+        """
+        _, device_name = self.devices.pop(device_id, (None, "Unknown"))
+        DeviceManager.unregister_device(device_id)
+        Logger.log_message(f"Connection with {device_name} (ID: {device_id}) terminated. "
+                           f"Stats: {message_count} messages, {error_count} errors")
+
+    def _restart_worker(self, index):
+        """
+        Replace a worker whose pipe closed, dropping the devices it was serving.
+
+        Args:
+            index (int): Worker slot
+        """
+        process, conn = self.workers[index]
+        asyncio.get_running_loop().remove_reader(conn.fileno())
+        conn.close()
+        process.join(timeout=1)
+        Logger.log_error(f"Ingest worker {index} exited with code {process.exitcode}, restarting")
+        RecordingWriter.remote_backlogs.pop(index, None)
+
+        for device_id in [d for d, (slot, _) in self.devices.items() if slot == index]:
+            self._close_device(device_id, 0, 0)
+        self._start_worker(index)
@@ -0,0 +1,574 @@
+import asyncio
+import json
+import os
+from multiprocessing import shared_memory
+from src.connection.event_bus import EventBus
+from src.sensors.calibration import Calibration
+from src.sensors.capture import Capture
+from src.sensors.clock_sync import ClockSync
+from src.sensors.ring_buffer import SampleRing, SharedBlob
+from src.sensors.sample_stats import SampleStats
+from src.sensors.sensor_factory import SensorFactory
+from src.sensors.triggers import TriggerLog
+from src.utils.logging import Logger
+from src.utils.tracing import LatencyTracker
+
+# Size of the shared segment holding the device registry as JSON
+REGISTRY_SEGMENT_SIZE = 1024 * 1024
+
+# Size of the shared segment holding device clock and sample timing statistics as JSON
+TIMING_SEGMENT_SIZE = 1024 * 1024
+
+# Seconds between timing statistics updates in shared memory
+TIMING_PUBLISH_INTERVAL = 1.0
+
+# Bytes queued to a subscriber before it is considered stuck and dropped
+MAX_SUBSCRIBER_BACKLOG = 4 * 1024 * 1024
+
+
+def _attach_segment(name):
+    """
+    Attach to an existing shared memory segment without adopting its lifetime.
+
+    The ingest process creates and unlinks every segment; web workers only
+    attach, so they must not let the resource tracker unlink on exit.
+
+    Args:
+        name (str): Segment name
+
+    Returns:
+        SharedMemory: Attached segment
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track argument
+        segment = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(segment._name, "shared_memory")
+        except Exception:
+            pass
+        return segment
+
+
+class SharedStatePublisher:
+    """
+    Publishes live sensor state from the ingest process to web workers.
+
+    Each sensor gets a SampleRing in its own shared memory segment and the
+    device registry is kept as JSON in a SharedBlob segment. Workers are
+    told about new data over a local Unix socket carrying one JSON line per
+    event; samples themselves are always read from shared memory, while
+    fired triggers and capture events travel whole on the socket. Device
+    clock estimates, sample timing statistics, calibration and capture
+    status are rewritten into a second blob once per
+    TIMING_PUBLISH_INTERVAL, which workers poll. Workers send capture
+    requests back as JSON lines on the same socket.
+    """
+
+    def __init__(self, prefix, pubsub_path, ring_capacity=None):
+        """
+        Initialize the publisher.
+
+        Args:
+            prefix (str): Prefix for shared memory segment names
+            pubsub_path (str): Path of the Unix socket used for notifications
+            ring_capacity (int, optional): Samples kept per shared sensor ring
+        """
+        self.prefix = prefix
+        self.pubsub_path = pubsub_path
+        self.ring_capacity = ring_capacity or int(os.getenv("SHARED_RING_CAPACITY", 4096))
+
+        self.registry_segment = shared_memory.SharedMemory(
+            name=f"{prefix}_registry", create=True, size=REGISTRY_SEGMENT_SIZE
+        )
+        self.registry = SharedBlob(self.registry_segment.buf, create=True)
+        self.registry_version = 0
+        self.published_registry = None
+        self.timing_segment = shared_memory.SharedMemory(
+            name=f"{prefix}_timing", create=True, size=TIMING_SEGMENT_SIZE
+        )
+        self.timing = SharedBlob(self.timing_segment.buf, create=True)
+        self.timing_task = None
+
+        self.rings = {}
+        self.cursors = {}
+        self.dirty_sensors = set()
+        self.flush_scheduled = False
+        self.subscribers = set()
+        self.server = None
+
+        EventBus.subscribe("sensor_update", self.handle_sensor_update)
+        EventBus.subscribe("device_connected", self.handle_registry_change)
+        EventBus.subscribe("device_disconnected", self.handle_registry_change)
+        EventBus.subscribe("device_changed", self.handle_registry_change)
+        EventBus.subscribe("trigger", self.handle_trigger)
+        EventBus.subscribe("capture", self.handle_capture)
+
+        self._write_registry()
+
+    async def start(self):
+        """Start the notification socket server."""
+        if os.path.exists(self.pubsub_path):
+            os.unlink(self.pubsub_path)
+        self.server = await asyncio.start_unix_server(self._handle_subscriber, path=self.pubsub_path)
+        self.timing_task = asyncio.create_task(self._publish_timing())
+        Logger.log_message(f"Shared state publisher listening on {self.pubsub_path}")
+
+    async def _publish_timing(self):
+        """Periodically copy clock estimates, timing statistics, calibration and capture status into shared memory."""
+        while True:
+            await asyncio.sleep(TIMING_PUBLISH_INTERVAL)
+            try:
+                self.timing.write(json.dumps({"clocks": ClockSync.states, "stats": SampleStats.snapshots(),
+                                              "calibration": Calibration.states,
+                                              "capture": Capture.states}).encode())
+            except Exception as e:
+                Logger.log_error(f"Error publishing timing statistics: {e}", key="timing_publish_error")
+
+    async def _handle_subscriber(self, reader, writer):
+        """
+        Serve one web worker subscription until it disconnects, applying its capture requests.
+
+        Args:
+            reader (StreamReader): Subscriber input stream
+            writer (StreamWriter): Subscriber output stream
+        """
+        self.subscribers.add(writer)
+        Logger.log_message(f"Web worker subscribed (total: {len(self.subscribers)})")
+        writer.write(json.dumps({"event": "registry", "version": self.registry_version}).encode() + b"\n")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    command = json.loads(line)
+                    if command.get("command") == "capture":
+                        Capture.request(command["device_id"], command["source"], command["reason"],
+                                        command["pre"], command["post"], command["at"])
+                except (ValueError, KeyError, TypeError) as e:
+                    Logger.log_error(f"Invalid command from web worker: {e}", key="shared_state_command_error")
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            self.subscribers.discard(writer)
+            writer.close()
+            Logger.log_message(f"Web worker unsubscribed (remaining: {len(self.subscribers)})")
+
+    def _broadcast(self, event):
+        """
+        Send an event line to every subscriber, dropping stuck ones.
+
+        Args:
+            event (dict): Event to send
+        """
+        line = json.dumps(event).encode() + b"\n"
+        for writer in list(self.subscribers):
+            if writer.transport.get_write_buffer_size() > MAX_SUBSCRIBER_BACKLOG:
+                Logger.log_warning("Dropping web worker subscription with full backlog")
+                self.subscribers.discard(writer)
+                writer.close()
+                continue
+            writer.write(line)
+
+    def _segment_name(self, device_id, sensor_type):
+        """
+        Build the shared memory segment name of a sensor ring.
+
+        Args:
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type
+
+        Returns:
+            str: Segment name
+        """
+        return f"{self.prefix}_{device_id}_{sensor_type}"
+
+    def _ensure_ring(self, device_id, sensor_type, sensor):
+        """
+        Create the shared ring of a sensor if it does not exist yet.
+
+        Args:
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type
+            sensor (Sensor): Sensor whose samples are published
+
+        Returns:
+            SampleRing: Ring of the sensor
+        """
+        key = (device_id, sensor_type)
+        if key not in self.rings:
+            channel_count = len(sensor.channels)
+            segment = shared_memory.SharedMemory(
+                name=self._segment_name(device_id, sensor_type), create=True,
+                size=SampleRing.required_size(self.ring_capacity, channel_count)
+            )
+            ring = SampleRing(segment.buf, self.ring_capacity, channel_count, create=True)
+            self.rings[key] = (segment, ring)
+            self.cursors[key] = 0
+        return self.rings[key][1]
+
+    def _release_ring(self, key):
+        """
+        Close and unlink the shared ring of a sensor.
+
+        Args:
+            key (tuple): (device_id, sensor_type)
+        """
+        segment, ring = self.rings.pop(key)
+        self.cursors.pop(key, None)
+        self.dirty_sensors.discard(key)
+        ring.release()
+        segment.close()
+        segment.unlink()
+
+    def _write_registry(self):
+        """Rewrite the shared registry if the published device set changed."""
+        from src.connection.bluetooth_server import DeviceManager
+
+        devices = {}
+        for device_id, device in DeviceManager.get_all_devices().items():
+            sensors = {}
+            for sensor_type, sensor in device.get("sensors", {}).items():
+                self._ensure_ring(device_id, sensor_type, sensor)
+                sensors[sensor_type] = {
+                    "segment": self._segment_name(device_id, sensor_type),
+                    "channels": list(sensor.channels),
+                    "start_time": sensor.start_time,
+                    "max_data_points": sensor.max_data_points
+                }
+            devices[device_id] = {
+                "name": device["name"],
+                "connected_at": device["connected_at"],
+                "sensors": sensors
+            }
+
+        if devices == self.published_registry:
+            return
+
+        self.registry_version += 1
+        self.registry.write(json.dumps({"version": self.registry_version, "devices": devices}).encode())
+        self.published_registry = devices
+
+        # Workers have re-read the registry by the time they see the event, so rings
+        # of removed devices can be unlinked now; attached workers keep their mapping
+        for key in [key for key in self.rings if key[0] not in devices or key[1] not in devices[key[0]]["sensors"]]:
+            self._release_ring(key)
+
+        self._broadcast({"event": "registry", "version": self.registry_version})
+
+    def handle_registry_change(self, event_data):
+        """
+        Handle device connection, disconnection and change events.
+
+        Args:
+            event_data (dict): Event data
+        """
+        try:
+            self._write_registry()
+        except Exception as e:
+            Logger.log_error(f"Error publishing device registry: {e}")
+
+    def handle_trigger(self, event_data):
+        """
+        Forward a fired trigger to every web worker.
+
+        Args:
+            event_data (dict): Trigger event
+        """
+        self._broadcast({"event": "trigger", "trigger": event_data})
+
+    def handle_capture(self, event_data):
+        """
+        Forward a capture start, extension or end to every web worker.
+
+        Args:
+            event_data (dict): Capture event
+        """
+        self._broadcast({"event": "capture", "capture": event_data})
+
+    def handle_sensor_update(self, event_data):
+        """
+        Mark a sensor as having new samples and schedule a coalesced flush.
+
+        Args:
+            event_data (dict): Event data containing device_id and sensor_type
+        """
+        self.dirty_sensors.add((event_data["device_id"], event_data["sensor_type"]))
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self):
+        """Copy new samples of dirty sensors into their shared rings and notify workers."""
+        from src.connection.bluetooth_server import DeviceManager
+
+        self.flush_scheduled = False
+        devices = DeviceManager.get_all_devices()
+
+        for key in list(self.dirty_sensors):
+            device_id, sensor_type = key
+            sensor = devices.get(device_id, {}).get("sensors", {}).get(sensor_type)
+            if sensor is None:
+                continue
+            try:
+                ring = self._ensure_ring(device_id, sensor_type, sensor)
+                result = sensor.get_data_since(since=self.cursors[key])
+                data = result["data"]
+                ring.append_many(data["time"], [data[channel] for channel in sensor.channels])
+                self.cursors[key] = result["cursor"]
+                self._broadcast({
+                    "event": "samples",
+                    "device_id": device_id,
+                    "sensor_type": sensor_type,
+                    "seq": ring.sample_count
+                })
+            except Exception as e:
+                Logger.log_error(f"Error publishing samples of {device_id}_{sensor_type}: {e}")
+
+        self.dirty_sensors.clear()
+
+    def close(self):
+        """Unlink every shared segment and stop the notification server."""
+        if self.server is not None:
+            self.server.close()
+        if self.timing_task is not None:
+            self.timing_task.cancel()
+        for key in list(self.rings):
+            self._release_ring(key)
+        self.registry.release()
+        self.registry_segment.close()
+        self.registry_segment.unlink()
+        self.timing.release()
+        self.timing_segment.close()
+        self.timing_segment.unlink()
+        if os.path.exists(self.pubsub_path):
+            os.unlink(self.pubsub_path)
+
+
+class SharedStateMirror:
+    """
+    Keeps a web worker's DeviceManager in sync with the ingest process.
+
+    Sensors are recreated locally from the shared registry and fed from the
+    shared rings, so every local feature (overview pyramid, cursors, status
+    monitor, WebSocket fan-out) works unchanged in each worker while only
+    the ingest process talks to Bluetooth devices.
+    """
+
+    def __init__(self, prefix, pubsub_path):
+        """
+        Initialize the mirror.
+
+        Args:
+            prefix (str): Prefix of shared memory segment names
+            pubsub_path (str): Path of the publisher Unix socket
+        """
+        self.prefix = prefix
+        self.pubsub_path = pubsub_path
+        self.registry_segment = None
+        self.registry = None
+        self.registry_version = 0
+        self.timing_segment = None
+        self.timing = None
+        self.readers = {}
+        self.cursors = {}
+        self.writer = None
+
+    async def run(self):
+        """Attach to shared state and apply notifications until cancelled."""
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.pubsub_path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                await asyncio.sleep(0.2)
+
+        self.registry_segment = _attach_segment(f"{self.prefix}_registry")
+        self.registry = SharedBlob(self.registry_segment.buf)
+        self.timing_segment = _attach_segment(f"{self.prefix}_timing")
+        self.timing = SharedBlob(self.timing_segment.buf)
+        self.writer = writer
+        Capture.forward = self.send_command
+        timing_task = asyncio.create_task(self._poll_timing())
+        Logger.log_message(f"Web worker {os.getpid()} attached to shared state")
+
+        try:
+            self.sync_registry()
+        except Exception as e:
+            Logger.log_error(f"Error reading shared device registry: {e}", key="shared_state_event_error")
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    Logger.log_warning("Shared state publisher closed the connection")
+                    break
+                try:
+                    self._apply_event(json.loads(line))
+                except Exception as e:
+                    # Skip this notification; cursors only advance on success, so the next one retries
+                    Logger.log_error(f"Error applying shared state notification: {e}",
+                                     key="shared_state_event_error")
+        except asyncio.CancelledError:
+            pass
+        finally:
+            Capture.forward = None
+            self.writer = None
+            timing_task.cancel()
+            writer.close()
+            self.close()
+
+    def _apply_event(self, event):
+        """
+        Apply one notification from the publisher.
+
+        Args:
+            event (dict): Decoded notification line
+        """
+        if event["event"] == "registry":
+            self.sync_registry()
+        elif event["event"] == "samples":
+            self.pull_samples(event["device_id"], event["sensor_type"])
+        elif event["event"] == "trigger":
+            TriggerLog.remember(event["trigger"])
+            EventBus.publish("trigger", event["trigger"])
+        elif event["event"] == "capture":
+            EventBus.publish("capture", event["capture"])
+
+    async def _poll_timing(self):
+        """Periodically load the ingest process's clock estimates, timing statistics, calibration and capture status."""
+        while True:
+            await asyncio.sleep(TIMING_PUBLISH_INTERVAL)
+            try:
+                _, payload = self.timing.read()
+                if payload:
+                    timing = json.loads(payload)
+                    ClockSync.states = timing["clocks"]
+                    SampleStats.remote = timing["stats"]
+                    Calibration.states = timing["calibration"]
+                    Capture.states = timing["capture"]
+            except Exception as e:
+                Logger.log_error(f"Error reading timing statistics: {e}", key="timing_read_error")
+
+    def send_command(self, command):
+        """
+        Send a request to the ingest process.
+
+        Args:
+            command (dict): Command with a command name and its arguments
+        """
+        if self.writer is None or self.writer.is_closing():
+            Logger.log_warning("Shared state publisher unavailable, command dropped", key="shared_state_command_lost")
+            return
+        self.writer.write(json.dumps(command).encode() + b"\n")
+
+    def sync_registry(self):
+        """Add and remove local devices and sensors to match the shared registry."""
+        from src.connection.bluetooth_server import DeviceManager
+
+        _, payload = self.registry.read()
+        if not payload:
+            return
+        registry = json.loads(payload)
+        if registry["version"] == self.registry_version:
+            return
+
+        shared_devices = registry["devices"]
+        local_devices = DeviceManager.get_all_devices()
+
+        for device_id in [d for d in local_devices if d not in shared_devices]:
+            for key in [key for key in self.readers if key[0] == device_id]:
+                self._detach(key)
+            DeviceManager.unregister_device(device_id)
+
+        for device_id, device in shared_devices.items():
+            if device_id not in local_devices:
+                DeviceManager.register_device(device_id, device["name"])
+                local_devices[device_id]["connected_at"] = device["connected_at"]
+
+            new_sensors = {}
+            for sensor_type, info in device["sensors"].items():
+                key = (device_id, sensor_type)
+                if key in self.readers:
+                    continue
+                try:
+                    segment = _attach_segment(info["segment"])
+                except FileNotFoundError:
+                    # Device removed again before this worker caught up
+                    continue
+                sensor = SensorFactory.create_sensor(sensor_type, device_id, info["max_data_points"])
+                sensor.start_time = info["start_time"]
+                self.readers[key] = (segment, SampleRing(segment.buf), sensor)
+                self.cursors[key] = 0
+                new_sensors[sensor_type] = sensor
+
+            if new_sensors:
+                DeviceManager.add_sensors(device_id, new_sensors)
+                for sensor_type in new_sensors:
+                    self.pull_samples(device_id, sensor_type)
+
+        # Only a fully applied registry is skipped next time
+        self.registry_version = registry["version"]
+
+    def pull_samples(self, device_id, sensor_type):
+        """
+        Copy samples published since the last pull into the local sensor.
+
+        Args:
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type
+        """
+        from src.connection.bluetooth_server import DeviceManager
+
+        key = (device_id, sensor_type)
+        if key not in self.readers:
+            return
+        _, ring, sensor = self.readers[key]
+
+        batch = ring.read_since(self.cursors[key])
+        if not batch["time"]:
+            return
+        if batch["gap"]:
+            Logger.log_warning(f"Web worker fell behind on {device_id}_{sensor_type}, samples skipped")
+
+        for i, timestamp in enumerate(batch["time"]):
+            sensor.store_sample(timestamp, tuple(column[i] for column in batch["values"]), filtered=True)
+        self.cursors[key] = batch["last_seq"]
+
+        # Stored times are relative to the sensor start; trace by the oldest new sample
+        token = LatencyTracker.mark_received(sensor.start_time + batch["time"][0])
+        DeviceManager.note_sensor_data(device_id, sensor_type)
+        EventBus.publish("sensor_update", {
+            "device_id": device_id,
+            "sensor_type": sensor_type,
+            "data": sensor.get_data(),
+        })
+        LatencyTracker.reset(token)
+
+    def _detach(self, key):
+        """
+        Drop the local reader of a sensor ring.
+
+        Args:
+            key (tuple): (device_id, sensor_type)
+        """
+        segment, ring, _ = self.readers.pop(key)
+        self.cursors.pop(key, None)
+        ring.release()
+        segment.close()
+
+    def close(self):
+        """Detach from every shared segment."""
+        for key in list(self.readers):
+            self._detach(key)
+        if self.registry is not None:
+            self.registry.release()
+            self.registry_segment.close()
+            self.registry = None
+        if self.timing is not None:
+            self.timing.release()
+            self.timing_segment.close()
+            self.timing = None
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import math
+import random
+import socket
+import time
+from src.connection.bluetooth_server import DeviceManager
+from src.utils.logging import Logger
+
+# Seconds between writes of each simulated device; samples due in between are sent together
+DEFAULT_WRITE_INTERVAL = 0.02
+
+
+class DeviceSimulator:
+    """
+    Feeds simulated phones through the normal device connection path.
+
+    Each simulated device gets one end of a local socket pair, handed to
+    BluetoothConnection.handle_client like an accepted Bluetooth socket,
+    while a task writes accelerometer, gyroscope and magnetometer messages
+    into the other end at the configured rate. Everything downstream
+    (framing, ingest workers, storage, recording, WebSocket fan-out) runs
+    exactly as for real devices, so the server can be load tested without
+    Bluetooth hardware. Messages carry a millisecond timestamp from a
+    simulated device clock, offset and drifting from the server's, and a
+    per-sensor sequence number.
+    """
+
+    def __init__(self, connection, device_count, sample_rate, write_interval=DEFAULT_WRITE_INTERVAL):
+        """
+        Initialize the simulator.
+
+        Args:
+            connection (BluetoothConnection): Connection handler receiving the simulated sockets
+            device_count (int): Number of simulated devices
+            sample_rate (float): Samples per second of each sensor
+            write_interval (float): Seconds between socket writes of each device
+        """
+        self.connection = connection
+        self.device_count = device_count
+        self.sample_rate = sample_rate
+        self.write_interval = write_interval
+
+    async def run(self):
+        """Connect every simulated device and feed them until cancelled."""
+        Logger.log_message(f"Simulating {self.device_count} devices at {self.sample_rate:g} samples/s per sensor")
+        await asyncio.gather(*(self._run_device(index) for index in range(self.device_count)))
+
+    async def _run_device(self, index):
+        """
+        Connect one simulated device and write its messages until the server closes the connection.
+
+        Args:
+            index (int): Device number, also seeding its signals
+        """
+        server_end, device_end = socket.socketpair()
+        device_end.setblocking(False)
+        device_id = DeviceManager.generate_device_id()
+        asyncio.create_task(self.connection.handle_client(server_end, device_id, f"Simulated {index + 1}"))
+
+        loop = asyncio.get_running_loop()
+        rng = random.Random(index)
+        phase = rng.uniform(0, 2 * math.pi)
+        clock_offset = rng.uniform(-5.0, 5.0)
+        clock_rate = 1.0 + rng.uniform(-50e-6, 50e-6)
+        device_start = time.time() + clock_offset
+        started = time.monotonic()
+        sent = 0
+        try:
+            while True:
+                await asyncio.sleep(self.write_interval)
+                due = int((time.monotonic() - started) * self.sample_rate)
+                if due <= sent:
+                    continue
+                messages = []
+                for sample in range(sent, due):
+                    t = sample / self.sample_rate
+                    device_time = round((device_start + t * clock_rate) * 1000, 3)
+                    messages.extend(self._messages(t + phase, rng, device_time, sample))
+                sent = due
+                await loop.sock_sendall(device_end, "".join(messages).encode())
+        except (BrokenPipeError, ConnectionResetError):
+            Logger.log_message(f"Simulated device {index + 1} disconnected by the server")
+        finally:
+            device_end.close()
+
+    @staticmethod
+    def _messages(t, rng, device_time, seq):
+        """
+        Build one message per sensor for a point in time.
+
+        Args:
+            t (float): Signal time in seconds
+            rng (random.Random): Noise source
+            device_time (float): Simulated device clock in milliseconds
+            seq (int): Sample number
+
+        Returns:
+            list: Encoded JSON messages, one per sensor
+        """
+        def noise():
+            return rng.gauss(0, 0.05)
+
+        return [
+            json.dumps({"type": "accelerometer", "timestamp": device_time, "seq": seq,
+                        "x": round(0.8 * math.sin(2 * math.pi * 1.0 * t) + noise(), 5),
+                        "y": round(0.4 * math.cos(2 * math.pi * 0.5 * t) + noise(), 5),
+                        "z": round(9.81 + 0.2 * math.sin(2 * math.pi * 2.0 * t) + noise(), 5)}),
+            json.dumps({"type": "gyroscope", "timestamp": device_time, "seq": seq,
+                        "x": round(0.3 * math.sin(2 * math.pi * 0.7 * t) + noise(), 5),
+                        "y": round(0.2 * math.sin(2 * math.pi * 1.3 * t) + noise(), 5),
+                        "z": round(0.1 * math.cos(2 * math.pi * 0.3 * t) + noise(), 5)}),
+            json.dumps({"type": "magnetometer", "timestamp": device_time, "seq": seq,
+                        "x": round(25 * math.cos(0.2 * t) + noise(), 5),
+                        "y": round(25 * math.sin(0.2 * t) + noise(), 5),
+                        "z": round(-40 + noise(), 5)}),
+        ]
@@ -3,8 +3,22 @@ import json
 import time
 from typing import Dict, List, Set
 from fastapi import WebSocket
+from src.utils.health import HealthMonitor, STATUSES
 from src.utils.logging import Logger
+from src.utils.metrics import Metrics
+from src.utils.profiling import Profiler
+from src.utils.tracing import LatencyTracker
 from src.connection.event_bus import EventBus
+from src.sensors.base_sensor import DEFAULT_OVERVIEW_POINTS
+from src.sensors.capture import Capture
+from src.sensors.spectrum import SpectrumAnalyzer
+from src.sensors.triggers import TriggerLog
+
+# Fan-out metrics; channel is one of sensor, spectrum, status, device_list
+WS_SEND_SECONDS = Metrics.histogram("pub_websocket_send_seconds", "Time to send one WebSocket message", ("channel",))
+WS_SEND_FAILURES = Metrics.counter("pub_websocket_send_failures_total", "Failed WebSocket sends", ("channel",))
+WS_DROPPED = Metrics.counter("pub_websocket_dropped_clients_total", "Clients dropped after a failed send",
+                             ("channel",))
 
 
 class WebSocketManager:
@@ -14,25 +28,47 @@ class WebSocketManager:
         """Initialize the WebSocket manager."""
         self.active_connections: Dict[str, List[WebSocket]] = {}
         self.device_list_connections: Set[WebSocket] = set()
+        self.status_connections: Dict[str, Set[WebSocket]] = {}
+        # Spectrum clients grouped by (device_id, sensor_type, method, fields), one message per group
+        self.spectrum_connections: Dict[tuple, Set[WebSocket]] = {}
 
         self.connection_stats = {
             "total_sensor_connections": 0,
             "total_device_list_connections": 0,
             "messages_sent": 0,
             "last_device_update": None,
-            "failed_sends": 0
+            "failed_sends": 0,
+            "start_time": time.time()
         }
 
         self.last_device_list_update = None
         self.device_update_debounce_time = 0.5  # 500ms debounce
+        self.device_list_version = 0
+        self.pending_device_list_flush = None
+
+        # Sensor update sends scheduled by EventBus callbacks and not finished yet
+        self.pending_sensor_updates = 0
+
+        Metrics.gauge("pub_eventbus_pending_updates", "Sensor update sends queued behind the EventBus",
+                      function=lambda: {(): self.pending_sensor_updates})
+        Metrics.gauge("pub_websocket_connections", "Open WebSocket connections", ("channel",),
+                      function=self._connection_gauge)
+
+        HealthMonitor.register_check("websocket", self.get_health_status)
 
         EventBus.subscribe("sensor_update", self.handle_sensor_update)
         EventBus.subscribe("device_connected", self.handle_device_connected)
         EventBus.subscribe("device_disconnected", self.handle_device_disconnected)
+        EventBus.subscribe("device_changed", self.handle_device_changed)
+        EventBus.subscribe("sensor_status", self.handle_sensor_status)
+        EventBus.subscribe("spectrum_update", self.handle_spectrum_update)
+        EventBus.subscribe("trigger", self.handle_trigger)
+        EventBus.subscribe("capture", self.handle_capture)
 
         Logger.log_message("WebSocketManager initialized with reactive configuration")
 
-    async def connect(self, websocket: WebSocket, device_id: str, sensor_type: str):
+    async def connect(self, websocket: WebSocket, device_id: str, sensor_type: str,
+                      history_points: int = None, history_span: float = None):
         """
         Connect a new WebSocket for specific sensor.
 
@@ -40,6 +76,8 @@ class WebSocketManager:
             websocket (WebSocket): WebSocket connection
             device_id (str): Device identifier
             sensor_type (str): Sensor type
+            history_points (int, optional): Send a downsampled history of at most this many points
+            history_span (float, optional): Length in seconds of the downsampled history
         """
         await websocket.accept()
 
@@ -52,7 +90,7 @@ class WebSocketManager:
 
         Logger.log_message(f"WebSocket connected: {client_key} (total: {len(self.active_connections[client_key])})")
 
-        await self.send_historical_data(websocket, device_id, sensor_type)
+        await self.send_historical_data(websocket, device_id, sensor_type, history_points, history_span)
         await self.send_connection_stats(websocket)
 
     async def connect_device_list(self, websocket: WebSocket):
@@ -70,6 +108,236 @@ class WebSocketManager:
 
         await self.send_device_list_update(websocket)
 
+    async def connect_status(self, websocket: WebSocket, device_id: str):
+        """
+        Connect a WebSocket to receive sensor status transitions, trigger and capture events of a device.
+
+        Args:
+            websocket (WebSocket): WebSocket connection
+            device_id (str): Device identifier
+        """
+        from src.connection.bluetooth_server import DeviceManager
+
+        await websocket.accept()
+        self.status_connections.setdefault(device_id, set()).add(websocket)
+
+        Logger.log_message(f"WebSocket connected for status of {device_id} "
+                           f"(total: {len(self.status_connections[device_id])})")
+
+        try:
+            await websocket.send_text(json.dumps({
+                "type": "sensor_status_snapshot",
+                "device_id": device_id,
+                "connected": device_id in DeviceManager.get_all_devices(),
+                "sensors": DeviceManager.get_sensor_statuses(device_id),
+                "thresholds": {
+                    "stale": DeviceManager.stale_threshold,
+                    "inactive": DeviceManager.inactive_threshold
+                },
+                "trigger_seq": TriggerLog.counts.get(device_id, 0),
+                "recording": Capture.states.get(device_id, {"mode": "continuous"}),
+                "timestamp": time.time()
+            }))
+            self.connection_stats["messages_sent"] += 1
+        except Exception as e:
+            Logger.log_error(f"Error sending status snapshot: {e}")
+            self.connection_stats["failed_sends"] += 1
+
+    def disconnect_status(self, websocket: WebSocket, device_id: str):
+        """
+        Disconnect a WebSocket from device status updates.
+
+        Args:
+            websocket (WebSocket): WebSocket connection
+            device_id (str): Device identifier
+        """
+        connections = self.status_connections.get(device_id)
+        if connections is not None:
+            connections.discard(websocket)
+            if not connections:
+                del self.status_connections[device_id]
+
+        Logger.log_message(f"Status WebSocket disconnected: {device_id}")
+
+    async def send_status_message(self, device_id: str, message: dict):
+        """
+        Send a status message to every status client of a device.
+
+        Args:
+            device_id (str): Device identifier
+            message (dict): Message to send
+        """
+        connections = self.status_connections.get(device_id)
+        if not connections:
+            return
+
+        message_json = json.dumps(message)
+        failed_connections = []
+
+        for websocket in connections.copy():
+            try:
+                send_start = time.perf_counter()
+                await websocket.send_text(message_json)
+                WS_SEND_SECONDS.observe(time.perf_counter() - send_start, "status")
+                self.connection_stats["messages_sent"] += 1
+            except Exception as e:
+                Logger.log_error(f"Error sending status update for {device_id}: {e}")
+                failed_connections.append(websocket)
+                self.connection_stats["failed_sends"] += 1
+                WS_SEND_FAILURES.inc("status")
+
+        for websocket in failed_connections:
+            self.disconnect_status(websocket, device_id)
+            WS_DROPPED.inc("status")
+
+    async def connect_spectrum(self, websocket: WebSocket, device_id: str, sensor_type: str,
+                               method: str, fields: tuple = None):
+        """
+        Connect a WebSocket to the spectrum stream of a sensor.
+
+        Args:
+            websocket (WebSocket): WebSocket connection
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type
+            method (str): Spectrum method, "welch" or "fft"
+            fields (tuple, optional): Channels to include, defaults to all
+        """
+        from src.connection.bluetooth_server import DeviceManager
+
+        await websocket.accept()
+        self.spectrum_connections.setdefault((device_id, sensor_type, method, fields), set()).add(websocket)
+
+        Logger.log_message(f"WebSocket connected for {method} spectrum of {device_id}_{sensor_type}")
+
+        try:
+            sensor = DeviceManager.get_all_devices().get(device_id, {}).get("sensors", {}).get(sensor_type)
+            if sensor is None:
+                await websocket.send_text(json.dumps({
+                    "type": "no_data",
+                    "device_id": device_id,
+                    "sensor_type": sensor_type,
+                    "message": "Sensor not found or no data available"
+                }))
+                return
+            analyzer = SpectrumAnalyzer.get(device_id, sensor_type, sensor)
+            await websocket.send_text(json.dumps(self._spectrum_message(device_id, sensor_type, analyzer,
+                                                                        method, fields)))
+            self.connection_stats["messages_sent"] += 1
+        except Exception as e:
+            Logger.log_error(f"Error sending spectrum: {e}")
+            self.connection_stats["failed_sends"] += 1
+
+    def disconnect_spectrum(self, websocket: WebSocket, device_id: str, sensor_type: str,
+                            method: str, fields: tuple = None):
+        """
+        Disconnect a WebSocket from a spectrum stream.
+
+        Args:
+            websocket (WebSocket): WebSocket connection
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type
+            method (str): Spectrum method
+            fields (tuple, optional): Channels of the subscription
+        """
+        key = (device_id, sensor_type, method, fields)
+        connections = self.spectrum_connections.get(key)
+        if connections is not None:
+            connections.discard(websocket)
+            if not connections:
+                del self.spectrum_connections[key]
+
+        Logger.log_message(f"Spectrum WebSocket disconnected: {device_id}_{sensor_type}")
+
+    @staticmethod
+    def _spectrum_message(device_id, sensor_type, analyzer, method, fields):
+        """
+        Build a spectrum message from the analyzer's cached result.
+
+        Args:
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type
+            analyzer (SpectrumAnalyzer): Analyzer of the sensor
+            method (str): Spectrum method
+            fields (tuple, optional): Channels to include
+
+        Returns:
+            dict: Message to send
+        """
+        message = {"type": "spectrum", "device_id": device_id, "sensor_type": sensor_type}
+        message.update(analyzer.result(method, fields))
+        message["timestamp"] = time.time()
+        return message
+
+    def _resume_spectrum(self, device_id: str, sensor_type: str):
+        """
+        Restart the analyzer of a sensor that still has spectrum clients (after a reconnect).
+
+        Args:
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type
+        """
+        from src.connection.bluetooth_server import DeviceManager
+
+        if not any(key[:2] == (device_id, sensor_type) for key in self.spectrum_connections):
+            return
+        sensor = DeviceManager.get_all_devices().get(device_id, {}).get("sensors", {}).get(sensor_type)
+        if sensor is not None:
+            SpectrumAnalyzer.get(device_id, sensor_type, sensor)
+
+    def handle_spectrum_update(self, event_data):
+        """
+        Handle completed spectrum segments (Event Bus callback).
+
+        Args:
+            event_data (dict): Event data containing device_id and sensor_type
+        """
+        try:
+            device_id = event_data["device_id"]
+            sensor_type = event_data["sensor_type"]
+            analyzer = SpectrumAnalyzer.analyzers.get((device_id, sensor_type))
+            if analyzer is None:
+                return
+
+            for key in list(self.spectrum_connections):
+                if key[:2] != (device_id, sensor_type):
+                    continue
+                message_json = json.dumps(self._spectrum_message(device_id, sensor_type, analyzer, key[2], key[3]))
+                task = asyncio.create_task(self.send_spectrum_update(key, message_json))
+                task.add_done_callback(lambda t: self._handle_task_result(t, f"spectrum_{device_id}_{sensor_type}"))
+
+        except Exception as e:
+            Logger.log_error(f"Error processing spectrum update: {e}")
+
+    async def send_spectrum_update(self, key: tuple, message_json: str):
+        """
+        Send one serialized spectrum message to every client of a group.
+
+        Args:
+            key (tuple): (device_id, sensor_type, method, fields) group
+            message_json (str): Serialized message
+        """
+        connections = self.spectrum_connections.get(key)
+        if not connections:
+            return
+
+        failed_connections = []
+        for websocket in connections.copy():
+            try:
+                send_start = time.perf_counter()
+                await websocket.send_text(message_json)
+                WS_SEND_SECONDS.observe(time.perf_counter() - send_start, "spectrum")
+                self.connection_stats["messages_sent"] += 1
+            except Exception as e:
+                Logger.log_error(f"Error sending spectrum to {key[0]}_{key[1]}: {e}",
+                                 key=f"ws_spectrum_error_{key[0]}_{key[1]}")
+                failed_connections.append(websocket)
+                self.connection_stats["failed_sends"] += 1
+                WS_SEND_FAILURES.inc("spectrum")
+
+        for websocket in failed_connections:
+            self.disconnect_spectrum(websocket, *key)
+            WS_DROPPED.inc("spectrum")
+
     def disconnect(self, websocket: WebSocket, device_id: str, sensor_type: str):
         """
         Disconnect a WebSocket from specific sensor.
@@ -102,7 +370,8 @@ class WebSocketManager:
         self.connection_stats["total_device_list_connections"] -= 1
         Logger.log_message(f"Device list WebSocket disconnected (remaining: {len(self.device_list_connections)})")
 
-    async def send_historical_data(self, websocket: WebSocket, device_id: str, sensor_type: str):
+    async def send_historical_data(self, websocket: WebSocket, device_id: str, sensor_type: str,
+                                   history_points: int = None, history_span: float = None):
         """
         Send historical data when connecting.
 
@@ -110,6 +379,8 @@ class WebSocketManager:
             websocket (WebSocket): WebSocket connection
             device_id (str): Device identifier
             sensor_type (str): Sensor type
+            history_points (int, optional): Send a downsampled history of at most this many points
+            history_span (float, optional): Length in seconds of the downsampled history
         """
         try:
             from src.connection.bluetooth_server import DeviceManager
@@ -117,7 +388,14 @@ class WebSocketManager:
             devices = DeviceManager.get_all_devices()
             if device_id in devices and sensor_type in devices[device_id]["sensors"]:
                 sensor = devices[device_id]["sensors"][sensor_type]
-                data = sensor.get_data()
+
+                resolution = None
+                if history_points or history_span:
+                    data = sensor.get_overview(max_points=history_points or DEFAULT_OVERVIEW_POINTS,
+                                               span=history_span)
+                    resolution = data.pop("resolution", None)
+                else:
+                    data = sensor.get_data()
 
                 current_time = time.time()
                 data_points = len(data.get("time", []))
@@ -130,7 +408,8 @@ class WebSocketManager:
                     "metadata": {
                         "data_points": data_points,
                         "timestamp": current_time,
-                        "has_data": data_points > 0
+                        "has_data": data_points > 0,
+                        "resolution": resolution
                     }
                 }
 
@@ -167,20 +446,17 @@ class WebSocketManager:
 
     async def send_device_list_update(self, websocket: WebSocket = None):
         """
-        Send device list update with debounce.
+        Send a full device list snapshot.
 
         Args:
-            websocket (WebSocket, optional): Specific WebSocket. If None, sends to all.
+            websocket (WebSocket, optional): Specific WebSocket. If None, schedules
+                a coalesced patch broadcast to all clients instead.
         """
-        current_time = time.time()
-
-        # Debounce to avoid update spam
-        if (self.last_device_list_update and
-                current_time - self.last_device_list_update < self.device_update_debounce_time):
-            Logger.log_message("Device update in debounce, skipping...")
+        if websocket is None:
+            self.schedule_device_list_update()
             return
 
-        self.last_device_list_update = current_time
+        current_time = time.time()
 
         try:
             from src.connection.bluetooth_server import DeviceManager
@@ -189,6 +465,7 @@ class WebSocketManager:
 
             message = {
                 "type": "device_list_update",
+                "version": DeviceManager.version,
                 "devices": devices,
                 "metadata": {
                     "device_count": len(devices),
@@ -197,29 +474,106 @@ class WebSocketManager:
                 }
             }
 
-            message_json = json.dumps(message)
+            await websocket.send_text(json.dumps(message))
+            self.connection_stats["messages_sent"] += 1
+            Logger.log_message(f"Device list sent to specific client ({len(devices)} devices)")
 
-            if websocket:
-                await websocket.send_text(message_json)
-                self.connection_stats["messages_sent"] += 1
-                Logger.log_message(f"Device list sent to specific client ({len(devices)} devices)")
+        except Exception as e:
+            Logger.log_message(f"Error sending device list: {e}")
+            self.connection_stats["failed_sends"] += 1
+
+    def schedule_device_list_update(self):
+        """
+        Schedule a coalesced device list broadcast.
+
+        Uses a trailing-edge debounce: changes arriving while a broadcast is
+        pending are folded into it, and a broadcast always follows the last
+        change, so the final state is never dropped.
+        """
+        if self.pending_device_list_flush is not None:
+            return
+
+        self.pending_device_list_flush = asyncio.create_task(self._flush_device_list_updates())
+        self.pending_device_list_flush.add_done_callback(
+            lambda t: self._handle_task_result(t, "device_list_flush")
+        )
+
+    async def _flush_device_list_updates(self):
+        """Wait out the debounce window, then broadcast accumulated changes."""
+        try:
+            if self.last_device_list_update:
+                delay = self.last_device_list_update + self.device_update_debounce_time - time.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+        finally:
+            # Changes from here on schedule a new flush instead of being folded into this one
+            self.pending_device_list_flush = None
+
+        self.last_device_list_update = time.time()
+        await self.broadcast_device_list_patch()
+
+    async def broadcast_device_list_patch(self):
+        """Send device list entries changed since the last broadcast to all clients."""
+        from src.connection.bluetooth_server import DeviceManager
+
+        current_time = time.time()
+        DeviceManager.refresh_sensor_status(publish=False)
+
+        if not self.device_list_connections:
+            self.device_list_version = DeviceManager.version
+            return
+
+        if DeviceManager.version == self.device_list_version:
+            return
+
+        try:
+            changes = DeviceManager.get_changes_since(self.device_list_version)
+
+            if changes["full"]:
+                message = {
+                    "type": "device_list_update",
+                    "version": changes["version"],
+                    "devices": changes["changed"],
+                    "metadata": {
+                        "device_count": len(changes["changed"]),
+                        "timestamp": current_time,
+                        "active_connections": len(self.device_list_connections)
+                    }
+                }
             else:
-                failed_connections = []
-                sent_count = 0
-
-                for ws in self.device_list_connections.copy():
-                    try:
-                        await ws.send_text(message_json)
-                        sent_count += 1
-                        self.connection_stats["messages_sent"] += 1
-                    except Exception as e:
-                        Logger.log_message(f"Error sending device list: {e}")
-                        failed_connections.append(ws)
-                        self.connection_stats["failed_sends"] += 1
-
-                for ws in failed_connections:
-                    self.device_list_connections.discard(ws)
-                    self.connection_stats["total_device_list_connections"] -= 1
+                message = {
+                    "type": "device_list_patch",
+                    "base_version": self.device_list_version,
+                    "version": changes["version"],
+                    "changed": changes["changed"],
+                    "removed": changes["removed"],
+                    "metadata": {
+                        "device_count": len(DeviceManager.devices),
+                        "timestamp": current_time,
+                        "active_connections": len(self.device_list_connections)
+                    }
+                }
+
+            self.device_list_version = changes["version"]
+            message_json = json.dumps(message)
+            failed_connections = []
+
+            for ws in self.device_list_connections.copy():
+                try:
+                    send_start = time.perf_counter()
+                    await ws.send_text(message_json)
+                    WS_SEND_SECONDS.observe(time.perf_counter() - send_start, "device_list")
+                    self.connection_stats["messages_sent"] += 1
+                except Exception as e:
+                    Logger.log_message(f"Error sending device list: {e}")
+                    failed_connections.append(ws)
+                    self.connection_stats["failed_sends"] += 1
+                    WS_SEND_FAILURES.inc("device_list")
+
+            for ws in failed_connections:
+                self.device_list_connections.discard(ws)
+                self.connection_stats["total_device_list_connections"] -= 1
+                WS_DROPPED.inc("device_list")
 
             self.connection_stats["last_device_update"] = current_time
 
@@ -239,11 +593,15 @@ class WebSocketManager:
             sensor_type = event_data["sensor_type"]
             data = event_data["data"]
 
+            if self.spectrum_connections and (device_id, sensor_type) not in SpectrumAnalyzer.analyzers:
+                self._resume_spectrum(device_id, sensor_type)
+
             task = asyncio.create_task(
                 self.send_sensor_update(device_id, sensor_type, data)
             )
+            self.pending_sensor_updates += 1
 
-            task.add_done_callback(lambda t: self._handle_task_result(t, f"sensor_update_{device_id}_{sensor_type}"))
+            task.add_done_callback(lambda t: self._handle_sensor_update_done(t, device_id, sensor_type))
 
         except Exception as e:
             Logger.log_error(f"Error processing sensor update: {e}")
@@ -259,8 +617,7 @@ class WebSocketManager:
             device_name = event_data.get('device_name', 'Unknown')
             Logger.log_message(f"Device connected: {device_name}")
 
-            task = asyncio.create_task(self.send_device_list_update())
-            task.add_done_callback(lambda t: self._handle_task_result(t, "device_connected"))
+            self.schedule_device_list_update()
 
         except Exception as e:
             Logger.log_error(f"Error processing device connection: {e}")
@@ -276,12 +633,107 @@ class WebSocketManager:
             device_name = event_data.get('device_name', 'Unknown')
             Logger.log_message(f"Device disconnected: {device_name}")
 
-            task = asyncio.create_task(self.send_device_list_update())
-            task.add_done_callback(lambda t: self._handle_task_result(t, "device_disconnected"))
+            self.schedule_device_list_update()
+
+            device_id = event_data.get("device_id")
+            if device_id in self.status_connections:
+                task = asyncio.create_task(self.send_status_message(device_id, {
+                    "type": "device_disconnected",
+                    "device_id": device_id,
+                    "timestamp": time.time()
+                }))
+                task.add_done_callback(lambda t: self._handle_task_result(t, f"device_disconnected_{device_id}"))
 
         except Exception as e:
             Logger.log_message(f"Error processing device disconnection: {e}")
 
+    def handle_sensor_status(self, event_data):
+        """
+        Handle sensor liveness transitions (Event Bus callback).
+
+        Args:
+            event_data (dict): Event data with device_id, sensor_type and status
+        """
+        try:
+            device_id = event_data["device_id"]
+            if device_id not in self.status_connections:
+                return
+
+            message = {"type": "sensor_status"}
+            message.update(event_data)
+
+            task = asyncio.create_task(self.send_status_message(device_id, message))
+            task.add_done_callback(lambda t: self._handle_task_result(t, f"sensor_status_{device_id}"))
+
+        except Exception as e:
+            Logger.log_error(f"Error processing sensor status: {e}")
+
+    def handle_trigger(self, event_data):
+        """
+        Push a fired trigger to the status clients of its device (Event Bus callback).
+
+        Args:
+            event_data (dict): Trigger event with device_id, sensor_type, trigger and seq
+        """
+        try:
+            device_id = event_data["device_id"]
+            if device_id not in self.status_connections:
+                return
+
+            message = {"type": "trigger"}
+            message.update(event_data)
+
+            task = asyncio.create_task(self.send_status_message(device_id, message))
+            task.add_done_callback(lambda t: self._handle_task_result(t, f"trigger_{device_id}"))
+
+        except Exception as e:
+            Logger.log_error(f"Error processing trigger: {e}")
+
+    def handle_capture(self, event_data):
+        """
+        Push a capture start, extension or end to the status clients of its device (Event Bus callback).
+
+        Args:
+            event_data (dict): Capture with device_id, id and status
+        """
+        try:
+            device_id = event_data["device_id"]
+            if device_id not in self.status_connections:
+                return
+
+            message = {"type": "capture"}
+            message.update(event_data)
+
+            task = asyncio.create_task(self.send_status_message(device_id, message))
+            task.add_done_callback(lambda t: self._handle_task_result(t, f"capture_{device_id}"))
+
+        except Exception as e:
+            Logger.log_error(f"Error processing capture: {e}")
+
+    def handle_device_changed(self, event_data):
+        """
+        Handle device registry change events (sensors attached, status changes).
+
+        Args:
+            event_data (dict): Event data containing device_id and version
+        """
+        try:
+            self.schedule_device_list_update()
+        except Exception as e:
+            Logger.log_error(f"Error processing device change: {e}")
+
+    def _handle_sensor_update_done(self, task, device_id, sensor_type):
+        """
+        Account for a finished sensor update send.
+
+        Args:
+            task: Completed task
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type
+        """
+        self.pending_sensor_updates -= 1
+        self._handle_task_result(task, f"sensor_update_{device_id}_{sensor_type}")
+
     def _handle_task_result(self, task, context):
         """
         Handle asynchronous task results.
@@ -297,6 +749,7 @@ class WebSocketManager:
         except Exception:
             pass  # Ignore logging errors
 
+    @Profiler.timed("send_sensor_update")
     async def send_sensor_update(self, device_id: str, sensor_type: str, data: dict):
         """
         Send sensor data update to WebSocket clients.
@@ -311,6 +764,11 @@ class WebSocketManager:
         if client_key not in self.active_connections:
             return
 
+        # The task inherited the receive time marked by the ingest path that published the update
+        received_at = LatencyTracker.received_at()
+        LatencyTracker.record_since_received("dispatch", device_id, received_at)
+        fanout_start = time.perf_counter()
+
         current_time = time.time()
         data_points = len(data.get("time", []))
 
@@ -322,6 +780,7 @@ class WebSocketManager:
             "metadata": {
                 "data_points": data_points,
                 "timestamp": current_time,
+                "received_at": received_at,
                 "latest_value": {
                     "x": data.get("x", [None])[-1] if data.get("x") else None,
                     "y": data.get("y", [None])[-1] if data.get("y") else None,
@@ -339,16 +798,24 @@ class WebSocketManager:
 
         for websocket in connections_copy:
             try:
+                send_start = time.perf_counter()
                 await websocket.send_text(message_json)
+                WS_SEND_SECONDS.observe(time.perf_counter() - send_start, "sensor")
                 sent_count += 1
                 self.connection_stats["messages_sent"] += 1
             except Exception as e:
-                Logger.log_error(f"Error sending WebSocket data to {client_key}: {e}")
+                Logger.log_error(f"Error sending WebSocket data to {client_key}: {e}", key=f"ws_send_error_{client_key}")
                 failed_connections.append(websocket)
                 self.connection_stats["failed_sends"] += 1
+                WS_SEND_FAILURES.inc("sensor")
 
         for websocket in failed_connections:
             self.disconnect(websocket, device_id, sensor_type)
+            WS_DROPPED.inc("sensor")
+
+        if sent_count:
+            LatencyTracker.record("send", device_id, time.perf_counter() - fanout_start)
+            LatencyTracker.record_since_received("delivered", device_id, received_at)
 
     def get_connection_count(self):
         """
@@ -368,6 +835,20 @@ class WebSocketManager:
             "stats": self.connection_stats.copy()
         }
 
+    def _connection_gauge(self):
+        """
+        Get open connection counts for the connections gauge.
+
+        Returns:
+            dict: Connection count keyed by (channel,)
+        """
+        return {
+            ("sensor",): sum(len(connections) for connections in self.active_connections.values()),
+            ("spectrum",): sum(len(connections) for connections in self.spectrum_connections.values()),
+            ("status",): sum(len(connections) for connections in self.status_connections.values()),
+            ("device_list",): len(self.device_list_connections),
+        }
+
     def get_health_status(self):
         """
         Get WebSocket Manager health status.
@@ -380,12 +861,17 @@ class WebSocketManager:
 
         total_attempts = self.connection_stats["messages_sent"] + self.connection_stats["failed_sends"]
         failure_rate = (self.connection_stats["failed_sends"] / total_attempts * 100) if total_attempts > 0 else 0
+        statuses = (
+            HealthMonitor.classify(failure_rate, "WS_FAILURE_RATE", 10, 50),
+            HealthMonitor.classify(self.pending_sensor_updates, "PENDING_UPDATES", 1000, 10000),
+        )
 
         return {
-            "status": "healthy" if failure_rate < 10 else "degraded" if failure_rate < 50 else "unhealthy",
+            "status": max(statuses, key=STATUSES.index),
             "timestamp": current_time,
             "connections": stats,
             "failure_rate_percent": round(failure_rate, 2),
+            "pending_sensor_updates": self.pending_sensor_updates,
             "last_device_update": self.connection_stats["last_device_update"],
-            "uptime_seconds": current_time - (self.connection_stats.get("start_time", current_time))
+            "uptime_seconds": current_time - self.connection_stats["start_time"]
         }
\ No newline at end of file
@@ -1,8 +1,8 @@
 from datetime import datetime
 import os
 import time
-from collections import deque
 from src.utils.logging import Logger
+from src.sensors.recording import RecordingWriter
 from src.sensors.base_sensor import Sensor, ACCELEROMETER, DIVIDER, EXTENSION
 from src.connection.event_bus import EventBus
 
@@ -10,14 +10,12 @@ from src.connection.event_bus import EventBus
 class Accelerometer(Sensor):
     """Accelerometer sensor implementation."""
 
+    sensor_type = ACCELEROMETER
+
     def initialize_data_storage(self):
-        """Initialize data storage structures for accelerometer."""
+        """Initialize timing state for accelerometer."""
         self.header_time = datetime.now()
         self.start_time = time.time()
-        self.data_t = deque(maxlen=self.max_data_points)
-        self.data_x = deque(maxlen=self.max_data_points)
-        self.data_y = deque(maxlen=self.max_data_points)
-        self.data_z = deque(maxlen=self.max_data_points)
 
     def process_data(self, data):
         """
@@ -30,21 +28,12 @@ class Accelerometer(Sensor):
             bool: True if data processed successfully
         """
         try:
-            accel_x = data.get("x", float("nan"))
-            accel_y = data.get("y", float("nan"))
-            accel_z = data.get("z", float("nan"))
-
-            if not all(
-                    isinstance(v, (int, float)) for v in (accel_x, accel_y, accel_z)
-            ):
+            values = self.extract_values(data)
+            if values is None:
                 return False
 
-            with self.data_lock:
-                current_time = time.time() - self.start_time
-                self.data_t.append(current_time)
-                self.data_x.append(accel_x)
-                self.data_y.append(accel_y)
-                self.data_z.append(accel_z)
+            current_time = self.sample_time(data) - self.start_time
+            self.store_sample(current_time, values)
 
             EventBus.publish(
                 "sensor_update",
@@ -70,17 +59,11 @@ class Accelerometer(Sensor):
         Returns:
             dict: Dictionary containing time and acceleration data arrays
         """
-        with self.data_lock:
-            return {
-                "time": list(self.data_t)[-limit:],
-                "x": list(self.data_x)[-limit:],
-                "y": list(self.data_y)[-limit:],
-                "z": list(self.data_z)[-limit:],
-            }
+        return self.get_latest(limit)
 
     def save_to_file(self, data, device_name, device_id):
         """
-        Save accelerometer data to CSV file.
+        Queue accelerometer data for its CSV file (written by RecordingWriter).
 
         Args:
             data (dict): Data to be saved
@@ -88,17 +71,17 @@ class Accelerometer(Sensor):
             device_id (str): Device identifier
 
         Returns:
-            bool: True if data saved successfully
+            bool: True if data was queued for writing
         """
         try:
             accel_x = data.get("x", float("nan"))
             accel_y = data.get("y", float("nan"))
             accel_z = data.get("z", float("nan"))
+            sample_time = self.last_sample_time if self.last_sample_time is not None else time.time()
             if self.date_in_milliseconds:
-                current_time_seconds = time.time()
-                timestamp = round(current_time_seconds - self.start_time, 4)
+                timestamp = round(sample_time - self.start_time, 4)
             else:
-                timestamp = datetime.now().isoformat()
+                timestamp = datetime.fromtimestamp(sample_time).isoformat()
             start_time_formatted = datetime.fromtimestamp(self.start_time).strftime('%d_%m_%y___%H_%M_%S')
             file_path = (
                     os.getenv("DATA_FILE_PATH", "")
@@ -111,18 +94,11 @@ class Accelerometer(Sensor):
                     + start_time_formatted
                     + EXTENSION
             )
-            is_new_file = not os.path.exists(file_path)
-
-            with open(file_path, "a+") as f:
-                if is_new_file:
-                    f.write(
-                        "timestamp,accel_x,accel_y,accel_z\n"
-                    )
-
-                f.write(
-                    f"{timestamp},{accel_x},{accel_y},{accel_z}\n"
-                )
-            return True
+            return RecordingWriter.write(
+                file_path,
+                "timestamp,accel_x,accel_y,accel_z\n",
+                f"{timestamp},{accel_x},{accel_y},{accel_z}\n"
+            )
         except Exception as e:
             Logger.log_error(f"Error saving data: {e}")
             return False
\ No newline at end of file
@@ -1,20 +1,62 @@
-from threading import Lock
+from bisect import bisect_right
 from src.utils.logging import Logger
+from src.utils.tracing import LatencyTracker
+from src.sensors.clock_sync import ClockSync, TIMESTAMP_UNITS
+from src.sensors.sample_stats import SampleStats
+from src.sensors.downsampling import DownsamplingPyramid
+from src.sensors.filters import FilterBank
+from src.sensors.ring_buffer import SampleRing
+from src.sensors.triggers import TriggerSet, TriggerLog
 from abc import ABC, abstractmethod
+import math
 import os
+import time
 
 # Constants for sensor types
 ACCELEROMETER = "accelerometer"
 GYROSCOPE = "gyroscope"
 MAGNETOMETER = "magnetometer"
+ORIENTATION = "orientation"
 
 # Constants for file formatting
 DIVIDER = "_"
 EXTENSION = ".csv"
 
+# Default number of points returned by overview queries
+DEFAULT_OVERVIEW_POINTS = 2000
+
+
+def _finite_number(value):
+    """
+    Check whether a decoded JSON value is a usable sample value.
+
+    Args:
+        value: Decoded value
+
+    Returns:
+        bool: True for an int or float that is finite as a float
+    """
+    if not isinstance(value, (int, float)):
+        return False
+    try:
+        return math.isfinite(value)
+    except OverflowError:
+        return False
+
 
 class Sensor(ABC):
-    """Abstract base class for sensors."""
+    """
+    Abstract base class for sensors.
+
+    Samples are stored once, through store_sample, in a lock-free
+    SampleRing and a downsampling pyramid that every query reads.
+    """
+
+    # Sensor type name, set by each implementation
+    sensor_type = None
+
+    # Value channels stored for every sample, in storage order
+    channels = ("x", "y", "z")
 
     def __init__(self, device_id, max_data_points=100):
         """
@@ -26,7 +68,6 @@ class Sensor(ABC):
         """
         self.device_id = device_id
         self.max_data_points = max_data_points
-        self.data_lock = Lock()
 
         # Timestamp configuration
         env_value = os.getenv('DATE_IN_MILLISECONDS')
@@ -40,13 +81,43 @@ class Sensor(ABC):
             self.date_in_milliseconds = (env_value == 'True')
             Logger.log_message(f"Configuration: DATE_IN_MILLISECONDS={self.date_in_milliseconds}")
 
+        # Device clock fields of received messages
+        self.timestamp_field = os.getenv("DEVICE_TIMESTAMP_FIELD", "timestamp")
+        unit = os.getenv("DEVICE_TIMESTAMP_UNIT", "ms")
+        if unit not in TIMESTAMP_UNITS:
+            Logger.log_error(f"Invalid DEVICE_TIMESTAMP_UNIT: '{unit}'. Use one of {', '.join(TIMESTAMP_UNITS)}. "
+                             f"Using default: ms.", key="timestamp_unit_error")
+            unit = "ms"
+        self.timestamp_scale = TIMESTAMP_UNITS[unit]
+        self.sequence_field = os.getenv("DEVICE_SEQUENCE_FIELD", "seq")
+        self.clock = None
+        self.sequence_clock = None
+        self.last_sample_time = None
+        self.timing = None
+        self.calibration = None
+
         self.initialize_data_storage()
+        self.raw_channels = type(self).channels
+        self.filters = FilterBank(self.sensor_type, self.raw_channels)
+        self.channels = self.raw_channels + self.filters.channels
+        self.triggers = TriggerSet(self.sensor_type, self.channels)
+        capacity = max(int(max_data_points), 1)
+        self.ring = SampleRing(
+            bytearray(SampleRing.required_size(capacity, len(self.channels))),
+            capacity, len(self.channels), create=True
+        )
+        self.pyramid = DownsamplingPyramid(self.channels)
 
     @abstractmethod
     def initialize_data_storage(self):
-        """Initialize data storage structures."""
+        """Initialize per-sensor state such as the start time."""
         pass
 
+    @property
+    def sample_count(self):
+        """Total samples stored since creation; never decreases."""
+        return self.ring.sample_count
+
     @abstractmethod
     def process_data(self, data):
         """
@@ -83,4 +154,239 @@ class Sensor(ABC):
         Returns:
             bool: True if data saved successfully
         """
-        pass
\ No newline at end of file
+        pass
+
+    def extract_values(self, data):
+        """
+        Read the raw channel values of a received message.
+
+        Args:
+            data (dict): Data received from sensor
+
+        Returns:
+            tuple: One value per raw channel, or None if any value is missing, not numeric or not finite
+        """
+        values = tuple(data.get(channel) for channel in self.raw_channels)
+        if not all(_finite_number(v) for v in values):
+            return None
+        return values
+
+    def sample_time(self, data):
+        """
+        Get the server-clock time a received sample was taken.
+
+        The device timestamp goes through the device's clock estimate
+        (shared by its sensors through the clock attribute), a sequence
+        number through this sensor's own; the arrival observed by either is
+        the receive time of the chunk that carried the message. Times never
+        go backwards, so the ring stays ordered. Each call is one sample for
+        the timing statistics.
+
+        Args:
+            data (dict): Data received from sensor
+
+        Returns:
+            float: Absolute sample time in seconds (also kept in last_sample_time)
+        """
+        now = time.time()
+        arrival = LatencyTracker.received_at() or now
+        device_time = data.get(self.timestamp_field)
+        sequence = data.get(self.sequence_field)
+        if not isinstance(sequence, int) or isinstance(sequence, bool):
+            sequence = None
+        if not isinstance(device_time, (int, float)) or isinstance(device_time, bool):
+            device_time = None
+        if device_time is not None:
+            if self.clock is None:
+                self.clock = ClockSync(self.device_id)
+            sample_time = self.clock.map(device_time * self.timestamp_scale, arrival)
+        elif sequence is not None:
+            if self.sequence_clock is None:
+                self.sequence_clock = ClockSync(self.device_id, self.sensor_type, rate=None)
+            sample_time = self.sequence_clock.map(sequence, arrival)
+        else:
+            sample_time = now
+
+        if self.last_sample_time is not None and sample_time < self.last_sample_time:
+            sample_time = self.last_sample_time
+        self.last_sample_time = sample_time
+
+        if self.timing is None:
+            self.timing = SampleStats(self.device_id, self.sensor_type)
+        self.timing.observe(sample_time, arrival, sequence, stamped=device_time is not None or sequence is not None)
+        return sample_time
+
+    def store_sample(self, timestamp, values, filtered=False):
+        """
+        Store one sample in the raw ring and the downsampling pyramid.
+
+        Raw values are calibrated and filtered into the derived channels
+        first; triggers then watch the stored values.
+
+        Args:
+            timestamp (float): Sample time in seconds since sensor start
+            values (tuple): One value per raw channel, in channel order
+            filtered (bool): True if values are already calibrated and include the derived channels
+        """
+        if not filtered:
+            calibration = self.calibration
+            if calibration is not None:
+                calibration.observe(values)
+                values = calibration.apply(values)
+            if self.filters:
+                values = tuple(values) + self.filters.process(timestamp, values)
+        self.ring.append(timestamp, values)
+        self.pyramid.add(timestamp, values)
+        if self.triggers and not filtered:
+            fired = self.triggers.process(timestamp, values)
+            if fired:
+                TriggerLog.record(self, fired)
+
+    def store_samples(self, times, columns):
+        """
+        Store a batch of samples, calibrating and filtering it with one vectorized pass each
+        and evaluating triggers sample by sample.
+
+        Args:
+            times (list): Sample times in seconds since sensor start
+            columns (list): One sequence of values per raw channel, aligned with times
+        """
+        calibration = self.calibration
+        if calibration is not None:
+            calibration.observe_batch(columns)
+            columns = calibration.apply_batch(columns)
+        if self.filters:
+            columns = list(columns) + self.filters.process_batch(times, columns)
+        self.ring.append_many(times, columns)
+        for row in zip(times, *columns):
+            self.pyramid.add(row[0], row[1:])
+        if self.triggers:
+            fired = self.triggers.process_batch(times, columns)
+            if fired:
+                TriggerLog.record(self, fired)
+
+    def get_latest(self, limit=100):
+        """
+        Get a snapshot of the newest samples.
+
+        Args:
+            limit (int): Maximum number of samples returned
+
+        Returns:
+            dict: Time list and one value list per channel, oldest first
+        """
+        snapshot = self.ring.read_since(latest=limit)
+        data = {"time": snapshot["time"]}
+        for channel, values in zip(self.channels, snapshot["values"]):
+            data[channel] = values
+        return data
+
+    def get_summary(self):
+        """
+        Get a constant-time summary of the stored data.
+
+        Returns:
+            dict: Number of stored points, total samples seen, latest relative time
+                and latest value per channel
+        """
+        snapshot = self.ring.read_since(latest=1)
+        if not snapshot["time"]:
+            return {"data_points": 0, "sample_count": snapshot["sample_count"],
+                    "last_time": None, "last_values": None}
+        return {
+            "data_points": min(snapshot["sample_count"], self.ring.capacity),
+            "sample_count": snapshot["sample_count"],
+            "last_time": snapshot["time"][0],
+            "last_values": {channel: values[0] for channel, values in zip(self.channels, snapshot["values"])}
+        }
+
+    def get_data_since(self, since=None, since_time=None, limit=None, fields=None):
+        """
+        Get samples newer than a cursor, oldest first.
+
+        Samples are numbered by a sequence that starts at 1 and never
+        resets, so a consumer passes back the returned cursor to receive
+        only new samples. Without a cursor the latest samples are returned.
+
+        Args:
+            since (int, optional): Sequence number of the last sample already received
+            since_time (float, optional): Relative time of the last sample already received
+            limit (int, optional): Maximum number of samples returned
+            fields (list, optional): Channels to include, defaults to all
+
+        Returns:
+            dict: Selected data, next cursor, and whether samples were skipped or remain
+        """
+        if since is not None and since > self.ring.sample_count:
+            # Cursor from a previous sensor instance: restart from the oldest sample
+            snapshot = self.ring.read_since(0, limit=limit)
+            snapshot["gap"] = True
+        elif since is not None:
+            snapshot = self.ring.read_since(since, limit=limit)
+        elif since_time is not None:
+            snapshot = self.ring.read_since(since_time=since_time, limit=limit)
+        else:
+            snapshot = self.ring.read_since(latest=limit if limit is not None else self.ring.capacity)
+
+        count = snapshot["sample_count"]
+        first_available = max(count - self.ring.capacity + 1, 1)
+
+        data = {"time": snapshot["time"]}
+        for channel, values in zip(self.channels, snapshot["values"]):
+            if fields is None or channel in fields:
+                data[channel] = values
+
+        if snapshot["time"]:
+            cursor = snapshot["last_seq"]
+        elif since is not None and not snapshot["gap"] and since <= count:
+            cursor = since
+        else:
+            cursor = snapshot["first_seq"] - 1
+
+        return {
+            "data": data,
+            "cursor": cursor,
+            "first_available": first_available if count else None,
+            "gap": snapshot["gap"],
+            "has_more": snapshot["last_seq"] < count
+        }
+
+    def get_overview(self, start=None, end=None, max_points=DEFAULT_OVERVIEW_POINTS, span=None):
+        """
+        Get a downsampled view of a time range sized for display.
+
+        Serves raw samples while they still cover the range and fit in
+        max_points, otherwise falls back to the downsampling pyramid.
+
+        Args:
+            start (float, optional): Range start in seconds since sensor start
+            end (float, optional): Range end in seconds since sensor start
+            max_points (int): Maximum number of points returned
+            span (float, optional): Range length ending at end (or latest data), used if start is None
+
+        Returns:
+            dict: Time and per channel values, plus min/max envelopes and bucket resolution
+        """
+        if start is None and span is not None:
+            latest = self.get_summary()["last_time"]
+            if latest is None:
+                latest = self.pyramid.latest_time()
+            reference = end if end is not None else latest
+            start = reference - span if reference is not None else None
+
+        oldest = self.ring.read_since(0, limit=1)
+        raw_complete = oldest["first_seq"] == 1
+        if oldest["time"] and (raw_complete or (start is not None and oldest["time"][0] <= start)):
+            if start is not None:
+                snapshot = self.ring.read_since(from_time=start)
+            else:
+                snapshot = self.ring.read_since(0)
+            times = snapshot["time"]
+            hi = bisect_right(times, end) if end is not None else len(times)
+            if hi <= max_points:
+                result = {"time": times[:hi], "resolution": None}
+                for channel, values in zip(self.channels, snapshot["values"]):
+                    result[channel] = values[:hi]
+                return result
+
+        return self.pyramid.query(start, end, max_points)
@@ -0,0 +1,522 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+import numpy as np
+from src.sensors.base_sensor import GYROSCOPE, MAGNETOMETER
+from src.utils.logging import Logger
+from src.utils.metrics import Metrics
+
+# Sensor types that can be calibrated (SENSOR_CALIBRATION selects among them)
+CALIBRATED_SENSORS = (GYROSCOPE, MAGNETOMETER)
+
+# File holding the fitted parameters of every device, keyed by device name
+DEFAULT_CALIBRATION_FILE = "calibration.json"
+
+# Seconds between background fits
+DEFAULT_INTERVAL = 5.0
+
+# Edge of the cubes (in sensor units, µT for phones) magnetometer samples are pooled into
+DEFAULT_MAG_VOXEL = 2.0
+
+# Pooled magnetometer points kept for the fit; the least recently visited are dropped
+MAG_MAX_POINTS = 2000
+
+# Pooled points needed before an ellipsoid fit is attempted
+MAG_MIN_POINTS = 50
+
+# Smallest spread of calibrated field directions (variance along the least covered axis,
+# 1/3 for a full sphere) for a fit to be accepted
+MAG_MIN_COVERAGE = 0.05
+
+# Largest RMS deviation of the calibrated field strength from its mean, relative, for a fit to be accepted
+MAG_MAX_RESIDUAL = 0.05
+
+# Gyroscope samples per stillness window
+GYRO_WINDOW = 50
+
+# Largest per-axis standard deviation (rad/s) of a window considered still
+DEFAULT_GYRO_STILL = 0.02
+
+# Largest plausible bias (rad/s); still windows averaging more are slow rotations
+GYRO_MAX_BIAS = 0.1
+
+# Still windows needed before the bias estimate is applied
+GYRO_MIN_WINDOWS = 3
+
+# Weight of each new still window in the bias estimate
+GYRO_SMOOTHING = 1 / 8
+
+# Raw sample blocks queued for the fitter before the oldest are dropped
+MAX_PENDING_BLOCKS = 10000
+
+FITS = Metrics.counter("pub_calibration_fits_total", "Background calibration fits by outcome",
+                       ("device_id", "sensor_type", "outcome"))
+
+
+def fit_ellipsoid(points):
+    """
+    Fit an ellipsoid to magnetometer points.
+
+    Solves the general quadric through the points by least squares (on
+    points centered and scaled for conditioning) and turns it into a
+    hard-iron offset and a symmetric soft-iron matrix mapping the ellipsoid
+    onto a sphere whose radius is the ellipsoid's geometric mean radius.
+
+    Args:
+        points (np.ndarray): Raw samples, shape (n, 3)
+
+    Returns:
+        tuple: (offset, matrix, radius) with calibrated = matrix @ (raw - offset),
+            or None if the points do not describe an ellipsoid
+    """
+    shift = points.mean(axis=0)
+    scale = float(np.abs(points - shift).max())
+    if scale == 0:
+        return None
+    x, y, z = ((points - shift) / scale).T
+    design = np.column_stack((x * x, y * y, z * z, 2 * x * y, 2 * x * z, 2 * y * z, 2 * x, 2 * y, 2 * z))
+    coefficients = np.linalg.lstsq(design, np.ones(len(points)), rcond=None)[0]
+    a, b, c, d, e, f, g, h, i = coefficients
+    shape = np.array([[a, d, e], [d, b, f], [e, f, c]])
+    try:
+        center = -np.linalg.solve(shape, np.array([g, h, i]))
+    except np.linalg.LinAlgError:
+        return None
+    shape = shape / (1.0 + center @ shape @ center)
+    eigenvalues, eigenvectors = np.linalg.eigh(shape)
+    if not np.all(np.isfinite(eigenvalues)) or eigenvalues.min() <= 0:
+        return None
+    radius = float(np.prod(eigenvalues) ** (-1 / 6))
+    matrix = radius * (eigenvectors * np.sqrt(eigenvalues)) @ eigenvectors.T
+    return center * scale + shift, matrix, radius * scale
+
+
+class EllipsoidFit:
+    """
+    Incremental hard- and soft-iron fit of a magnetometer.
+
+    Samples are pooled into cubes of CALIBRATION_MAG_VOXEL units and each
+    visited cube keeps the mean of its samples, so a device lying still
+    adds one point instead of thousands and the fit weighs every visited
+    direction alike. At most MAG_MAX_POINTS cubes are kept, dropping the
+    least recently visited, so the fit follows changes of the distortion.
+    """
+
+    def __init__(self):
+        """Initialize an empty fit."""
+        self.voxel = float(os.getenv("CALIBRATION_MAG_VOXEL", DEFAULT_MAG_VOXEL))
+        self.cells = OrderedDict()
+        self.changed = False
+
+    def add(self, block):
+        """
+        Pool a block of raw samples.
+
+        Args:
+            block (np.ndarray): Raw samples, shape (3, n)
+        """
+        points = block.T[np.all(np.isfinite(block), axis=0)]
+        if not len(points):
+            return
+        keys, inverse = np.unique(np.floor(points / self.voxel).astype(np.int64), axis=0, return_inverse=True)
+        sums = np.zeros((len(keys), 3))
+        np.add.at(sums, inverse.reshape(-1), points)
+        counts = np.bincount(inverse.reshape(-1), minlength=len(keys))
+        for key, total, count in zip(map(tuple, keys.tolist()), sums, counts.tolist()):
+            cell = self.cells.pop(key, None)
+            if cell is None:
+                cell = [np.zeros(3), 0]
+                self.changed = True
+            cell[0] += total
+            cell[1] += count
+            self.cells[key] = cell
+        while len(self.cells) > MAG_MAX_POINTS:
+            self.cells.popitem(last=False)
+
+    def solve(self):
+        """
+        Fit the pooled points if new cubes were visited since the last fit.
+
+        Returns:
+            dict: Offset, matrix, field strength, points, residual and coverage of an
+                accepted fit, {"rejected": reason} for a rejected one, or None if nothing changed
+        """
+        if not self.changed or len(self.cells) < MAG_MIN_POINTS:
+            return None
+        self.changed = False
+        points = np.array([total / count for total, count in self.cells.values()])
+        fitted = fit_ellipsoid(points)
+        if fitted is None:
+            return {"rejected": "not an ellipsoid"}
+        offset, matrix, radius = fitted
+
+        calibrated = (points - offset) @ matrix.T
+        strengths = np.linalg.norm(calibrated, axis=1)
+        residual = float(np.sqrt(np.mean((strengths / radius - 1) ** 2)))
+        coverage = float(np.linalg.eigvalsh(np.cov((calibrated / strengths[:, None]).T)).min())
+        if residual > MAG_MAX_RESIDUAL:
+            return {"rejected": "residual", "residual": residual}
+        if coverage < MAG_MIN_COVERAGE:
+            return {"rejected": "coverage", "coverage": coverage}
+        return {"offset": offset.tolist(), "matrix": matrix.tolist(), "field": radius,
+                "points": len(points), "residual": residual, "coverage": coverage}
+
+
+class GyroBiasFit:
+    """
+    Incremental gyroscope bias estimate from still periods.
+
+    Samples are cut into windows of GYRO_WINDOW; a window whose per-axis
+    standard deviation stays under CALIBRATION_GYRO_STILL and whose mean
+    is a plausible bias counts as still, and its mean is averaged into the
+    bias with weight GYRO_SMOOTHING.
+    """
+
+    def __init__(self, bias=None):
+        """
+        Initialize the estimate.
+
+        Args:
+            bias (list, optional): Previously fitted bias to continue from
+        """
+        self.still = float(os.getenv("CALIBRATION_GYRO_STILL", DEFAULT_GYRO_STILL))
+        self.tail = np.empty((3, 0))
+        self.bias = np.asarray(bias, dtype=float) if bias is not None else None
+        self.windows = GYRO_MIN_WINDOWS if bias is not None else 0
+        self.changed = False
+
+    def add(self, block):
+        """
+        Cut a block of raw samples into windows and average the still ones into the bias.
+
+        Args:
+            block (np.ndarray): Raw samples, shape (3, n)
+        """
+        samples = np.concatenate((self.tail, block), axis=1)
+        count = samples.shape[1] // GYRO_WINDOW
+        self.tail = samples[:, count * GYRO_WINDOW:]
+        if not count:
+            return
+        windows = samples[:, :count * GYRO_WINDOW].reshape(3, count, GYRO_WINDOW)
+        means = windows.mean(axis=2)
+        still = (windows.std(axis=2).max(axis=0) < self.still) & (np.abs(means).max(axis=0) < GYRO_MAX_BIAS)
+        for mean in means.T[still]:
+            if self.bias is None:
+                self.bias = mean
+            else:
+                self.bias = self.bias + (mean - self.bias) * GYRO_SMOOTHING
+            self.windows += 1
+            self.changed = True
+
+    def solve(self):
+        """
+        Report the bias if it moved since the last call.
+
+        Returns:
+            dict: Offset and still windows seen, or None if nothing changed
+                or too few still windows were seen
+        """
+        if not self.changed or self.windows < GYRO_MIN_WINDOWS:
+            return None
+        self.changed = False
+        return {"offset": self.bias.tolist(), "matrix": None, "windows": self.windows}
+
+
+class Calibration:
+    """
+    Online calibration of one sensor.
+
+    The ingest path hands every raw sample (or batch) to observe() and
+    stores apply() / apply_batch() of it instead: raw minus offset, times
+    the soft-iron matrix for magnetometers, as one vectorized product per
+    batch. Until parameters exist samples pass through. The fits run on a
+    background thread every CALIBRATION_INTERVAL seconds over the samples
+    observed since the previous run: an ellipsoid fit for magnetometers
+    (EllipsoidFit) and a still-period bias for gyroscopes (GyroBiasFit).
+    Accepted parameters take effect on the next stored sample and are
+    written to CALIBRATION_FILE under the device's Bluetooth address (the
+    name, which phones of one model share, is only kept as a label), from
+    where a reconnecting device starts.
+
+    The status of every calibration is kept in the class-level states
+    registry, keyed by device and sensor type, for the info API.
+    """
+    calibrations = {}
+    states = {}
+    stored = None
+    _thread = None
+    _lock = threading.Lock()
+
+    def __init__(self, device_id, device_key, device_name, sensor_type, params=None):
+        """
+        Initialize a sensor calibration.
+
+        Args:
+            device_id (str): Device identifier
+            device_key (str): Key the parameters are stored under
+            device_name (str): Device name, stored as a label
+            sensor_type (str): Sensor type
+            params (dict, optional): Previously stored parameters
+        """
+        self.device_id = device_id
+        self.device_key = device_key
+        self.device_name = device_name
+        self.sensor_type = sensor_type
+        self.pending = deque(maxlen=MAX_PENDING_BLOCKS)
+        self.params = None
+        self.info = {"source": None}
+        if sensor_type == MAGNETOMETER:
+            self.fit = EllipsoidFit()
+        else:
+            self.fit = GyroBiasFit(params["offset"] if params else None)
+        if params:
+            self._set_params(params, "stored")
+
+    def _set_params(self, params, source):
+        """
+        Make parameters current.
+
+        Args:
+            params (dict): Fitted parameters, with offset and matrix (None for offset only)
+            source (str): "stored" or "fitted"
+        """
+        offset = tuple(float(v) for v in params["offset"])
+        matrix = tuple(tuple(float(v) for v in row) for row in params["matrix"]) if params.get("matrix") else None
+        # One tuple, replaced at once, so the ingest path never sees half an update
+        self.params = (offset, matrix, np.array(offset)[:, None],
+                       np.array(matrix) if matrix is not None else None)
+        self.info = dict(params, source=source, fitted_at=params.get("fitted_at") or datetime.now().isoformat())
+
+    def observe(self, values):
+        """
+        Queue one raw sample for the fitter.
+
+        Args:
+            values (tuple): One raw value per channel
+        """
+        self.pending.append(values)
+
+    def observe_batch(self, columns):
+        """
+        Queue a batch of raw samples for the fitter.
+
+        Args:
+            columns (list): One sequence of raw values per channel
+        """
+        self.pending.append(np.asarray(columns, dtype=float))
+
+    def apply(self, values):
+        """
+        Calibrate one sample.
+
+        Args:
+            values (tuple): One raw value per channel
+
+        Returns:
+            tuple: Calibrated values
+        """
+        params = self.params
+        if params is None:
+            return values
+        offset, matrix = params[0], params[1]
+        x, y, z = values[0] - offset[0], values[1] - offset[1], values[2] - offset[2]
+        if matrix is None:
+            return x, y, z
+        return tuple(row[0] * x + row[1] * y + row[2] * z for row in matrix)
+
+    def apply_batch(self, columns):
+        """
+        Calibrate a batch with one vectorized transform.
+
+        Args:
+            columns (list): One sequence of raw values per channel
+
+        Returns:
+            list: One list of calibrated values per channel
+        """
+        params = self.params
+        if params is None:
+            return columns
+        calibrated = np.asarray(columns, dtype=float) - params[2]
+        if params[3] is not None:
+            calibrated = params[3] @ calibrated
+        return calibrated.tolist()
+
+    def run_fit(self):
+        """
+        Feed the queued samples to the fit and adopt its result if accepted.
+
+        Returns:
+            bool: True if new parameters were adopted
+        """
+        blocks = []
+        singles = []
+        while self.pending:
+            item = self.pending.popleft()
+            if isinstance(item, np.ndarray):
+                if singles:
+                    blocks.append(np.array(singles, dtype=float).T)
+                    singles = []
+                blocks.append(item)
+            else:
+                singles.append(item)
+        if singles:
+            blocks.append(np.array(singles, dtype=float).T)
+        for block in blocks:
+            self.fit.add(block)
+
+        result = self.fit.solve()
+        if result is None:
+            return False
+        if "rejected" in result:
+            FITS.inc(self.device_id, self.sensor_type, "rejected")
+            self.info = dict(self.info, last_rejection=result)
+            return False
+        FITS.inc(self.device_id, self.sensor_type, "accepted")
+        self._set_params(dict(result, fitted_at=datetime.now().isoformat()), "fitted")
+        return True
+
+    def report(self):
+        """
+        Get the calibration status.
+
+        Returns:
+            dict: Whether parameters are applied, where they came from, and the fit details
+        """
+        return dict(self.info, applied=self.params is not None)
+
+    @classmethod
+    def attach(cls, device_id, device_name, sensors, address=None):
+        """
+        Attach calibrations to the sensors selected by SENSOR_CALIBRATION.
+
+        Args:
+            device_id (str): Device identifier
+            device_name (str): Device name, stored as a label
+            sensors (dict): Sensor objects keyed by sensor type
+            address (str, optional): Peer Bluetooth address the parameters are stored under; connections
+                without one (the simulator) fall back to the device name
+        """
+        device_key = address or device_name
+        selected = [s.strip() for s in os.getenv("SENSOR_CALIBRATION", ",".join(CALIBRATED_SENSORS)).split(",")
+                    if s.strip()]
+        for sensor_type in selected:
+            if sensor_type not in CALIBRATED_SENSORS:
+                Logger.log_error(f"Invalid SENSOR_CALIBRATION entry: '{sensor_type}'. "
+                                 f"Use {', '.join(CALIBRATED_SENSORS)}", key="sensor_calibration_error")
+                continue
+            sensor = sensors.get(sensor_type)
+            if sensor is None:
+                continue
+            params = cls._load(device_key).get(sensor_type)
+            calibration = cls(device_id, device_key, device_name, sensor_type, params)
+            sensor.calibration = calibration
+            cls.calibrations[(device_id, sensor_type)] = calibration
+            if params:
+                Logger.log_message(f"Using stored {sensor_type} calibration for {device_name} ({device_key})")
+        cls._publish_states()
+        if cls.calibrations:
+            cls.start()
+
+    @classmethod
+    def start(cls):
+        """Start the fitter thread (idempotent)."""
+        with cls._lock:
+            if cls._thread is not None:
+                return
+            cls._thread = threading.Thread(target=cls._run, name="calibration-fitter", daemon=True)
+            cls._thread.start()
+
+    @classmethod
+    def _run(cls):
+        """Fitter thread: fit every calibration once per interval and store what changed."""
+        interval = float(os.getenv("CALIBRATION_INTERVAL", DEFAULT_INTERVAL))
+        while True:
+            time.sleep(interval)
+            changed = []
+            for calibration in list(cls.calibrations.values()):
+                try:
+                    if calibration.run_fit():
+                        changed.append(calibration)
+                except Exception as e:
+                    Logger.log_error(f"Calibration fit failed for {calibration.sensor_type} of "
+                                     f"{calibration.device_id}: {e}", key=f"calibration_error_{calibration.device_id}")
+            cls._publish_states()
+            if changed:
+                cls._save(changed)
+
+    @classmethod
+    def _publish_states(cls):
+        """Rebuild the states registry from the live calibrations."""
+        states = {}
+        for (device_id, sensor_type), calibration in list(cls.calibrations.items()):
+            states.setdefault(device_id, {})[sensor_type] = calibration.report()
+        cls.states = states
+
+    @classmethod
+    def _load(cls, device_key):
+        """
+        Get the stored parameters of a device, reading CALIBRATION_FILE on first use.
+
+        Args:
+            device_key (str): Bluetooth address (or name) the parameters are stored under
+
+        Returns:
+            dict: Parameters keyed by sensor type, empty if none were stored
+        """
+        with cls._lock:
+            if cls.stored is None:
+                path = os.getenv("CALIBRATION_FILE", DEFAULT_CALIBRATION_FILE)
+                try:
+                    with open(path) as f:
+                        cls.stored = json.load(f)
+                except FileNotFoundError:
+                    cls.stored = {}
+                except (OSError, ValueError) as e:
+                    Logger.log_error(f"Error reading calibration file {path}: {e}")
+                    cls.stored = {}
+            entry = cls.stored.get(device_key)
+            return dict(entry.get("sensors", {})) if isinstance(entry, dict) else {}
+
+    @classmethod
+    def _save(cls, calibrations):
+        """
+        Store the current parameters of calibrations in CALIBRATION_FILE.
+
+        Args:
+            calibrations (list): Calibrations whose parameters changed
+        """
+        path = os.getenv("CALIBRATION_FILE", DEFAULT_CALIBRATION_FILE)
+        with cls._lock:
+            if cls.stored is None:
+                cls.stored = {}
+            for calibration in calibrations:
+                params = {key: value for key, value in calibration.info.items()
+                          if key not in ("source", "last_rejection")}
+                entry = cls.stored.get(calibration.device_key)
+                if not isinstance(entry, dict) or not isinstance(entry.get("sensors"), dict):
+                    entry = cls.stored[calibration.device_key] = {"name": None, "sensors": {}}
+                entry["name"] = calibration.device_name
+                entry["sensors"][calibration.sensor_type] = params
+            try:
+                # Written aside and renamed, so a crash never leaves a truncated file
+                with open(path + ".tmp", "w") as f:
+                    json.dump(cls.stored, f, indent=2)
+                os.replace(path + ".tmp", path)
+            except OSError as e:
+                Logger.log_error(f"Error writing calibration file {path}: {e}", key="calibration_save_error")
+
+    @classmethod
+    def forget_device(cls, device_id):
+        """
+        Drop the calibrations of a removed device; its stored parameters are kept.
+
+        Args:
+            device_id (str): Device identifier
+        """
+        for key in [key for key in cls.calibrations if key[0] == device_id]:
+            del cls.calibrations[key]
+        cls._publish_states()
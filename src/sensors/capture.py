@@ -0,0 +1,417 @@
+import math
+import os
+import time
+from collections import deque
+from datetime import datetime
+from src.connection.event_bus import EventBus
+from src.sensors.base_sensor import DIVIDER, EXTENSION
+from src.sensors.recording import RecordingWriter
+from src.utils.logging import Logger
+from src.utils.metrics import Metrics
+
+# Recording modes accepted in RECORDING_MODE
+RECORDING_MODES = ("continuous", "triggered")
+
+# Seconds of samples kept per sensor before a capture is requested
+DEFAULT_PRE_TRIGGER = 5.0
+
+# Seconds recorded after the latest request of a capture
+DEFAULT_POST_TRIGGER = 5.0
+
+# Longest post-trigger window one request may ask for
+DEFAULT_MAX_POST_TRIGGER = 300.0
+
+# Seconds a capture stays open after its window ends, for samples still in flight
+CAPTURE_GRACE = 1.0
+
+# Finished captures kept in memory per device for the captures API
+CAPTURE_HISTORY = 20
+
+CAPTURES = Metrics.counter("pub_recording_captures_total", "Triggered recordings started by source",
+                           ("device_id", "source"))
+CAPTURE_ROWS = Metrics.counter("pub_recording_capture_rows_total", "CSV rows written by triggered recordings",
+                               ("device_id", "sensor_type"))
+
+
+def recording_mode():
+    """
+    Read the configured recording mode.
+
+    Returns:
+        str: "continuous" (every sample is written) or "triggered" (only captures are written)
+    """
+    mode = os.getenv("RECORDING_MODE", "continuous")
+    if mode not in RECORDING_MODES:
+        Logger.log_error(f"Invalid RECORDING_MODE: '{mode}'. Use one of {', '.join(RECORDING_MODES)}. "
+                         f"Using default: continuous.", key="recording_mode_error")
+        mode = "continuous"
+    return mode
+
+
+def valid_window(seconds):
+    """
+    Check a requested pre- or post-trigger window.
+
+    Args:
+        seconds: Requested seconds, None for the default
+
+    Returns:
+        bool: True for None or a finite, non-negative number
+    """
+    if seconds is None:
+        return True
+    if not isinstance(seconds, (int, float)) or isinstance(seconds, bool):
+        return False
+    try:
+        return math.isfinite(seconds) and seconds >= 0
+    except OverflowError:
+        return False
+
+
+class Capture:
+    """
+    Triggered recording of one device.
+
+    With RECORDING_MODE=triggered nothing is written per sample. The
+    ingest process follows each sensor's stored samples (calibrated, and
+    derived sensors included) into a buffer holding the last
+    RECORDING_PRE_TRIGGER seconds. A capture, requested through the API,
+    the status WebSocket or a trigger listed in RECORDING_TRIGGERS, writes
+    the buffered samples and the next RECORDING_POST_TRIGGER seconds to
+    one CSV per sensor through the RecordingWriter; requests arriving
+    during a capture extend it. Web workers forward requests to the
+    ingest process and read capture status from the shared timing blob.
+    """
+    captures = {}
+    states = {}
+    forward = None
+    _subscribed = False
+
+    def __init__(self, device_id, device_name, sensors, pre_trigger, post_trigger, max_post_trigger, trigger_names):
+        """
+        Initialize the capture of a device.
+
+        Args:
+            device_id (str): Device identifier
+            device_name (str): Device name, used in file names
+            sensors (dict): Sensors to record, keyed by sensor type
+            pre_trigger (float): Seconds buffered before a request
+            post_trigger (float): Seconds recorded after a request
+            max_post_trigger (float): Longest post-trigger window a request may ask for
+            trigger_names (list): sensor.name patterns of triggers starting a capture
+        """
+        self.device_id = device_id
+        self.device_name = device_name
+        self.sensors = dict(sensors)
+        self.pre_trigger = pre_trigger
+        self.post_trigger = post_trigger
+        self.max_post_trigger = max_post_trigger
+        self.trigger_names = trigger_names
+        self.cursors = {sensor_type: sensor.sample_count for sensor_type, sensor in self.sensors.items()}
+        self.buffers = {sensor_type: deque() for sensor_type in self.sensors}
+        self.count = 0
+        self.active = None
+        self.files = {}
+        self.history = deque(maxlen=CAPTURE_HISTORY)
+
+    @classmethod
+    def attach(cls, device_id, device_name, sensors):
+        """
+        Start buffering the sensors of a device for triggered recording.
+
+        Args:
+            device_id (str): Device identifier
+            device_name (str): Device name
+            sensors (dict): Sensors of the device, derived ones included, keyed by sensor type
+
+        Returns:
+            Capture: The device's capture
+        """
+        if not cls._subscribed:
+            EventBus.subscribe("sensor_update", cls.handle_sensor_update)
+            EventBus.subscribe("trigger", cls.handle_trigger)
+            cls._subscribed = True
+
+        pre_trigger = max(float(os.getenv("RECORDING_PRE_TRIGGER", DEFAULT_PRE_TRIGGER)), 0.0)
+        max_post_trigger = float(os.getenv("RECORDING_MAX_POST_TRIGGER", DEFAULT_MAX_POST_TRIGGER))
+        if not valid_window(max_post_trigger):
+            Logger.log_error(f"Invalid RECORDING_MAX_POST_TRIGGER: '{max_post_trigger}'. "
+                             f"Using default: {DEFAULT_MAX_POST_TRIGGER:g}.", key="recording_max_post_error")
+            max_post_trigger = DEFAULT_MAX_POST_TRIGGER
+        post_trigger = min(max(float(os.getenv("RECORDING_POST_TRIGGER", DEFAULT_POST_TRIGGER)), 0.0),
+                           max_post_trigger)
+        trigger_names = [name.strip() for name in os.getenv("RECORDING_TRIGGERS", "*").split(",") if name.strip()]
+
+        capture = cls.captures[device_id] = cls(device_id, device_name, sensors, pre_trigger, post_trigger,
+                                                max_post_trigger, trigger_names)
+        cls.states[device_id] = capture.report()
+        Logger.log_message(f"Triggered recording for {device_name}: {pre_trigger:g}s before, "
+                           f"{post_trigger:g}s after each capture")
+        return capture
+
+    @classmethod
+    def request(cls, device_id, source, reason=None, pre=None, post=None, at=None):
+        """
+        Start or extend a capture of a device.
+
+        In a web worker the request is forwarded to the ingest process.
+
+        Args:
+            device_id (str): Device identifier
+            source (str): What requested the capture: api, websocket or trigger
+            reason (str, optional): Free text stored with the capture
+            pre (float, optional): Seconds before the request to include, at most RECORDING_PRE_TRIGGER
+            post (float, optional): Seconds after the request to record, defaults to RECORDING_POST_TRIGGER,
+                at most RECORDING_MAX_POST_TRIGGER
+            at (float, optional): Absolute time of the request, defaults to now
+
+        Returns:
+            dict: The capture, {"forwarded": True} when sent to the ingest process,
+                or None if the device is not recording in triggered mode
+        """
+        capture = cls.captures.get(device_id)
+        if capture is not None:
+            return capture.start(source, reason, pre, post, at)
+        if cls.forward is not None and device_id in cls.states:
+            cls.forward({"command": "capture", "device_id": device_id, "source": source, "reason": reason,
+                         "pre": pre, "post": post, "at": at if at is not None else time.time()})
+            return {"device_id": device_id, "forwarded": True}
+        return None
+
+    def follow(self, sensor_type):
+        """
+        Move the samples a sensor stored since the last call into its buffer.
+
+        Samples inside the active capture's window are written on the way.
+
+        Args:
+            sensor_type (str): Sensor type
+        """
+        sensor = self.sensors[sensor_type]
+        buffer = self.buffers[sensor_type]
+        while True:
+            result = sensor.get_data_since(since=self.cursors[sensor_type])
+            self.cursors[sensor_type] = result["cursor"]
+            if result["gap"]:
+                Logger.log_warning(f"Pre-trigger buffer of {self.device_id}_{sensor_type} fell behind, "
+                                   f"samples skipped", key=f"capture_gap_{self.device_id}")
+            data = result["data"]
+            if not data["time"]:
+                break
+            rows = list(zip(data["time"], *(data[channel] for channel in sensor.channels)))
+            if self.active is not None:
+                self._write(sensor_type, rows)
+            buffer.extend(rows)
+            if not result["has_more"]:
+                break
+
+        if buffer:
+            oldest = buffer[-1][0] - self.pre_trigger
+            while buffer[0][0] < oldest:
+                buffer.popleft()
+
+    def _write(self, sensor_type, rows, after=None):
+        """
+        Queue the rows of a sensor that fall inside the active capture's window.
+
+        Args:
+            sensor_type (str): Sensor type
+            rows (iterable): (relative time, *values) tuples, oldest first
+            after (float, optional): Absolute time up to which rows were already written
+        """
+        sensor = self.sensors[sensor_type]
+        begin = self.active["from"] - sensor.start_time
+        end = self.active["until"] - sensor.start_time
+        if after is not None:
+            after -= sensor.start_time
+        header = "timestamp," + ",".join(sensor.channels) + "\n"
+
+        lines = []
+        for row in rows:
+            if row[0] < begin or row[0] > end or (after is not None and row[0] <= after):
+                continue
+            if sensor.date_in_milliseconds:
+                timestamp = round(row[0], 4)
+            else:
+                timestamp = datetime.fromtimestamp(sensor.start_time + row[0]).isoformat()
+            lines.append(f"{timestamp}," + ",".join(map(str, row[1:])) + "\n")
+        if not lines:
+            return
+
+        file_path = self.files.get(sensor_type)
+        if file_path is None:
+            started = datetime.fromtimestamp(self.active["time"]).strftime('%d_%m_%y___%H_%M_%S')
+            file_path = self.files[sensor_type] = (
+                os.getenv("DATA_FILE_PATH", "") + "capture" + DIVIDER + sensor_type + DIVIDER + self.device_name
+                + DIVIDER + self.device_id + DIVIDER + started + DIVIDER + str(self.active["id"]) + EXTENSION
+            )
+            self.active["files"].append(file_path)
+        for line in lines:
+            RecordingWriter.write(file_path, header, line)
+        self.active["rows"] += len(lines)
+        CAPTURE_ROWS.inc(self.device_id, sensor_type, amount=len(lines))
+
+    def start(self, source, reason=None, pre=None, post=None, at=None):
+        """
+        Start a capture, or extend the active one.
+
+        Args:
+            source (str): What requested the capture: api, websocket or trigger
+            reason (str, optional): Free text stored with the capture
+            pre (float, optional): Seconds before the request to include, at most RECORDING_PRE_TRIGGER
+            post (float, optional): Seconds after the request to record, defaults to RECORDING_POST_TRIGGER,
+                at most RECORDING_MAX_POST_TRIGGER
+            at (float, optional): Absolute time of the request, defaults to now
+
+        Returns:
+            dict: Copy of the capture
+        """
+        self.check()
+        at = time.time() if at is None else at
+        # Invalid windows (NaN, infinite, negative) would leave a capture that never ends
+        pre = self.pre_trigger if pre is None or not valid_window(pre) else min(pre, self.pre_trigger)
+        post = self.post_trigger if post is None or not valid_window(post) else min(post, self.max_post_trigger)
+
+        for sensor_type in self.sensors:
+            self.follow(sensor_type)
+
+        if self.active is not None and at - pre > self.active["until"]:
+            # Closing in its grace period, and the new window would leave a hole
+            self.finish()
+
+        if self.active is not None:
+            written_until = self.active["until"]
+            self.active["until"] = max(written_until, at + post)
+            self.active["requests"] += 1
+            # Samples that arrived after the old window ended are only in the buffers
+            for sensor_type, buffer in self.buffers.items():
+                self._write(sensor_type, buffer, after=written_until)
+            self._publish("extended")
+            return dict(self.active)
+
+        self.count += 1
+        self.active = {
+            "id": self.count,
+            "source": source,
+            "reason": reason,
+            "time": at,
+            "from": at - pre,
+            "until": at + post,
+            "requests": 1,
+            "rows": 0,
+            "files": [],
+            "finished": False,
+        }
+        self.files = {}
+        for sensor_type, buffer in self.buffers.items():
+            self._write(sensor_type, buffer)
+        CAPTURES.inc(self.device_id, source)
+        Logger.log_message(f"Capture {self.count} started on {self.device_name} ({source}"
+                           f"{': ' + reason if reason else ''})")
+        self._publish("started")
+        return dict(self.active)
+
+    def check(self):
+        """Finish the active capture once its window and grace period have passed."""
+        if self.active is not None and time.time() > self.active["until"] + CAPTURE_GRACE:
+            self.finish()
+
+    def finish(self):
+        """Write the remaining samples of the active capture and close it."""
+        for sensor_type in self.sensors:
+            self.follow(sensor_type)
+        self.active["finished"] = True
+        self.history.append(self.active)
+        Logger.log_message(f"Capture {self.active['id']} finished on {self.device_name}: "
+                           f"{self.active['rows']} rows")
+        self._publish("finished")
+        self.active = None
+
+    def matches(self, event):
+        """
+        Check whether a fired trigger should start a capture.
+
+        Args:
+            event (dict): Trigger event with sensor_type and trigger
+
+        Returns:
+            bool: True if a RECORDING_TRIGGERS pattern matches it
+        """
+        for pattern in self.trigger_names:
+            sensor_type, _, name = pattern.rpartition(".")
+            if sensor_type in ("", "*", event["sensor_type"]) and name in ("*", event["trigger"]):
+                return True
+        return False
+
+    def report(self):
+        """
+        Get the recording status of the device.
+
+        Returns:
+            dict: Mode, buffer lengths, active capture and the latest finished captures
+        """
+        return {
+            "mode": "triggered",
+            "pre_trigger": self.pre_trigger,
+            "post_trigger": self.post_trigger,
+            "max_post_trigger": self.max_post_trigger,
+            "triggers": self.trigger_names,
+            "active": dict(self.active) if self.active is not None else None,
+            "captures": [dict(capture) for capture in self.history],
+        }
+
+    def _publish(self, status):
+        """
+        Refresh the device's status and publish a capture event.
+
+        Args:
+            status (str): started, extended or finished
+        """
+        Capture.states[self.device_id] = self.report()
+        EventBus.publish("capture", dict(self.active, device_id=self.device_id, status=status))
+
+    @classmethod
+    def handle_sensor_update(cls, event_data):
+        """
+        Buffer new samples of a device and close its capture when due (Event Bus callback).
+
+        Args:
+            event_data (dict): Event data containing device_id and sensor_type
+        """
+        capture = cls.captures.get(event_data["device_id"])
+        if capture is None:
+            return
+        sensor_type = event_data["sensor_type"]
+        sensor = capture.sensors.get(sensor_type)
+        if sensor is not None:
+            # Outside captures, follow in chunks well before the sensor's ring wraps
+            pending = sensor.sample_count - capture.cursors[sensor_type]
+            if capture.active is not None or pending >= max(sensor.ring.capacity // 2, 1):
+                capture.follow(sensor_type)
+        capture.check()
+
+    @classmethod
+    def handle_trigger(cls, event_data):
+        """
+        Start a capture when a fired trigger matches RECORDING_TRIGGERS (Event Bus callback).
+
+        Args:
+            event_data (dict): Trigger event
+        """
+        capture = cls.captures.get(event_data["device_id"])
+        if capture is not None and capture.matches(event_data):
+            capture.start("trigger", f"{event_data['sensor_type']}.{event_data['trigger']}",
+                          at=event_data["timestamp"])
+
+    @classmethod
+    def forget_device(cls, device_id):
+        """
+        Finish the capture of a removed device and drop its buffers; written files are kept.
+
+        Args:
+            device_id (str): Device identifier
+        """
+        capture = cls.captures.pop(device_id, None)
+        if capture is not None and capture.active is not None:
+            capture.finish()
+        cls.states.pop(device_id, None)
@@ -0,0 +1,222 @@
+import os
+from src.utils.metrics import Metrics
+
+# Seconds per unit of the device timestamp field (DEVICE_TIMESTAMP_UNIT)
+TIMESTAMP_UNITS = {"s": 1.0, "ms": 1e-3, "us": 1e-6, "ns": 1e-9}
+
+# Server seconds per lower-envelope point
+DEFAULT_WINDOW = 1.0
+
+# Envelope points after which an old point's weight has decayed by 1/e
+DEFAULT_MEMORY = 120
+
+# Envelope points needed before a device clock's drift is trusted over the nominal rate
+DEFAULT_MIN_DRIFT_POINTS = 30
+
+# Seconds between predicted and actual arrival that mean the device clock was reset
+DEFAULT_RESET_THRESHOLD = 10.0
+
+# Largest plausible drift of a device clock; steeper fits are delay noise
+MAX_DRIFT = 1e-3
+
+CLOCK_RESETS = Metrics.counter("pub_device_clock_resets_total", "Device clock estimates restarted after a jump",
+                               ("device_id", "source"))
+
+
+class ClockSync:
+    """
+    Maps a device clock (a timestamp or a sample counter) onto the server clock.
+
+    A sample arrives at its send time plus a transport delay that never
+    drops below some minimum, so the lower envelope of the arrival times
+    follows the device clock shifted by a constant. Each window of
+    CLOCK_SYNC_WINDOW server seconds contributes its earliest-arriving
+    sample (relative to the current estimate) as one envelope point, and
+    a least-squares line through the points with exponential forgetting
+    gives the offset and the rate (drift for timestamps, sample period
+    for counters). Work per sample is constant. Mapped times never exceed
+    the arrival time, and a jump larger than CLOCK_SYNC_RESET seconds
+    restarts the estimate.
+
+    The latest status of every clock is kept in the class-level states
+    registry, keyed by device and source, for the info API and metrics.
+    """
+    states = {}
+
+    def __init__(self, device_id, source="timestamp", rate=1.0):
+        """
+        Initialize an estimator.
+
+        Args:
+            device_id (str): Device the clock belongs to
+            source (str): "timestamp" for a device clock shared by its sensors, or the sensor
+                type for that sensor's sequence counter
+            rate (float, optional): Nominal server seconds per device unit, None to estimate it
+        """
+        self.device_id = device_id
+        self.source = source
+        self.nominal_rate = rate
+        self.window = float(os.getenv("CLOCK_SYNC_WINDOW", DEFAULT_WINDOW))
+        self.decay = 1.0 - 1.0 / max(float(os.getenv("CLOCK_SYNC_MEMORY", DEFAULT_MEMORY)), 1.0)
+        self.reset_threshold = float(os.getenv("CLOCK_SYNC_RESET", DEFAULT_RESET_THRESHOLD))
+        self.resets = 0
+        self._reset()
+
+    def _reset(self):
+        """Forget every observation."""
+        self.x_ref = None
+        self.y_ref = 0.0
+        self.last_x = None
+        self.sums = [0.0, 0.0, 0.0, 0.0, 0.0]  # weight, x, y, xx, xy
+        self.points = 0
+        self.rate = self.nominal_rate
+        self.intercept = None
+        self.window_start = None
+        self.candidate = None
+
+    def map(self, device_value, arrival):
+        """
+        Observe a sample and get its send time on the server clock.
+
+        Args:
+            device_value (float): Device timestamp in seconds, or sequence number
+            arrival (float): Server time the sample was received
+
+        Returns:
+            float: Estimated server time the sample was taken
+        """
+        if self.x_ref is None:
+            self.x_ref = device_value
+            self.y_ref = arrival
+            self.window_start = arrival
+        elif self._jumped(device_value, arrival):
+            self.resets += 1
+            CLOCK_RESETS.inc(self.device_id, self.source)
+            self._reset()
+            return self.map(device_value, arrival)
+
+        x = device_value - self.x_ref
+        y = arrival - self.y_ref
+        self.last_x = device_value
+
+        if arrival - self.window_start >= self.window and self.candidate is not None:
+            self._add_point()
+            self.window_start = arrival
+
+        rate = self.rate
+        if rate is None:
+            # Counter without a rate yet: the first window only measures the average spacing
+            first = self.candidate[:2] if self.candidate is not None else (x, y)
+            self.candidate = first + (x, y)
+            return arrival
+
+        residual = y - rate * x
+        if self.candidate is None or residual < self.candidate[1] - rate * self.candidate[0]:
+            self.candidate = (x, y)
+
+        intercept = self.intercept
+        if intercept is None:
+            intercept = self.candidate[1] - rate * self.candidate[0]
+        return min(self.y_ref + intercept + rate * x, arrival)
+
+    def _jumped(self, device_value, arrival):
+        """
+        Check whether the device clock restarted or jumped.
+
+        Args:
+            device_value (float): Device timestamp in seconds, or sequence number
+            arrival (float): Server time the sample was received
+
+        Returns:
+            bool: True if the estimate no longer fits the device clock
+        """
+        if self.nominal_rate is None and device_value < self.last_x:
+            return True
+        if self.rate is None or self.intercept is None:
+            return False
+        predicted = self.y_ref + self.intercept + self.rate * (device_value - self.x_ref)
+        return abs(arrival - predicted) > self.reset_threshold
+
+    def _add_point(self):
+        """Close the current window: fold its envelope point into the fit and refresh the estimate."""
+        if self.rate is None:
+            first_x, first_y, x, y = self.candidate
+            if x > first_x and y > first_y:
+                self.rate = (y - first_y) / (x - first_x)
+                self.candidate = None
+            return
+
+        x, y = self.candidate
+        self.candidate = None
+        decay = self.decay
+        sums = self.sums
+        for i, value in enumerate((1.0, x, y, x * x, x * y)):
+            sums[i] = sums[i] * decay + value
+        self.points += 1
+
+        weight, sum_x, sum_y, sum_xx, sum_xy = sums
+        denominator = weight * sum_xx - sum_x * sum_x
+        rate = self.nominal_rate
+        if denominator > 1e-12 and (rate is None or self.points >= DEFAULT_MIN_DRIFT_POINTS):
+            fitted = (weight * sum_xy - sum_x * sum_y) / denominator
+            if (rate is None and fitted > 0) or (rate is not None and abs(fitted - rate) <= MAX_DRIFT * rate):
+                rate = fitted
+        if rate is None:
+            rate = self.rate
+        self.rate = rate
+        self.intercept = (sum_y - rate * sum_x) / weight
+        ClockSync.states.setdefault(self.device_id, {})[self.source] = self.status()
+
+    def status(self):
+        """
+        Get the current estimate.
+
+        Returns:
+            dict: Source, windows fitted, resets, and either the offset (server minus device
+                seconds) and drift in ppm for timestamps, or the sample period for counters
+        """
+        status = {"source": self.source, "windows": self.points, "resets": self.resets}
+        if self.intercept is None or self.last_x is None:
+            return status
+        if self.nominal_rate is None:
+            status["sample_period"] = self.rate
+        else:
+            mapped = self.y_ref + self.intercept + self.rate * (self.last_x - self.x_ref)
+            status["offset_seconds"] = mapped - self.last_x
+            status["drift_ppm"] = (self.nominal_rate / self.rate - 1.0) * 1e6
+        return status
+
+    @classmethod
+    def forget_device(cls, device_id):
+        """
+        Drop the clock states of a removed device.
+
+        Args:
+            device_id (str): Device identifier
+        """
+        cls.states.pop(device_id, None)
+
+
+def _clock_gauge(field):
+    """
+    Build a gauge function exporting one field of every timestamp clock state.
+
+    Args:
+        field (str): Status field
+
+    Returns:
+        callable: Gauge function
+    """
+    def values():
+        return {
+            (device_id,): clocks["timestamp"][field]
+            for device_id, clocks in ClockSync.states.items()
+            if field in clocks.get("timestamp", {})
+        }
+    return values
+
+
+Metrics.gauge("pub_device_clock_offset_seconds", "Server minus device clock, estimated from sample arrivals",
+              ("device_id",), function=_clock_gauge("offset_seconds"))
+Metrics.gauge("pub_device_clock_drift_ppm", "Device clock rate error relative to the server clock",
+              ("device_id",), function=_clock_gauge("drift_ppm"))
@@ -0,0 +1,355 @@
+import math
+import os
+from array import array
+
+# Default bucket widths (seconds) for each pyramid level, finest first
+DEFAULT_RESOLUTIONS = (0.01, 0.1, 1.0, 10.0)
+DEFAULT_BUCKETS_PER_LEVEL = 3600
+
+
+def _load_resolutions():
+    """
+    Read pyramid resolutions from the environment.
+
+    Returns:
+        tuple: Sorted bucket widths in seconds
+    """
+    env_value = os.getenv("PYRAMID_RESOLUTIONS")
+    if not env_value:
+        return DEFAULT_RESOLUTIONS
+    try:
+        resolutions = sorted(float(v) for v in env_value.split(",") if v.strip())
+        if resolutions and all(r > 0 for r in resolutions):
+            return tuple(resolutions)
+    except ValueError:
+        pass
+    return DEFAULT_RESOLUTIONS
+
+
+class PyramidLevel:
+    """
+    Fixed-capacity ring of min/max/sum buckets at a single resolution.
+
+    Closed buckets live in preallocated arrays so memory stays constant
+    regardless of how long the sensor streams; the bucket currently being
+    filled is kept apart and included in queries.
+    """
+
+    def __init__(self, resolution, capacity, channel_count):
+        """
+        Initialize a pyramid level.
+
+        Args:
+            resolution (float): Bucket width in seconds
+            capacity (int): Maximum number of closed buckets kept
+            channel_count (int): Number of value channels per sample
+        """
+        self.resolution = resolution
+        self.capacity = capacity
+        self.channel_count = channel_count
+
+        zeros = bytes(8 * capacity)
+        self.bucket_index = array("d", zeros)
+        self.counts = array("d", zeros)
+        self.mins = [array("d", zeros) for _ in range(channel_count)]
+        self.maxs = [array("d", zeros) for _ in range(channel_count)]
+        self.sums = [array("d", zeros) for _ in range(channel_count)]
+
+        self.head = 0
+        self.size = 0
+        self.evicted = False
+        self.current = None
+
+    def add(self, timestamp, values):
+        """
+        Fold one sample into the level.
+
+        Args:
+            timestamp (float): Sample time in seconds
+            values (tuple): One value per channel
+        """
+        bucket = math.floor(timestamp / self.resolution)
+        current = self.current
+
+        if current is None or bucket > current[0]:
+            if current is not None:
+                self._close(current)
+            self.current = [bucket, 1, list(values), list(values), list(values)]
+            return
+
+        # Same bucket (or a late sample): merge into the open bucket
+        current[1] += 1
+        mins, maxs, sums = current[2], current[3], current[4]
+        for i, value in enumerate(values):
+            if value < mins[i]:
+                mins[i] = value
+            if value > maxs[i]:
+                maxs[i] = value
+            sums[i] += value
+
+    def _close(self, bucket):
+        """
+        Move a finished bucket into the ring, evicting the oldest if full.
+
+        Args:
+            bucket (list): Open bucket as [index, count, mins, maxs, sums]
+        """
+        if self.size < self.capacity:
+            pos = (self.head + self.size) % self.capacity
+            self.size += 1
+        else:
+            pos = self.head
+            self.head = (self.head + 1) % self.capacity
+            self.evicted = True
+
+        self.bucket_index[pos] = bucket[0]
+        self.counts[pos] = bucket[1]
+        for i in range(self.channel_count):
+            self.mins[i][pos] = bucket[2][i]
+            self.maxs[i][pos] = bucket[3][i]
+            self.sums[i][pos] = bucket[4][i]
+
+    def oldest_time(self):
+        """
+        Get start time of the oldest bucket held.
+
+        Returns:
+            float: Start time in seconds or None if empty
+        """
+        if self.size:
+            return self.bucket_index[self.head] * self.resolution
+        if self.current is not None:
+            return self.current[0] * self.resolution
+        return None
+
+    def latest_time(self):
+        """
+        Get start time of the newest bucket held.
+
+        Returns:
+            float: Start time in seconds or None if empty
+        """
+        if self.current is not None:
+            return self.current[0] * self.resolution
+        return None
+
+    def covers(self, start):
+        """
+        Check whether the level still holds data back to a given time.
+
+        Args:
+            start (float): Requested start time in seconds
+
+        Returns:
+            bool: True if no bucket after start was evicted
+        """
+        if not self.evicted:
+            return True
+        oldest = self.oldest_time()
+        return oldest is not None and oldest <= start
+
+    def bucket_count(self, start, end):
+        """
+        Estimate number of buckets spanned by a time range.
+
+        Args:
+            start (float): Range start in seconds
+            end (float): Range end in seconds
+
+        Returns:
+            int: Upper bound of buckets in range
+        """
+        return int((end - start) / self.resolution) + 1
+
+    def _first_position(self, first_bucket):
+        """
+        Binary search the ring for the first bucket at or after first_bucket.
+
+        Args:
+            first_bucket (int): Bucket index the range starts in
+
+        Returns:
+            int: Logical offset (0 = oldest) of the first matching bucket
+        """
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.bucket_index[(self.head + mid) % self.capacity] < first_bucket:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def export(self, start, end, max_points):
+        """
+        Export buckets overlapping a time range, merged down to max_points.
+
+        Args:
+            start (float): Range start in seconds
+            end (float): Range end in seconds
+            max_points (int): Maximum number of points returned
+
+        Returns:
+            dict: Bucket start times, counts and per channel min/max/sum lists
+        """
+        rows = []
+        first_bucket = math.floor(start / self.resolution)
+        last_bucket = math.floor(end / self.resolution)
+
+        for offset in range(self._first_position(first_bucket), self.size):
+            pos = (self.head + offset) % self.capacity
+            if self.bucket_index[pos] > last_bucket:
+                break
+            rows.append((
+                self.bucket_index[pos],
+                self.counts[pos],
+                [self.mins[i][pos] for i in range(self.channel_count)],
+                [self.maxs[i][pos] for i in range(self.channel_count)],
+                [self.sums[i][pos] for i in range(self.channel_count)],
+            ))
+
+        current = self.current
+        if current is not None and first_bucket <= current[0] <= last_bucket:
+            rows.append((current[0], current[1], list(current[2]), list(current[3]), list(current[4])))
+
+        group = max(1, math.ceil(len(rows) / max_points)) if max_points else 1
+
+        times, counts = [], []
+        mins = [[] for _ in range(self.channel_count)]
+        maxs = [[] for _ in range(self.channel_count)]
+        sums = [[] for _ in range(self.channel_count)]
+
+        for g in range(0, len(rows), group):
+            chunk = rows[g:g + group]
+            times.append(chunk[0][0] * self.resolution)
+            counts.append(sum(row[1] for row in chunk))
+            for i in range(self.channel_count):
+                mins[i].append(min(row[2][i] for row in chunk))
+                maxs[i].append(max(row[3][i] for row in chunk))
+                sums[i].append(sum(row[4][i] for row in chunk))
+
+        return {
+            "time": times,
+            "counts": counts,
+            "mins": mins,
+            "maxs": maxs,
+            "sums": sums,
+            "resolution": self.resolution * group,
+        }
+
+
+class DownsamplingPyramid:
+    """
+    Multi-resolution min/max/mean rollups of a sensor stream.
+
+    Every sample updates one bucket per level, so ingest cost is constant
+    per sample, and an overview query touches at most max_points buckets
+    of the level whose resolution best fits the requested span.
+    """
+
+    def __init__(self, channels, resolutions=None, buckets_per_level=None):
+        """
+        Initialize the pyramid.
+
+        Args:
+            channels (tuple): Channel names, e.g. ("x", "y", "z")
+            resolutions (tuple, optional): Bucket widths in seconds
+            buckets_per_level (int, optional): Closed buckets kept per level
+        """
+        self.channels = tuple(channels)
+        if buckets_per_level is None:
+            buckets_per_level = int(os.getenv("PYRAMID_BUCKETS_PER_LEVEL", DEFAULT_BUCKETS_PER_LEVEL))
+        self.levels = [
+            PyramidLevel(resolution, buckets_per_level, len(self.channels))
+            for resolution in sorted(resolutions or _load_resolutions())
+        ]
+        self.sample_count = 0
+
+    def add(self, timestamp, values):
+        """
+        Add one sample to every level.
+
+        Args:
+            timestamp (float): Sample time in seconds
+            values (tuple): One value per channel, in channel order
+        """
+        self.sample_count += 1
+        for level in self.levels:
+            level.add(timestamp, values)
+
+    def oldest_time(self):
+        """
+        Get the oldest time still available at any resolution.
+
+        Returns:
+            float: Time in seconds or None if no samples
+        """
+        return self.levels[-1].oldest_time() if self.levels else None
+
+    def latest_time(self):
+        """
+        Get the start time of the newest finest-level bucket.
+
+        Returns:
+            float: Time in seconds or None if no samples
+        """
+        return self.levels[0].latest_time() if self.levels else None
+
+    def select_level(self, start, end, max_points):
+        """
+        Pick the finest level that fits the span in max_points and still covers start.
+
+        Args:
+            start (float): Range start in seconds
+            end (float): Range end in seconds
+            max_points (int): Maximum number of points wanted
+
+        Returns:
+            PyramidLevel: Selected level
+        """
+        for level in self.levels:
+            if level.bucket_count(start, end) <= max_points and level.covers(start):
+                return level
+        return self.levels[-1]
+
+    def query(self, start=None, end=None, max_points=2000):
+        """
+        Get an overview of a time range with at most max_points points.
+
+        Args:
+            start (float, optional): Range start in seconds, defaults to oldest data
+            end (float, optional): Range end in seconds, defaults to newest data
+            max_points (int): Maximum number of points returned
+
+        Returns:
+            dict: Bucket times, per channel mean values and min/max envelopes
+        """
+        empty = {"time": [], "resolution": None, "min": {}, "max": {}}
+        empty.update({channel: [] for channel in self.channels})
+
+        if not self.sample_count or not self.levels:
+            return empty
+
+        if start is None:
+            start = self.oldest_time()
+        if end is None:
+            latest = self.latest_time()
+            end = latest + self.levels[0].resolution if latest is not None else start
+        if end < start:
+            return empty
+
+        exported = self.select_level(start, end, max_points).export(start, end, max_points)
+
+        result = {
+            "time": exported["time"],
+            "resolution": exported["resolution"],
+            "min": {},
+            "max": {},
+        }
+        counts = exported["counts"]
+        for i, channel in enumerate(self.channels):
+            result[channel] = [s / c if c else None for s, c in zip(exported["sums"][i], counts)]
+            result["min"][channel] = exported["mins"][i]
+            result["max"][channel] = exported["maxs"][i]
+
+        return result
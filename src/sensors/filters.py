@@ -0,0 +1,367 @@
+import os
+from collections import deque
+import numpy as np
+from src.utils.logging import Logger
+
+# Filter kinds accepted in SENSOR_FILTERS and the number of parameters each takes
+FILTER_KINDS = {"lowpass": 1, "highpass": 1, "bandstop": 2, "moving_average": 1}
+
+# Butterworth order used by lowpass, highpass and bandstop filters
+DEFAULT_FILTER_ORDER = 2
+
+# Seconds of samples per sample rate measurement
+RATE_BLOCK_SECONDS = 1.0
+
+# Measurements discarded at the start of a stream, while the device clock estimate settles
+RATE_WARMUP_BLOCKS = 1
+
+# Weight of each new measurement in the sample rate estimate
+RATE_SMOOTHING = 1 / 4
+
+# Relative change of the estimated rate that makes filters be redesigned
+RATE_TOLERANCE = 0.2
+
+
+def parse_filter_specs(sensor_type, env_value=None):
+    """
+    Read the filters configured for a sensor type.
+
+    SENSOR_FILTERS is a comma-separated list of sensor.name=kind:params
+    entries, e.g. "accelerometer.lp=lowpass:5,*.notch=bandstop:45:55,
+    magnetometer.avg=moving_average:10", where * matches every sensor, the
+    name suffixes the derived channels (x_lp, y_lp, ...) and params are
+    cutoff frequencies in Hz or, for moving_average, a window in samples.
+
+    Args:
+        sensor_type (str): Sensor type
+        env_value (str, optional): Specification, defaults to SENSOR_FILTERS
+
+    Returns:
+        list: (name, kind, params) tuples, in configuration order
+    """
+    if env_value is None:
+        env_value = os.getenv("SENSOR_FILTERS", "")
+    specs = []
+    for entry in env_value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            target, definition = entry.split("=", 1)
+            sensor, name = target.strip().split(".", 1)
+            kind, *params = definition.strip().split(":")
+            params = tuple(float(param) for param in params)
+            if kind not in FILTER_KINDS or len(params) != FILTER_KINDS[kind] or not name.isidentifier():
+                raise ValueError(entry)
+            if kind == "bandstop" and not 0 < params[0] < params[1]:
+                raise ValueError(entry)
+            if any(param <= 0 for param in params):
+                raise ValueError(entry)
+        except ValueError:
+            Logger.log_error(f"Invalid SENSOR_FILTERS entry: '{entry}'. Expected sensor.name=kind:params "
+                             f"with kind one of {', '.join(FILTER_KINDS)}", key="sensor_filters_error")
+            continue
+        if sensor in (sensor_type, "*") and name not in (spec[0] for spec in specs):
+            specs.append((name, kind, params))
+    return specs
+
+
+class SosFilter:
+    """
+    Butterworth lowpass, highpass or bandstop filter as second-order sections.
+
+    The state of every section and channel persists between calls in the
+    transposed direct form II layout scipy's sosfilt uses, so single
+    samples (stepped in Python) and batches (scipy.signal.sosfilt with zi)
+    continue the same stream. Until the sample rate is known the filter
+    passes samples through.
+    """
+
+    def __init__(self, kind, params, channel_count, order):
+        """
+        Initialize the filter.
+
+        Args:
+            kind (str): "lowpass", "highpass" or "bandstop"
+            params (tuple): Cutoff frequency, or low and high edge for bandstop, in Hz
+            channel_count (int): Number of filtered channels
+            order (int): Butterworth order
+        """
+        self.kind = kind
+        self.params = params
+        self.channel_count = channel_count
+        self.order = order
+        self.sos = None
+        self.sections = None
+        self.state = None
+
+    def design(self, sample_rate, last_values):
+        """
+        Design the filter for a sample rate and settle it on the latest values.
+
+        Args:
+            sample_rate (float): Samples per second
+            last_values (tuple): Latest raw value per channel, used as the steady state
+        """
+        from scipy import signal
+
+        nyquist = sample_rate / 2
+        if max(self.params) >= nyquist:
+            Logger.log_error(f"{self.kind} filter at {self.params} Hz is above the Nyquist frequency "
+                             f"({nyquist:g} Hz); passing samples through", key=f"filter_design_{self.kind}")
+            self.sos = None
+            return
+        btype = {"lowpass": "lowpass", "highpass": "highpass", "bandstop": "bandstop"}[self.kind]
+        cutoff = self.params[0] if len(self.params) == 1 else list(self.params)
+        self.sos = signal.butter(self.order, cutoff, btype=btype, fs=sample_rate, output="sos")
+        self.sections = [tuple(float(v) for v in (b0, b1, b2, a1, a2))
+                         for b0, b1, b2, _, a1, a2 in self.sos]
+        steady = signal.sosfilt_zi(self.sos)
+        self.state = [[[float(z0 * value), float(z1 * value)] for value in last_values] for z0, z1 in steady]
+
+    def step(self, values):
+        """
+        Filter one sample.
+
+        Args:
+            values (tuple): One raw value per channel
+
+        Returns:
+            list: One filtered value per channel
+        """
+        if self.sos is None:
+            return list(values)
+        output = []
+        for channel, x in enumerate(values):
+            for (b0, b1, b2, a1, a2), section in zip(self.sections, self.state):
+                z = section[channel]
+                y = b0 * x + z[0]
+                z[0] = b1 * x - a1 * y + z[1]
+                z[1] = b2 * x - a2 * y
+                x = y
+            output.append(x)
+        return output
+
+    def run(self, columns):
+        """
+        Filter a batch.
+
+        Args:
+            columns (np.ndarray): Raw samples, shape (channels, samples)
+
+        Returns:
+            np.ndarray: Filtered samples, same shape
+        """
+        if self.sos is None:
+            return columns
+        from scipy import signal
+
+        # sosfilt state layout for axis=1 is (sections, channels, 2)
+        output, state = signal.sosfilt(self.sos, columns, axis=1, zi=np.asarray(self.state))
+        self.state = state.tolist()
+        return output
+
+
+class MovingAverage:
+    """Moving average over a fixed number of samples, kept as a running sum."""
+
+    def __init__(self, window, channel_count):
+        """
+        Initialize the filter.
+
+        Args:
+            window (float): Window length in samples
+            channel_count (int): Number of filtered channels
+        """
+        self.window = max(int(window), 1)
+        self.history = [deque(maxlen=self.window) for _ in range(channel_count)]
+        self.sums = [0.0] * channel_count
+
+    def design(self, sample_rate, last_values):
+        """Nothing to design: the window is in samples."""
+
+    def step(self, values):
+        """
+        Filter one sample.
+
+        Args:
+            values (tuple): One raw value per channel
+
+        Returns:
+            list: Mean of the last window samples per channel (fewer at the start)
+        """
+        output = []
+        for channel, value in enumerate(values):
+            history = self.history[channel]
+            if len(history) == self.window:
+                self.sums[channel] -= history[0]
+            history.append(value)
+            self.sums[channel] += value
+            output.append(self.sums[channel] / len(history))
+        return output
+
+    def run(self, columns):
+        """
+        Filter a batch with cumulative sums over the kept history and the batch.
+
+        Args:
+            columns (np.ndarray): Raw samples, shape (channels, samples)
+
+        Returns:
+            np.ndarray: Filtered samples, same shape
+        """
+        output = np.empty_like(columns)
+        count = columns.shape[1]
+        for channel, history in enumerate(self.history):
+            kept = len(history)
+            values = np.concatenate((np.fromiter(history, dtype=float, count=kept), columns[channel]))
+            sums = np.concatenate(([0.0], np.cumsum(values)))
+            ends = np.arange(kept + 1, kept + count + 1)
+            starts = np.maximum(ends - self.window, 0)
+            output[channel] = (sums[ends] - sums[starts]) / (ends - starts)
+            history.extend(columns[channel][-self.window:].tolist())
+            self.sums[channel] = float(sum(history))
+        return output
+
+
+class FilterBank:
+    """
+    Derived filtered channels of one sensor.
+
+    Every configured filter runs on the raw channels in parallel and adds
+    one derived channel per raw channel, named <channel>_<filter name>.
+    Filters keep their state between samples and between batches, so a
+    stream is filtered exactly once no matter how it is chunked. Frequency
+    filters are designed from FILTER_SAMPLE_RATE when set, otherwise from
+    the sample rate estimated from the stream, and redesigned when that
+    estimate moves by more than RATE_TOLERANCE.
+    """
+
+    def __init__(self, sensor_type, channels):
+        """
+        Initialize the bank from SENSOR_FILTERS.
+
+        Args:
+            sensor_type (str): Sensor type
+            channels (tuple): Raw channel names
+        """
+        self.raw_channels = tuple(channels)
+        order = int(os.getenv("FILTER_ORDER", DEFAULT_FILTER_ORDER))
+        self.fixed_rate = float(os.getenv("FILTER_SAMPLE_RATE", 0)) or None
+
+        self.filters = []
+        self.channels = ()
+        for name, kind, params in parse_filter_specs(sensor_type):
+            if kind == "moving_average":
+                stream_filter = MovingAverage(params[0], len(channels))
+            else:
+                stream_filter = SosFilter(kind, params, len(channels), order)
+            self.filters.append(stream_filter)
+            self.channels += tuple(f"{channel}_{name}" for channel in channels)
+
+        self.sample_rate = None
+        self.measured_rate = None
+        self.block_start = None
+        self.block_intervals = 0
+        self.blocks = 0
+        self.last_time = None
+        self.last_values = None
+
+    def __bool__(self):
+        """bool: True if any filter is configured."""
+        return bool(self.filters)
+
+    def _observe_time(self, timestamp):
+        """
+        Update the sample rate estimate with one sample time.
+
+        The rate is measured over blocks of RATE_BLOCK_SECONDS as intervals
+        per second, which stays right when samples arrive bunched together;
+        a silence of a whole block starts a new block instead of lowering it.
+        The first RATE_WARMUP_BLOCKS blocks are discarded.
+
+        Args:
+            timestamp (float): Sample time in seconds
+
+        Returns:
+            bool: True if a block closed and the estimate changed
+        """
+        last_time, self.last_time = self.last_time, timestamp
+        if self.block_start is None or timestamp - last_time >= RATE_BLOCK_SECONDS:
+            self.block_start = timestamp
+            self.block_intervals = 0
+            return False
+        self.block_intervals += 1
+        span = timestamp - self.block_start
+        if span < RATE_BLOCK_SECONDS:
+            return False
+        rate = self.block_intervals / span
+        self.block_start = timestamp
+        self.block_intervals = 0
+        self.blocks += 1
+        if self.blocks <= RATE_WARMUP_BLOCKS:
+            return False
+        if self.measured_rate is None:
+            self.measured_rate = rate
+        else:
+            self.measured_rate += (rate - self.measured_rate) * RATE_SMOOTHING
+        return True
+
+    def _maybe_design(self):
+        """Design the filters once the sample rate is known, and again when it moved."""
+        rate = self.fixed_rate or self.measured_rate
+        if rate is None:
+            return
+        if self.sample_rate is not None and abs(rate - self.sample_rate) <= RATE_TOLERANCE * self.sample_rate:
+            return
+        self.sample_rate = rate
+        for stream_filter in self.filters:
+            stream_filter.design(rate, self.last_values)
+
+    def process(self, timestamp, values):
+        """
+        Filter one sample.
+
+        Args:
+            timestamp (float): Sample time in seconds
+            values (tuple): One raw value per channel
+
+        Returns:
+            tuple: Derived values, in the order of channels
+        """
+        if self.last_values is None:
+            self.last_values = values
+            self._maybe_design()
+        if self._observe_time(timestamp):
+            self._maybe_design()
+        derived = []
+        for stream_filter in self.filters:
+            derived.extend(stream_filter.step(values))
+        self.last_values = values
+        return tuple(derived)
+
+    def process_batch(self, times, columns):
+        """
+        Filter a batch with one vectorized call per filter.
+
+        Args:
+            times (list): Sample times in seconds
+            columns (list): One sequence of raw values per channel, aligned with times
+
+        Returns:
+            list: One list of derived values per derived channel
+        """
+        if not times:
+            return [[] for _ in self.channels]
+        if self.last_values is None:
+            self.last_values = tuple(column[0] for column in columns)
+        for timestamp in times:
+            self._observe_time(timestamp)
+        self._maybe_design()
+
+        raw = np.asarray(columns, dtype=float)
+        derived = []
+        for stream_filter in self.filters:
+            derived.extend(stream_filter.run(raw).tolist())
+        self.last_values = tuple(float(column[-1]) for column in raw)
+        return derived
@@ -6,11 +6,14 @@ from src.connection.event_bus import EventBus
 from src.sensors.accelerometer import Accelerometer
 from src.sensors.base_sensor import GYROSCOPE, DIVIDER, EXTENSION
 from src.utils.logging import Logger
+from src.sensors.recording import RecordingWriter
 
 
 class Gyroscope(Accelerometer):
     """Gyroscope sensor implementation."""
 
+    sensor_type = GYROSCOPE
+
     def process_data(self, data):
         """
         Process received gyroscope data.
@@ -22,21 +25,12 @@ class Gyroscope(Accelerometer):
             bool: True if data processed successfully
         """
         try:
-            accel_x = data.get("x", float("nan"))
-            accel_y = data.get("y", float("nan"))
-            accel_z = data.get("z", float("nan"))
-
-            if not all(
-                    isinstance(v, (int, float)) for v in (accel_x, accel_y, accel_z)
-            ):
+            values = self.extract_values(data)
+            if values is None:
                 return False
 
-            with self.data_lock:
-                current_time = time.time() - self.start_time
-                self.data_t.append(current_time)
-                self.data_x.append(accel_x)
-                self.data_y.append(accel_y)
-                self.data_z.append(accel_z)
+            current_time = self.sample_time(data) - self.start_time
+            self.store_sample(current_time, values)
 
             EventBus.publish(
                 "sensor_update",
@@ -54,7 +48,7 @@ class Gyroscope(Accelerometer):
 
     def save_to_file(self, data, device_name, device_id):
         """
-        Save gyroscope data to CSV file.
+        Queue gyroscope data for its CSV file (written by RecordingWriter).
 
         Args:
             data (dict): Gyroscope data to be saved
@@ -62,18 +56,18 @@ class Gyroscope(Accelerometer):
             device_id (str): Device identifier
 
         Returns:
-            bool: True if data saved successfully
+            bool: True if data was queued for writing
         """
         try:
             gyro_x = data.get("x", float("nan"))
             gyro_y = data.get("y", float("nan"))
             gyro_z = data.get("z", float("nan"))
 
+            sample_time = self.last_sample_time if self.last_sample_time is not None else time.time()
             if self.date_in_milliseconds:
-                current_time_seconds = time.time()
-                timestamp = round(current_time_seconds - self.start_time, 4)
+                timestamp = round(sample_time - self.start_time, 4)
             else:
-                timestamp = datetime.now().isoformat()
+                timestamp = datetime.fromtimestamp(sample_time).isoformat()
             start_time_formatted = datetime.fromtimestamp(self.start_time).strftime('%d_%m_%y___%H_%M_%S')
             file_path = (
                     os.getenv("DATA_FILE_PATH", "")
@@ -86,17 +80,11 @@ class Gyroscope(Accelerometer):
                     + start_time_formatted
                     + EXTENSION
             )
-            is_new_file = not os.path.exists(file_path)
-
-            with open(file_path, "a+") as f:
-                if is_new_file:
-                    f.write(
-                        "timestamp,gyro_x,gyro_y,gyro_z\n"
-                    )
-                f.write(
-                    f"{timestamp},{gyro_x},{gyro_y},{gyro_z}\n"
-                )
-            return True
+            return RecordingWriter.write(
+                file_path,
+                "timestamp,gyro_x,gyro_y,gyro_z\n",
+                f"{timestamp},{gyro_x},{gyro_y},{gyro_z}\n"
+            )
         except Exception as e:
             Logger.log_error(f"Error saving gyroscope data: {e}")
             return False
\ No newline at end of file
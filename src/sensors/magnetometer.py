@@ -1,11 +1,11 @@
 import os
 from datetime import datetime
 import time
-from collections import deque
 
 from src.connection.event_bus import EventBus
 from src.sensors.base_sensor import Sensor, DIVIDER, EXTENSION
 from src.utils.logging import Logger
+from src.sensors.recording import RecordingWriter
 
 MAGNETOMETER = "magnetometer"
 
@@ -13,14 +13,12 @@ MAGNETOMETER = "magnetometer"
 class Magnetometer(Sensor):
     """Magnetometer sensor implementation."""
 
+    sensor_type = MAGNETOMETER
+
     def initialize_data_storage(self):
-        """Initialize data storage structures for magnetometer."""
+        """Initialize timing state for magnetometer."""
         self.header_time = datetime.now()
         self.start_time = time.time()
-        self.data_t = deque(maxlen=self.max_data_points)
-        self.data_x = deque(maxlen=self.max_data_points)
-        self.data_y = deque(maxlen=self.max_data_points)
-        self.data_z = deque(maxlen=self.max_data_points)
 
     def process_data(self, data):
         """
@@ -33,21 +31,12 @@ class Magnetometer(Sensor):
             bool: True if data processed successfully
         """
         try:
-            mag_x = data.get("x", float("nan"))
-            mag_y = data.get("y", float("nan"))
-            mag_z = data.get("z", float("nan"))
-
-            if not all(
-                    isinstance(v, (int, float)) for v in (mag_x, mag_y, mag_z)
-            ):
+            values = self.extract_values(data)
+            if values is None:
                 return False
 
-            with self.data_lock:
-                current_time = time.time() - self.start_time
-                self.data_t.append(current_time)
-                self.data_x.append(mag_x)
-                self.data_y.append(mag_y)
-                self.data_z.append(mag_z)
+            current_time = self.sample_time(data) - self.start_time
+            self.store_sample(current_time, values)
 
             EventBus.publish(
                 "sensor_update",
@@ -73,17 +62,11 @@ class Magnetometer(Sensor):
         Returns:
             dict: Dictionary containing time and magnetic field data arrays
         """
-        with self.data_lock:
-            return {
-                "time": list(self.data_t)[-limit:],
-                "x": list(self.data_x)[-limit:],
-                "y": list(self.data_y)[-limit:],
-                "z": list(self.data_z)[-limit:],
-            }
+        return self.get_latest(limit)
 
     def save_to_file(self, data, device_name, device_id):
         """
-        Save magnetometer data to CSV file.
+        Queue magnetometer data for its CSV file (written by RecordingWriter).
 
         Args:
             data (dict): Magnetometer data to be saved
@@ -91,18 +74,18 @@ class Magnetometer(Sensor):
             device_id (str): Device identifier
 
         Returns:
-            bool: True if data saved successfully
+            bool: True if data was queued for writing
         """
         try:
             mag_x = data.get("x", float("nan"))
             mag_y = data.get("y", float("nan"))
             mag_z = data.get("z", float("nan"))
 
+            sample_time = self.last_sample_time if self.last_sample_time is not None else time.time()
             if self.date_in_milliseconds:
-                current_time_seconds = time.time()
-                timestamp = round(current_time_seconds - self.start_time, 4)
+                timestamp = round(sample_time - self.start_time, 4)
             else:
-                timestamp = datetime.now().isoformat()
+                timestamp = datetime.fromtimestamp(sample_time).isoformat()
 
             start_time_formatted = datetime.fromtimestamp(self.start_time).strftime('%d_%m_%y___%H_%M_%S')
             file_path = (
@@ -116,17 +99,11 @@ class Magnetometer(Sensor):
                     + start_time_formatted
                     + EXTENSION
             )
-            is_new_file = not os.path.exists(file_path)
-
-            with open(file_path, "a+") as f:
-                if is_new_file:
-                    f.write(
-                        "timestamp,mag_x,mag_y,mag_z\n"
-                    )
-                f.write(
-                    f"{timestamp},{mag_x},{mag_y},{mag_z}\n"
-                )
-            return True
+            return RecordingWriter.write(
+                file_path,
+                "timestamp,mag_x,mag_y,mag_z\n",
+                f"{timestamp},{mag_x},{mag_y},{mag_z}\n"
+            )
         except Exception as e:
             Logger.log_error(f"Error saving magnetometer data: {e}")
             return False
\ No newline at end of file
@@ -0,0 +1,399 @@
+from datetime import datetime
+import math
+import os
+import time
+import numpy as np
+from src.utils.logging import Logger
+from src.sensors.base_sensor import Sensor, ACCELEROMETER, GYROSCOPE, MAGNETOMETER, ORIENTATION
+from src.connection.event_bus import EventBus
+
+# Fusion algorithms accepted in ORIENTATION_FUSION ("off" disables the orientation sensor)
+FUSION_METHODS = ("madgwick", "off")
+
+# Madgwick gradient step gain: higher trusts accelerometer and magnetometer more than the gyroscope
+DEFAULT_BETA = 0.1
+
+# Seconds between gyroscope samples after which the orientation restarts from accelerometer and magnetometer
+DEFAULT_MAX_GAP = 1.0
+
+
+def _normalize(x, y, z):
+    """
+    Scale a vector to unit length.
+
+    Args:
+        x (float): X component
+        y (float): Y component
+        z (float): Z component
+
+    Returns:
+        tuple: Unit vector, or None for a zero or non-finite vector
+    """
+    norm = math.sqrt(x * x + y * y + z * z)
+    if not norm or not math.isfinite(norm):
+        return None
+    return x / norm, y / norm, z / norm
+
+
+def _finite(values):
+    """
+    Check that every component of a reading is finite.
+
+    Args:
+        values (tuple): Reading or quaternion
+
+    Returns:
+        bool: True if no component is NaN or infinite
+    """
+    return all(math.isfinite(value) for value in values)
+
+
+def initial_quaternion(accel, mag=None):
+    """
+    Compute the orientation of a resting device from gravity and, if available, the magnetic field.
+
+    The earth frame has x towards magnetic north, y west and z up, the
+    frame the Madgwick filter converges to; without a magnetometer the
+    heading is zero.
+
+    Args:
+        accel (tuple): Accelerometer reading (any unit)
+        mag (tuple, optional): Magnetometer reading (any unit)
+
+    Returns:
+        tuple: Quaternion (w, x, y, z) rotating sensor into earth coordinates, or None
+    """
+    up = _normalize(*accel)
+    if up is None:
+        return None
+    west = _normalize(*np.cross(up, mag)) if mag is not None else None
+    if west is None:
+        # No usable heading: pick any horizontal axis as north
+        reference = (1.0, 0.0, 0.0) if abs(up[0]) < 0.9 else (0.0, 1.0, 0.0)
+        west = _normalize(*np.cross(up, reference))
+    north = tuple(np.cross(west, up))
+
+    # Rows of the sensor-to-earth rotation are the earth axes in sensor coordinates
+    (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = north, west, up
+    trace = m00 + m11 + m22
+    if trace > 0:
+        s = 2.0 * math.sqrt(trace + 1.0)
+        q = (0.25 * s, (m21 - m12) / s, (m02 - m20) / s, (m10 - m01) / s)
+    elif m00 > m11 and m00 > m22:
+        s = 2.0 * math.sqrt(1.0 + m00 - m11 - m22)
+        q = ((m21 - m12) / s, 0.25 * s, (m01 + m10) / s, (m02 + m20) / s)
+    elif m11 > m22:
+        s = 2.0 * math.sqrt(1.0 + m11 - m00 - m22)
+        q = ((m02 - m20) / s, (m01 + m10) / s, 0.25 * s, (m12 + m21) / s)
+    else:
+        s = 2.0 * math.sqrt(1.0 + m22 - m00 - m11)
+        q = ((m10 - m01) / s, (m02 + m20) / s, (m12 + m21) / s, 0.25 * s)
+    return tuple(float(v) for v in q)
+
+
+def madgwick_step(q, gyro, accel, mag, dt, beta):
+    """
+    Advance the orientation by one gyroscope sample (Madgwick's gradient descent filter).
+
+    The quaternion rate from the gyroscope is corrected by a step of size
+    beta along the gradient that aligns the predicted gravity and, when
+    the magnetometer is usable, magnetic field with the measured ones.
+
+    Args:
+        q (tuple): Current quaternion (w, x, y, z)
+        gyro (tuple): Angular velocity in rad/s
+        accel (tuple): Accelerometer reading, or None
+        mag (tuple): Magnetometer reading, or None
+        dt (float): Seconds since the previous gyroscope sample
+        beta (float): Gradient step gain
+
+    Returns:
+        tuple: Updated unit quaternion, or None if the step overflowed
+    """
+    q0, q1, q2, q3 = q
+    gx, gy, gz = gyro
+    dq0 = 0.5 * (-q1 * gx - q2 * gy - q3 * gz)
+    dq1 = 0.5 * (q0 * gx + q2 * gz - q3 * gy)
+    dq2 = 0.5 * (q0 * gy - q1 * gz + q3 * gx)
+    dq3 = 0.5 * (q0 * gz + q1 * gy - q2 * gx)
+
+    a = _normalize(*accel) if accel is not None else None
+    if a is not None:
+        ax, ay, az = a
+        # Gravity error: predicted minus measured direction of "up" in sensor coordinates
+        f1 = 2 * (q1 * q3 - q0 * q2) - ax
+        f2 = 2 * (q0 * q1 + q2 * q3) - ay
+        f3 = 2 * (0.5 - q1 * q1 - q2 * q2) - az
+        s0 = -2 * q2 * f1 + 2 * q1 * f2
+        s1 = 2 * q3 * f1 + 2 * q0 * f2 - 4 * q1 * f3
+        s2 = -2 * q0 * f1 + 2 * q3 * f2 - 4 * q2 * f3
+        s3 = 2 * q1 * f1 + 2 * q2 * f2
+
+        m = _normalize(*mag) if mag is not None else None
+        if m is not None:
+            mx, my, mz = m
+            # Measured field in earth coordinates, reduced to its north and vertical components
+            hx = (mx * (0.5 - q2 * q2 - q3 * q3) + my * (q1 * q2 - q0 * q3) + mz * (q1 * q3 + q0 * q2)) * 2
+            hy = (mx * (q1 * q2 + q0 * q3) + my * (0.5 - q1 * q1 - q3 * q3) + mz * (q2 * q3 - q0 * q1)) * 2
+            hz = (mx * (q1 * q3 - q0 * q2) + my * (q2 * q3 + q0 * q1) + mz * (0.5 - q1 * q1 - q2 * q2)) * 2
+            bx = math.sqrt(hx * hx + hy * hy)
+            bz = hz
+            g1 = 2 * bx * (0.5 - q2 * q2 - q3 * q3) + 2 * bz * (q1 * q3 - q0 * q2) - mx
+            g2 = 2 * bx * (q1 * q2 - q0 * q3) + 2 * bz * (q0 * q1 + q2 * q3) - my
+            g3 = 2 * bx * (q0 * q2 + q1 * q3) + 2 * bz * (0.5 - q1 * q1 - q2 * q2) - mz
+            s0 += -2 * bz * q2 * g1 + (-2 * bx * q3 + 2 * bz * q1) * g2 + 2 * bx * q2 * g3
+            s1 += 2 * bz * q3 * g1 + (2 * bx * q2 + 2 * bz * q0) * g2 + (2 * bx * q3 - 4 * bz * q1) * g3
+            s2 += ((-4 * bx * q2 - 2 * bz * q0) * g1 + (2 * bx * q1 + 2 * bz * q3) * g2
+                   + (2 * bx * q0 - 4 * bz * q2) * g3)
+            s3 += (-4 * bx * q3 + 2 * bz * q1) * g1 + (-2 * bx * q0 + 2 * bz * q2) * g2 + 2 * bx * q1 * g3
+
+        norm = math.sqrt(s0 * s0 + s1 * s1 + s2 * s2 + s3 * s3)
+        if norm:
+            dq0 -= beta * s0 / norm
+            dq1 -= beta * s1 / norm
+            dq2 -= beta * s2 / norm
+            dq3 -= beta * s3 / norm
+
+    q0 += dq0 * dt
+    q1 += dq1 * dt
+    q2 += dq2 * dt
+    q3 += dq3 * dt
+    norm = math.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+    if not norm or not math.isfinite(norm):
+        return None
+    return q0 / norm, q1 / norm, q2 / norm, q3 / norm
+
+
+class Orientation(Sensor):
+    """
+    Virtual sensor holding the orientation fused from a device's motion sensors.
+
+    Samples are not received but computed: the sensor follows the rings
+    of its device's gyroscope, accelerometer and magnetometer with
+    cursors and, on each gyroscope update, reads the new samples in one
+    batch, pairs every gyroscope sample with the latest accelerometer
+    and magnetometer samples taken at or before it, and advances a
+    Madgwick filter. The quaternion and Euler angles (degrees, roll about
+    x, pitch about y, yaw about z from magnetic north) are stored like
+    any sensor's channels, so the data, overview, spectrum and WebSocket
+    APIs serve them unchanged.
+
+    Fused sensors register in the class-level registry of the process
+    that ingests the device; web worker copies only mirror the results.
+    """
+
+    sensor_type = ORIENTATION
+
+    channels = ("qw", "qx", "qy", "qz", "roll", "pitch", "yaw")
+
+    fused = {}
+    _subscribed = False
+
+    def initialize_data_storage(self):
+        """Initialize timing and fusion state."""
+        self.header_time = datetime.now()
+        self.start_time = time.time()
+        self.beta = float(os.getenv("ORIENTATION_BETA", DEFAULT_BETA))
+        self.max_gap = float(os.getenv("ORIENTATION_MAX_GAP", DEFAULT_MAX_GAP))
+        self.sources = {}
+        self.cursors = {}
+        self.held = {}
+        self.quaternion = None
+        self.last_gyro_time = None
+
+    @classmethod
+    def attach(cls, device_id, sensors):
+        """
+        Create the orientation sensor of a device and start fusing its motion sensors.
+
+        Args:
+            device_id (str): Device identifier
+            sensors (dict): Physical sensors of the device, keyed by sensor type
+
+        Returns:
+            dict: {"orientation": Orientation}, or empty when ORIENTATION_FUSION is off or
+                the device has no gyroscope or accelerometer
+        """
+        method = os.getenv("ORIENTATION_FUSION", "madgwick")
+        if method not in FUSION_METHODS:
+            Logger.log_error(f"Invalid ORIENTATION_FUSION: '{method}'. Use one of {', '.join(FUSION_METHODS)}. "
+                             f"Using default: madgwick.", key="orientation_fusion_error")
+            method = "madgwick"
+        if method == "off" or GYROSCOPE not in sensors or ACCELEROMETER not in sensors:
+            return {}
+
+        if not cls._subscribed:
+            EventBus.subscribe("sensor_update", cls.handle_sensor_update)
+            EventBus.subscribe("device_disconnected", cls.handle_device_disconnected)
+            cls._subscribed = True
+
+        orientation = cls(device_id, sensors[GYROSCOPE].max_data_points)
+        for sensor_type in (GYROSCOPE, ACCELEROMETER, MAGNETOMETER):
+            if sensor_type in sensors:
+                orientation.sources[sensor_type] = sensors[sensor_type]
+                orientation.cursors[sensor_type] = sensors[sensor_type].sample_count
+                orientation.held[sensor_type] = (np.empty(0), np.empty((0, 3)))
+        cls.fused[device_id] = orientation
+        return {ORIENTATION: orientation}
+
+    def _read(self, sensor_type):
+        """
+        Read the samples a source added since its cursor.
+
+        Args:
+            sensor_type (str): Source sensor type
+
+        Returns:
+            tuple: Absolute sample times (n,) and raw values (n, 3)
+        """
+        sensor = self.sources[sensor_type]
+        result = sensor.get_data_since(since=self.cursors[sensor_type])
+        self.cursors[sensor_type] = result["cursor"]
+        data = result["data"]
+        times = np.asarray(data["time"], dtype=float) + sensor.start_time
+        values = np.asarray([data[channel] for channel in sensor.raw_channels], dtype=float).T.reshape(-1, 3)
+        return times, values
+
+    def _hold(self, sensor_type, gyro_times):
+        """
+        Pair gyroscope samples with the latest sample of another source taken at or before each.
+
+        Args:
+            sensor_type (str): Source sensor type
+            gyro_times (np.ndarray): Absolute gyroscope sample times
+
+        Returns:
+            list: One value tuple (or None before the source's first sample) per gyroscope sample
+        """
+        if sensor_type not in self.sources:
+            return [None] * len(gyro_times)
+        held_times, held_values = self.held[sensor_type]
+        times, values = self._read(sensor_type)
+        if len(times):
+            held_times = np.concatenate((held_times, times))
+            held_values = np.concatenate((held_values, values))
+        indices = np.searchsorted(held_times, gyro_times, side="right") - 1
+
+        # Keep the sample used last (and newer ones) for the next batch
+        keep = max(int(indices[-1]), 0) if len(indices) else max(len(held_times) - 1, 0)
+        self.held[sensor_type] = (held_times[keep:], held_values[keep:])
+        rows = held_values.tolist()
+        return [tuple(rows[i]) if i >= 0 else None for i in indices.tolist()]
+
+    def update(self):
+        """
+        Fuse the gyroscope samples added since the last update.
+
+        Returns:
+            int: Number of orientation samples stored
+        """
+        gyro_times, gyro_values = self._read(GYROSCOPE)
+        if not len(gyro_times):
+            return 0
+        accels = self._hold(ACCELEROMETER, gyro_times)
+        mags = self._hold(MAGNETOMETER, gyro_times)
+
+        times = []
+        quaternions = []
+        q = self.quaternion
+        last_time = self.last_gyro_time
+        for t, gyro, accel, mag in zip(gyro_times.tolist(), gyro_values.tolist(), accels, mags):
+            if not _finite(gyro):
+                # The next gyroscope sample integrates over this one's interval too
+                continue
+            accel = accel if accel is not None and _finite(accel) else None
+            mag = mag if mag is not None and _finite(mag) else None
+            dt = t - last_time if last_time is not None else None
+            last_time = t
+            if q is not None and dt is not None and 0 < dt <= self.max_gap:
+                q = madgwick_step(q, gyro, accel, mag, dt, self.beta)
+            if q is None or dt is None or dt > self.max_gap:
+                # Start (or restart after a gap or a diverged step) from gravity and the magnetic field
+                q = initial_quaternion(accel, mag) if accel is not None else None
+                if q is None:
+                    continue
+            times.append(t - self.start_time)
+            quaternions.append(q)
+        self.quaternion = q
+        self.last_gyro_time = last_time
+        if not times:
+            return 0
+
+        qw, qx, qy, qz = np.asarray(quaternions).T
+        roll = np.degrees(np.arctan2(2 * (qw * qx + qy * qz), 1 - 2 * (qx * qx + qy * qy)))
+        pitch = np.degrees(np.arcsin(np.clip(2 * (qw * qy - qz * qx), -1.0, 1.0)))
+        yaw = np.degrees(np.arctan2(2 * (qw * qz + qx * qy), 1 - 2 * (qy * qy + qz * qz)))
+        self.store_samples(times, [column.tolist() for column in (qw, qx, qy, qz, roll, pitch, yaw)])
+        return len(times)
+
+    @classmethod
+    def handle_sensor_update(cls, event_data):
+        """
+        Fuse new gyroscope samples of a device (Event Bus callback).
+
+        Args:
+            event_data (dict): Event data containing device_id and sensor_type
+        """
+        if event_data["sensor_type"] != GYROSCOPE:
+            return
+        device_id = event_data["device_id"]
+        orientation = cls.fused.get(device_id)
+        if orientation is None or not orientation.update():
+            return
+
+        from src.connection.bluetooth_server import DeviceManager
+
+        DeviceManager.note_sensor_data(device_id, ORIENTATION)
+        EventBus.publish("sensor_update", {
+            "device_id": device_id,
+            "sensor_type": ORIENTATION,
+            "data": orientation.get_data(),
+        })
+
+    @classmethod
+    def handle_device_disconnected(cls, event_data):
+        """
+        Stop fusing a removed device (Event Bus callback).
+
+        Args:
+            event_data (dict): Event data containing device_id
+        """
+        cls.fused.pop(event_data.get("device_id"), None)
+
+    def process_data(self, data):
+        """
+        Reject received messages: orientation is computed from the other sensors.
+
+        Args:
+            data (dict): Data received from sensor
+
+        Returns:
+            bool: Always False
+        """
+        return False
+
+    def get_data(self, limit=100):
+        """
+        Get orientation data with optional limit.
+
+        Args:
+            limit (int): Maximum number of data points to return
+
+        Returns:
+            dict: Dictionary containing time, quaternion and Euler angle arrays
+        """
+        return self.get_latest(limit)
+
+    def save_to_file(self, data, device_name, device_id):
+        """
+        Skip recording: the orientation can be recomputed from the recorded sensors.
+
+        Args:
+            data (dict): Data to be saved
+            device_name (str): Device name
+            device_id (str): Device identifier
+
+        Returns:
+            bool: Always False
+        """
+        return False
@@ -0,0 +1,165 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from src.utils.health import HealthMonitor
+from src.utils.logging import Logger
+from src.utils.metrics import Metrics
+
+# Rows queued for writing before new rows are dropped
+DEFAULT_QUEUE_SIZE = 100000
+
+# Seconds between flushes of the open files, and seconds before an unused file is closed
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_IDLE_CLOSE = 30.0
+
+DROPPED_ROWS = Metrics.counter("pub_recording_dropped_rows_total", "CSV rows dropped because the writer queue was full")
+
+
+class RecordingWriter:
+    """
+    Appends sensor rows to CSV files from a background thread.
+
+    The ingest path only formats a row and puts it on a bounded queue; the
+    writer thread keeps each file open, writes the header when it creates a
+    file, flushes once per interval and closes files that stopped receiving
+    rows. The queue length is the recording backlog reported by /health.
+
+    Configuration (environment):
+        RECORDING_QUEUE_SIZE: Maximum queued rows (default 100000)
+        RECORDING_FLUSH_INTERVAL: Seconds between flushes (default 1.0)
+        RECORDING_IDLE_CLOSE: Seconds before an unused file is closed (default 30)
+    """
+    _queue = None
+    _thread = None
+    _lock = threading.Lock()
+
+    # Backlog reported by ingest worker processes, keyed by worker slot
+    remote_backlogs = {}
+
+    @classmethod
+    def start(cls):
+        """Create the queue and start the writer thread (idempotent)."""
+        with cls._lock:
+            if cls._thread is not None:
+                return
+            cls._queue = queue.Queue(maxsize=int(os.getenv("RECORDING_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)))
+            cls._thread = threading.Thread(target=cls._run, name="recording-writer", daemon=True)
+            cls._thread.start()
+            atexit.register(cls.shutdown)
+
+    @classmethod
+    def write(cls, file_path, header, row):
+        """
+        Queue one row for a CSV file.
+
+        Args:
+            file_path (str): CSV file path
+            header (str): Header line written when the file is created
+            row (str): Row line
+
+        Returns:
+            bool: True if the row was queued, False if the queue is full
+        """
+        if cls._thread is None:
+            cls.start()
+        try:
+            cls._queue.put_nowait((file_path, header, row))
+            return True
+        except queue.Full:
+            DROPPED_ROWS.inc()
+            Logger.log_warning("Recording queue full, dropping rows", key="recording_queue_full")
+            return False
+
+    @classmethod
+    def backlog(cls):
+        """
+        Get the number of rows waiting to be written in this process.
+
+        Returns:
+            int: Queued rows
+        """
+        return cls._queue.qsize() if cls._queue is not None else 0
+
+    @classmethod
+    def shutdown(cls):
+        """Write every queued row, close the files and stop the writer thread."""
+        with cls._lock:
+            thread, cls._thread = cls._thread, None
+        if thread is not None:
+            cls._queue.put(None)
+            thread.join()
+
+    @classmethod
+    def _run(cls):
+        """Writer thread: drain the queue into open files until shutdown."""
+        flush_interval = float(os.getenv("RECORDING_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL))
+        idle_close = float(os.getenv("RECORDING_IDLE_CLOSE", DEFAULT_IDLE_CLOSE))
+        rows_queue = cls._queue
+        files = {}
+        last_used = {}
+        dirty = set()
+        next_flush = time.monotonic() + flush_interval
+        running = True
+
+        while running:
+            try:
+                item = rows_queue.get(timeout=max(0.0, next_flush - time.monotonic()))
+            except queue.Empty:
+                item = False
+
+            if item is None:
+                running = False
+            elif item:
+                file_path, header, row = item
+                try:
+                    f = files.get(file_path)
+                    if f is None:
+                        f = files[file_path] = open(file_path, "a")
+                        if f.tell() == 0:
+                            f.write(header)
+                    f.write(row)
+                    last_used[file_path] = time.monotonic()
+                    dirty.add(file_path)
+                except OSError as e:
+                    Logger.log_error(f"Error saving data to {file_path}: {e}", key=f"recording_error_{file_path}")
+
+            now = time.monotonic()
+            if now >= next_flush or not running:
+                next_flush = now + flush_interval
+                for file_path in list(files):
+                    try:
+                        if file_path in dirty:
+                            files[file_path].flush()
+                        if not running or now - last_used[file_path] > idle_close:
+                            files.pop(file_path).close()
+                            del last_used[file_path]
+                    except OSError as e:
+                        Logger.log_error(f"Error flushing {file_path}: {e}", key=f"recording_error_{file_path}")
+                        files.pop(file_path, None)
+                        last_used.pop(file_path, None)
+                dirty.clear()
+
+
+def _recording_check():
+    """
+    Report rows waiting to be written, in this process and in ingest workers.
+
+    Returns:
+        dict: Status, total backlog and backlog per process
+    """
+    backlogs = {"main": RecordingWriter.backlog()}
+    for slot, backlog in RecordingWriter.remote_backlogs.items():
+        backlogs[f"ingest-{slot}"] = backlog
+    total = sum(backlogs.values())
+    return {
+        "status": HealthMonitor.classify(total, "RECORDING_BACKLOG", 10000, 50000),
+        "backlog_rows": total,
+        "processes": backlogs,
+    }
+
+
+Metrics.gauge("pub_recording_backlog_rows", "CSV rows waiting for the writer thread", ("process",),
+              function=lambda: {(name,): value for name, value in _recording_check()["processes"].items()})
+HealthMonitor.register_check("recording", _recording_check)
@@ -0,0 +1,297 @@
+import time
+
+# Header layout: generation, sample_count, capacity, channel_count (int64 each)
+HEADER_FIELDS = 4
+HEADER_SIZE = HEADER_FIELDS * 8
+GENERATION, SAMPLE_COUNT, CAPACITY, CHANNEL_COUNT = range(HEADER_FIELDS)
+
+# Attempts a reader makes before giving up on a buffer the writer keeps changing
+MAX_READ_RETRIES = 100
+
+
+class SampleRing:
+    """
+    Fixed-capacity single-writer ring of timestamped samples.
+
+    The ring lives in any writable buffer (a bytearray, or the buffer of a
+    multiprocessing SharedMemory block) as a small int64 header followed by
+    one float64 column for time and one per channel. The writer bumps a
+    generation counter to an odd value before touching the data and back to
+    even afterwards (a seqlock), so readers never block the writer: they
+    copy what they need and retry if the generation moved meanwhile.
+    Samples are numbered from 1 by a sequence that never resets.
+    """
+
+    def __init__(self, buffer, capacity=None, channel_count=None, create=False):
+        """
+        Initialize a ring view over a buffer.
+
+        Args:
+            buffer: Writable buffer of at least required_size() bytes
+            capacity (int, optional): Number of samples kept (required when creating)
+            channel_count (int, optional): Value channels per sample (required when creating)
+            create (bool): Write a fresh header instead of reading an existing one
+        """
+        self._view = memoryview(buffer).cast("B")
+        self._header = self._view[:HEADER_SIZE].cast("q")
+
+        if create:
+            self._header[GENERATION] = 0
+            self._header[SAMPLE_COUNT] = 0
+            self._header[CAPACITY] = capacity
+            self._header[CHANNEL_COUNT] = channel_count
+
+        self.capacity = self._header[CAPACITY]
+        self.channel_count = self._header[CHANNEL_COUNT]
+
+        column_size = self.capacity * 8
+        self._columns = [
+            self._view[HEADER_SIZE + i * column_size:HEADER_SIZE + (i + 1) * column_size].cast("d")
+            for i in range(self.channel_count + 1)
+        ]
+
+    @staticmethod
+    def required_size(capacity, channel_count):
+        """
+        Get the buffer size needed for a ring.
+
+        Args:
+            capacity (int): Number of samples kept
+            channel_count (int): Value channels per sample
+
+        Returns:
+            int: Size in bytes
+        """
+        return HEADER_SIZE + capacity * 8 * (channel_count + 1)
+
+    @property
+    def sample_count(self):
+        """Total number of samples written since creation."""
+        return self._header[SAMPLE_COUNT]
+
+    @property
+    def generation(self):
+        """Seqlock generation; odd while a write is in progress."""
+        return self._header[GENERATION]
+
+    def append(self, timestamp, values):
+        """
+        Append one sample (writer only).
+
+        Args:
+            timestamp (float): Sample time
+            values (tuple): One value per channel
+        """
+        header = self._header
+        header[GENERATION] += 1
+        pos = header[SAMPLE_COUNT] % self.capacity
+        self._columns[0][pos] = timestamp
+        for i, value in enumerate(values, 1):
+            self._columns[i][pos] = value
+        header[SAMPLE_COUNT] += 1
+        header[GENERATION] += 1
+
+    def append_many(self, times, columns):
+        """
+        Append a batch of samples under a single generation bump (writer only).
+
+        Args:
+            times (list): Sample times
+            columns (list): One list of values per channel, aligned with times
+        """
+        if not times:
+            return
+
+        header = self._header
+        header[GENERATION] += 1
+        count = header[SAMPLE_COUNT]
+        capacity = self.capacity
+        time_column = self._columns[0]
+        for offset, timestamp in enumerate(times):
+            time_column[(count + offset) % capacity] = timestamp
+        for i, values in enumerate(columns, 1):
+            column = self._columns[i]
+            for offset, value in enumerate(values):
+                column[(count + offset) % capacity] = value
+        header[SAMPLE_COUNT] = count + len(times)
+        header[GENERATION] += 1
+
+    def _copy_range(self, column, first_seq, last_seq):
+        """
+        Copy samples first_seq..last_seq of a column, handling wrap-around.
+
+        Args:
+            column (memoryview): Column to copy
+            first_seq (int): First sequence number (inclusive)
+            last_seq (int): Last sequence number (inclusive)
+
+        Returns:
+            list: Copied values
+        """
+        if last_seq < first_seq:
+            return []
+        start = (first_seq - 1) % self.capacity
+        end = (last_seq - 1) % self.capacity + 1
+        if start < end:
+            return column[start:end].tolist()
+        return column[start:].tolist() + column[:end].tolist()
+
+    def _find_seq(self, timestamp, first_seq, last_seq, inclusive):
+        """
+        Binary search the first sample at or after a time (writer must not move meanwhile).
+
+        Args:
+            timestamp (float): Time to search
+            first_seq (int): First sequence number searched
+            last_seq (int): Last sequence number searched
+            inclusive (bool): Match samples whose time equals timestamp
+
+        Returns:
+            int: First matching sequence number, or last_seq + 1 if none
+        """
+        time_column = self._columns[0]
+        capacity = self.capacity
+        lo, hi = first_seq, last_seq + 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = time_column[(mid - 1) % capacity]
+            if value < timestamp or (value == timestamp and not inclusive):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def read_since(self, since=0, limit=None, latest=None, since_time=None, from_time=None):
+        """
+        Read a consistent copy of samples after a sequence number or a time.
+
+        Only the selected range is copied; timestamps are assumed non-decreasing.
+
+        Args:
+            since (int): Sequence number of the last sample already read
+            limit (int, optional): Maximum number of samples, oldest first
+            latest (int, optional): Read only the newest N samples instead of from since
+            since_time (float, optional): Read samples strictly after this time instead of from since
+            from_time (float, optional): Read samples at or after this time instead of from since
+
+        Returns:
+            dict: "time" and "values" (one list per channel), first_seq and last_seq of the
+                copied range, the total sample_count seen, and whether samples newer than
+                the requested position were already overwritten ("gap")
+        """
+        header = self._header
+        for _ in range(MAX_READ_RETRIES):
+            generation = header[GENERATION]
+            if generation & 1:
+                # Writer mid-update, possibly in another process: let it finish before retrying
+                time.sleep(0)
+                continue
+
+            count = header[SAMPLE_COUNT]
+            first_available = max(count - self.capacity + 1, 1)
+
+            if latest is not None:
+                first_seq = max(count - latest + 1, first_available)
+                gap = False
+            elif since_time is not None or from_time is not None:
+                inclusive = since_time is None
+                timestamp = from_time if inclusive else since_time
+                first_seq = self._find_seq(timestamp, first_available, count, inclusive)
+                gap = first_available > 1 and first_seq == first_available
+            else:
+                first_seq = max(since + 1, first_available)
+                gap = since + 1 < first_available
+            last_seq = count if limit is None else min(count, first_seq + limit - 1)
+
+            times = self._copy_range(self._columns[0], first_seq, last_seq)
+            values = [self._copy_range(column, first_seq, last_seq) for column in self._columns[1:]]
+
+            if header[GENERATION] == generation:
+                return {
+                    "time": times,
+                    "values": values,
+                    "first_seq": first_seq,
+                    "last_seq": max(last_seq, first_seq - 1),
+                    "sample_count": count,
+                    "gap": gap
+                }
+
+        raise BlockingIOError("Ring buffer changed during every read attempt")
+
+    def release(self):
+        """Release memoryviews so the underlying buffer can be closed or resized."""
+        for column in self._columns:
+            column.release()
+        self._header.release()
+        self._view.release()
+        self._columns = []
+
+
+class SharedBlob:
+    """
+    Variable-length byte payload protected by the same seqlock scheme as SampleRing.
+
+    Used for small documents (e.g. the device registry as JSON) that one
+    process rewrites and many processes read.
+    """
+
+    HEADER_SIZE = 16
+
+    def __init__(self, buffer, create=False):
+        """
+        Initialize a blob view over a buffer.
+
+        Args:
+            buffer: Writable buffer
+            create (bool): Reset the header
+        """
+        self._view = memoryview(buffer).cast("B")
+        self._header = self._view[:self.HEADER_SIZE].cast("q")
+        if create:
+            self._header[0] = 0
+            self._header[1] = 0
+
+    @property
+    def generation(self):
+        """Seqlock generation; odd while a write is in progress."""
+        return self._header[0]
+
+    def write(self, payload):
+        """
+        Replace the payload (writer only).
+
+        Args:
+            payload (bytes): New payload
+
+        Raises:
+            ValueError: If the payload does not fit in the buffer
+        """
+        if len(payload) > len(self._view) - self.HEADER_SIZE:
+            raise ValueError(f"Payload of {len(payload)} bytes does not fit in shared blob")
+        self._header[0] += 1
+        self._view[self.HEADER_SIZE:self.HEADER_SIZE + len(payload)] = payload
+        self._header[1] = len(payload)
+        self._header[0] += 1
+
+    def read(self):
+        """
+        Read a consistent copy of the payload.
+
+        Returns:
+            tuple: (generation, payload bytes)
+        """
+        for _ in range(MAX_READ_RETRIES):
+            generation = self._header[0]
+            if generation & 1:
+                time.sleep(0)
+                continue
+            length = self._header[1]
+            payload = bytes(self._view[self.HEADER_SIZE:self.HEADER_SIZE + length])
+            if self._header[0] == generation:
+                return generation, payload
+        raise BlockingIOError("Shared blob changed during every read attempt")
+
+    def release(self):
+        """Release memoryviews so the underlying buffer can be closed."""
+        self._header.release()
+        self._view.release()
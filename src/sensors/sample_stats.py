@@ -0,0 +1,308 @@
+import os
+import time
+from src.utils.metrics import Metrics
+
+# Weight of each new interval in the jitter estimates (RFC 3550 uses 1/16)
+SMOOTHING = 1 / 16
+
+# Seconds per rate measurement block, and weight of each block in the running rate
+RATE_BLOCK_SECONDS = 1.0
+RATE_SMOOTHING = 1 / 4
+
+# Seconds observed before gaps are detected (covers the first clock sync window)
+WARMUP_SECONDS = 2.0
+
+# Intervals longer than this many mean intervals count as gaps
+DEFAULT_GAP_FACTOR = 3.0
+
+# Seconds of silence after which the reported rate decays with the time since the last sample
+MIN_SILENCE = 1.0
+
+GAPS = Metrics.counter("pub_sensor_gaps_total", "Sample intervals longer than SENSOR_GAP_FACTOR mean intervals",
+                       ("device_id", "sensor_type"))
+LOST_SAMPLES = Metrics.counter("pub_sensor_lost_samples_total", "Samples missing from the sequence numbers",
+                               ("device_id", "sensor_type"))
+
+
+class SampleStats:
+    """
+    Incremental timing statistics of one sensor's sample stream.
+
+    Updated once per sample with constant work: the effective rate,
+    measured over blocks of RATE_BLOCK_SECONDS as intervals per second so
+    that samples arriving bunched together still count at their true rate
+    (a silence of a whole block starts a new block instead of lowering
+    it), the mean deviation of the interval from the mean interval
+    (interval jitter), the RFC 3550 inter-arrival jitter between arrival
+    and sample spacing (transit jitter), gaps longer than
+    SENSOR_GAP_FACTOR mean intervals and, when messages carry sequence
+    numbers, lost samples. A second long interval in a row is taken as a
+    lower rate rather than another gap. A phone throttling its sensors
+    shows a low rate with regular spacing; a Bluetooth link dropping data
+    shows gaps, lost samples and transit jitter.
+
+    Samples without a device timestamp or sequence number only carry their
+    processing time, so the spacing within and between received chunks is
+    the link's, not the sensor's: for them only the rate is measured, and
+    jitter and gaps are reported as unknown.
+
+    Trackers register in the class-level registry of the process timing
+    the samples; snapshots from other processes (ingest workers, or the
+    ingest process seen from a web worker) are kept in remote, keyed by
+    device and sensor type.
+    """
+    trackers = {}
+    remote = {}
+
+    def __init__(self, device_id, sensor_type):
+        """
+        Initialize a tracker and register it.
+
+        Args:
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type
+        """
+        self.device_id = device_id
+        self.sensor_type = sensor_type
+        self.gap_factor = float(os.getenv("SENSOR_GAP_FACTOR", DEFAULT_GAP_FACTOR))
+
+        self.samples = 0
+        self.first_time = None
+        self.last_time = None
+        self.last_arrival = None
+        self.block_start = None
+        self.block_intervals = 0
+        self.rate = None
+        self.stamped = True
+        self.interval_jitter = 0.0
+        self.transit_jitter = 0.0
+        self.gaps = 0
+        self.longest_gap = 0.0
+        self.after_gap = False
+        self.last_seq = None
+        self.lost = 0
+        self.sequence_resets = 0
+        SampleStats.trackers[(device_id, sensor_type)] = self
+
+    def observe(self, sample_time, arrival, sequence=None, stamped=True):
+        """
+        Fold one sample into the statistics.
+
+        Args:
+            sample_time (float): Sample time on the server clock
+            arrival (float): Server time the sample was received
+            sequence (int, optional): Sequence number carried by the message
+            stamped (bool): False if sample_time is only the processing time
+        """
+        self.samples += 1
+        self.stamped = stamped
+        if sequence is not None:
+            if self.last_seq is not None:
+                step = sequence - self.last_seq
+                if step > 1:
+                    self.lost += step - 1
+                    LOST_SAMPLES.inc(self.device_id, self.sensor_type, amount=step - 1)
+                elif step <= 0:
+                    # Counter restarted (the stream itself is ordered)
+                    self.sequence_resets += 1
+            self.last_seq = sequence
+
+        if self.last_time is None:
+            self.first_time = self.block_start = sample_time
+        else:
+            interval = sample_time - self.last_time
+            self._observe_rate(sample_time, interval)
+            if stamped:
+                self._observe_interval(sample_time, arrival, interval)
+        self.last_time = sample_time
+        self.last_arrival = arrival
+
+    def _observe_rate(self, sample_time, interval):
+        """
+        Update the rate estimate with one sample interval.
+
+        Args:
+            sample_time (float): Sample time on the server clock
+            interval (float): Time since the previous sample
+        """
+        if interval >= RATE_BLOCK_SECONDS:
+            self.block_start = sample_time
+            self.block_intervals = 0
+            return
+        self.block_intervals += 1
+        span = sample_time - self.block_start
+        if span < RATE_BLOCK_SECONDS:
+            return
+        rate = self.block_intervals / span
+        self.rate = rate if self.rate is None else self.rate + (rate - self.rate) * RATE_SMOOTHING
+        self.block_start = sample_time
+        self.block_intervals = 0
+
+    def _observe_interval(self, sample_time, arrival, interval):
+        """
+        Update the jitter estimates and detect gaps with one sample interval.
+
+        Args:
+            sample_time (float): Sample time on the server clock
+            arrival (float): Server time the sample was received
+            interval (float): Time since the previous sample
+        """
+        transit = abs((arrival - self.last_arrival) - interval)
+        self.transit_jitter += (transit - self.transit_jitter) * SMOOTHING
+
+        mean = self.mean_interval
+        if interval <= 0 or mean is None:
+            # Samples stamped together (clamped clock or one batch) say nothing about the spacing
+            return
+        if interval > self.gap_factor * mean and sample_time - self.first_time > WARMUP_SECONDS:
+            if self.after_gap:
+                # Two long intervals in a row: the rate dropped, so start over from it
+                self.rate = 1.0 / interval
+                self.interval_jitter = 0.0
+            else:
+                self.gaps += 1
+                self.longest_gap = max(self.longest_gap, interval)
+                GAPS.inc(self.device_id, self.sensor_type)
+            self.after_gap = True
+        else:
+            self.after_gap = False
+            self.interval_jitter += (abs(interval - mean) - self.interval_jitter) * SMOOTHING
+
+    @property
+    def mean_interval(self):
+        """float: Mean sample interval, provisional until the first rate block closes, or None."""
+        if self.rate:
+            return 1.0 / self.rate
+        if self.block_intervals and self.last_time > self.block_start:
+            return (self.last_time - self.block_start) / self.block_intervals
+        return None
+
+    def snapshot(self):
+        """
+        Get the raw statistics.
+
+        Returns:
+            dict: Counters, running estimates and the last arrival time
+        """
+        return {
+            "samples": self.samples,
+            "mean_interval": self.mean_interval,
+            "interval_jitter": self.interval_jitter,
+            "transit_jitter": self.transit_jitter,
+            "gaps": self.gaps,
+            "longest_gap": self.longest_gap,
+            "lost_samples": self.lost,
+            "sequence_resets": self.sequence_resets,
+            "has_sequence": self.last_seq is not None,
+            "stamped": self.stamped,
+            "last_arrival": self.last_arrival,
+        }
+
+    @classmethod
+    def snapshots(cls):
+        """
+        Get the raw statistics of every sensor known to this process.
+
+        Returns:
+            dict: Snapshots keyed by device ID, then sensor type (local trackers win over remote ones)
+        """
+        result = {device_id: dict(sensors) for device_id, sensors in cls.remote.items()}
+        for (device_id, sensor_type), tracker in cls.trackers.items():
+            result.setdefault(device_id, {})[sensor_type] = tracker.snapshot()
+        return result
+
+    @classmethod
+    def report(cls, device_id, sensor_type, now=None):
+        """
+        Describe a sensor's stream timing.
+
+        Args:
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type
+            now (float, optional): Reference time, defaults to now
+
+        Returns:
+            dict: Effective rate, jitter, gaps and losses, or None before the first sample
+        """
+        tracker = cls.trackers.get((device_id, sensor_type))
+        stats = tracker.snapshot() if tracker is not None else cls.remote.get(device_id, {}).get(sensor_type)
+        if stats is None:
+            return None
+        return cls.describe(stats, time.time() if now is None else now)
+
+    @staticmethod
+    def describe(stats, now):
+        """
+        Derive the reported values from a raw snapshot.
+
+        Args:
+            stats (dict): Snapshot from snapshot()
+            now (float): Reference time
+
+        Returns:
+            dict: Effective rate, jitter, gaps and losses
+        """
+        interval = stats["mean_interval"]
+        age = now - stats["last_arrival"]
+        rate = 0.0
+        if interval:
+            # Decay the rate once the sensor has been silent for longer than its usual spacing
+            rate = 1.0 / interval if age <= max(MIN_SILENCE, 3 * interval) else 1.0 / age
+        received = stats["samples"]
+        lost = stats["lost_samples"]
+        stamped = stats.get("stamped", True)
+        return {
+            "samples": received,
+            "rate_hz": rate,
+            "mean_interval": interval,
+            "interval_jitter": stats["interval_jitter"] if stamped else None,
+            "transit_jitter": stats["transit_jitter"] if stamped else None,
+            "gaps": stats["gaps"] if stamped else None,
+            "longest_gap": stats["longest_gap"] if stamped else None,
+            "lost_samples": lost if stats["has_sequence"] else None,
+            "loss_ratio": lost / (received + lost) if stats["has_sequence"] and received + lost else None,
+            "sequence_resets": stats["sequence_resets"],
+            "time_since_last_sample": age,
+        }
+
+    @classmethod
+    def forget_device(cls, device_id):
+        """
+        Drop the statistics of a removed device.
+
+        Args:
+            device_id (str): Device identifier
+        """
+        for key in [key for key in cls.trackers if key[0] == device_id]:
+            del cls.trackers[key]
+        cls.remote.pop(device_id, None)
+
+
+def _stats_gauge(field):
+    """
+    Build a gauge function exporting one reported field of every sensor.
+
+    Args:
+        field (str): Field of SampleStats.describe()
+
+    Returns:
+        callable: Gauge function
+    """
+    def values():
+        now = time.time()
+        series = {}
+        for device_id, sensors in SampleStats.snapshots().items():
+            for sensor_type, stats in sensors.items():
+                value = SampleStats.describe(stats, now)[field]
+                if value is not None:
+                    series[(device_id, sensor_type)] = value
+        return series
+    return values
+
+
+Metrics.gauge("pub_sensor_sample_rate", "Effective samples per second", ("device_id", "sensor_type"),
+              function=_stats_gauge("rate_hz"))
+Metrics.gauge("pub_sensor_interval_jitter_seconds", "Mean deviation of the sample interval from its mean",
+              ("device_id", "sensor_type"), function=_stats_gauge("interval_jitter"))
+Metrics.gauge("pub_sensor_transit_jitter_seconds", "Inter-arrival jitter relative to sample spacing (RFC 3550)",
+              ("device_id", "sensor_type"), function=_stats_gauge("transit_jitter"))
@@ -35,6 +35,11 @@ class SensorFactory:
                 sensor = Magnetometer(device_id, max_data_points)
                 Logger.log_message(f"Magnetometer sensor created for device {device_id}")
                 return sensor
+            elif sensor_type == "orientation":
+                from src.sensors.orientation import Orientation
+                sensor = Orientation(device_id, max_data_points)
+                Logger.log_message(f"Orientation sensor created for device {device_id}")
+                return sensor
             else:
                 error_msg = f"Unsupported sensor type: {sensor_type}"
                 Logger.log_error(error_msg)
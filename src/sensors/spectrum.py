@@ -0,0 +1,287 @@
+import os
+import time
+from collections import deque
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from src.connection.event_bus import EventBus
+from src.utils.metrics import Metrics
+
+# Spectrum methods: Welch power spectral density, or the amplitude spectrum of the latest segment
+SPECTRUM_METHODS = ("welch", "fft")
+
+# Samples per FFT segment
+DEFAULT_SEGMENT = 256
+
+# Fraction of a segment shared with the next one (the hop is the rest)
+DEFAULT_OVERLAP = 0.5
+
+# Segments averaged by the Welch estimate
+DEFAULT_AVERAGE = 8
+
+# Seconds without a request or stream client after which an analyzer stops following its sensor
+DEFAULT_IDLE = 60.0
+
+SEGMENTS = Metrics.counter("pub_spectrum_segments_total", "FFT segments computed by spectrum analyzers",
+                           ("device_id", "sensor_type"))
+
+
+class SpectrumAnalyzer:
+    """
+    Sliding-window spectrum of one sensor, shared by every client.
+
+    The analyzer follows the sensor's ring with a cursor and splits the
+    stream into segments of SPECTRUM_SEGMENT samples, one every hop
+    (SPECTRUM_OVERLAP shared with the previous segment). Each segment is
+    detrended, Hann windowed and transformed once, with one vectorized
+    FFT per batch of new segments; its power spectrum is kept for the
+    last SPECTRUM_AVERAGE segments. The Welch PSD (their mean, scaled as
+    a density) and the amplitude spectrum of the latest segment are
+    computed on demand and cached until the next segment completes, so
+    REST requests and WebSocket streams on the same sensor share the
+    work. The sample rate comes from the sample times of the kept
+    segments.
+
+    Analyzers live in the class-level registry, created by the first
+    request for a sensor and fed by its sensor_update events until unused
+    for SPECTRUM_IDLE seconds. A completed segment publishes a
+    spectrum_update event.
+    """
+    analyzers = {}
+    _subscribed = False
+
+    def __init__(self, device_id, sensor_type, sensor):
+        """
+        Initialize an analyzer for a sensor.
+
+        Args:
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type
+            sensor (Sensor): Sensor whose ring is analyzed
+        """
+        self.device_id = device_id
+        self.sensor_type = sensor_type
+        self.segment = max(int(os.getenv("SPECTRUM_SEGMENT", DEFAULT_SEGMENT)), 8)
+        overlap = min(max(float(os.getenv("SPECTRUM_OVERLAP", DEFAULT_OVERLAP)), 0.0), 0.95)
+        self.hop = max(int(round(self.segment * (1.0 - overlap))), 1)
+        self.average = max(int(os.getenv("SPECTRUM_AVERAGE", DEFAULT_AVERAGE)), 1)
+        self.idle = float(os.getenv("SPECTRUM_IDLE", DEFAULT_IDLE))
+
+        # Periodic Hann window, as used for spectral analysis
+        self.window = np.hanning(self.segment + 1)[:-1]
+        self.window_sum = float(self.window.sum())
+        self.window_power = float((self.window ** 2).sum())
+        self.last_used = time.time()
+        self._reset(sensor)
+
+    def _reset(self, sensor):
+        """
+        Start over on a sensor, dropping every segment.
+
+        Args:
+            sensor (Sensor): Sensor whose ring is analyzed
+        """
+        self.sensor = sensor
+        self.channels = tuple(sensor.channels)
+        self.cursor = max(sensor.sample_count - sensor.ring.capacity, 0)
+        self.tail = np.empty((len(self.channels), 0))
+        self.tail_times = np.empty(0)
+        self.powers = deque(maxlen=self.average)
+        self.spans = deque(maxlen=self.average)
+        self.last_time = None
+        self.cache = {}
+
+    @classmethod
+    def get(cls, device_id, sensor_type, sensor):
+        """
+        Get the analyzer of a sensor, creating it on first use, caught up with the ring.
+
+        Args:
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type
+            sensor (Sensor): Current sensor instance
+
+        Returns:
+            SpectrumAnalyzer: Shared analyzer
+        """
+        if not cls._subscribed:
+            EventBus.subscribe("sensor_update", cls.handle_sensor_update)
+            EventBus.subscribe("device_disconnected", cls.handle_device_disconnected)
+            cls._subscribed = True
+
+        analyzer = cls.analyzers.get((device_id, sensor_type))
+        if analyzer is None:
+            analyzer = cls.analyzers[(device_id, sensor_type)] = cls(device_id, sensor_type, sensor)
+        elif analyzer.sensor is not sensor:
+            # Device reconnected with a new sensor instance
+            analyzer._reset(sensor)
+        analyzer.last_used = time.time()
+        analyzer.update()
+        return analyzer
+
+    def update(self):
+        """
+        Read the samples added to the ring since the cursor and transform completed segments.
+
+        Returns:
+            bool: True if at least one segment completed
+        """
+        result = self.sensor.get_data_since(since=self.cursor)
+        self.cursor = result["cursor"]
+        data = result["data"]
+        if result["gap"]:
+            # Samples were lost in between: a segment must not span the hole
+            self.tail = self.tail[:, :0]
+            self.tail_times = self.tail_times[:0]
+        if not data["time"]:
+            return False
+
+        self.tail = np.concatenate((self.tail, np.asarray([data[c] for c in self.channels], dtype=float)), axis=1)
+        self.tail_times = np.concatenate((self.tail_times, np.asarray(data["time"], dtype=float)))
+        available = self.tail.shape[1]
+        if available < self.segment:
+            return False
+
+        count = (available - self.segment) // self.hop + 1
+        # Segments that would be averaged out right away are skipped
+        first = max(count - self.average, 0)
+        frames = sliding_window_view(self.tail, self.segment, axis=1)[:, first * self.hop:count * self.hop:self.hop]
+        frames = frames - frames.mean(axis=2, keepdims=True)
+        power = np.abs(np.fft.rfft(frames * self.window, axis=2)) ** 2
+        for offset, index in enumerate(range(first, count)):
+            start = index * self.hop
+            self.powers.append(power[:, offset])
+            self.spans.append(self.tail_times[start + self.segment - 1] - self.tail_times[start])
+        self.last_time = float(self.tail_times[(count - 1) * self.hop + self.segment - 1])
+
+        consumed = count * self.hop
+        self.tail = self.tail[:, consumed:]
+        self.tail_times = self.tail_times[consumed:]
+        self.cache = {}
+        SEGMENTS.inc(self.device_id, self.sensor_type, amount=count)
+        return True
+
+    def sample_rate(self):
+        """
+        Estimate the sample rate from the kept segments.
+
+        Returns:
+            float: Samples per second, or None without a segment spanning time
+        """
+        duration = sum(span for span in self.spans if span > 0)
+        intervals = (self.segment - 1) * sum(1 for span in self.spans if span > 0)
+        return intervals / duration if duration > 0 else None
+
+    def result(self, method="welch", fields=None):
+        """
+        Get the current spectrum.
+
+        Args:
+            method (str): "welch" for the power spectral density averaged over the kept
+                segments (units²/Hz), "fft" for the amplitude spectrum of the latest one (units)
+            fields (list, optional): Channels to include, defaults to all
+
+        Returns:
+            dict: Frequencies, one spectrum and peak frequency per channel, and the analysis
+                parameters; ready is False until a segment completed
+        """
+        self.last_used = time.time()
+        cached = self.cache.get(method)
+        if cached is None:
+            cached = self.cache[method] = self._compute(method)
+        if fields is None:
+            return cached
+        selected = dict(cached)
+        selected["data"] = {c: v for c, v in cached["data"].items() if c in fields}
+        selected["peak_hz"] = {c: v for c, v in cached["peak_hz"].items() if c in fields}
+        return selected
+
+    def _compute(self, method):
+        """
+        Compute a spectrum from the kept segment powers.
+
+        Args:
+            method (str): "welch" or "fft"
+
+        Returns:
+            dict: Spectrum payload for result()
+        """
+        sample_rate = self.sample_rate()
+        payload = {
+            "method": method,
+            "ready": sample_rate is not None,
+            "sample_rate": sample_rate,
+            "segment": self.segment,
+            "hop": self.hop,
+            "segments": len(self.powers) if method == "welch" else min(len(self.powers), 1),
+            "resolution_hz": sample_rate / self.segment if sample_rate else None,
+            "time": self.last_time,
+            "frequencies": [],
+            "data": {},
+            "peak_hz": {},
+        }
+        if sample_rate is None:
+            return payload
+
+        # One-sided spectrum: double every bin but DC and, for even segments, Nyquist
+        last = -1 if self.segment % 2 == 0 else None
+        if method == "welch":
+            spectrum = np.mean(self.powers, axis=0) / (sample_rate * self.window_power)
+            spectrum[:, 1:last] *= 2
+        else:
+            spectrum = np.sqrt(self.powers[-1]) / self.window_sum
+            spectrum[:, 1:last] *= 2
+
+        frequencies = np.fft.rfftfreq(self.segment, 1.0 / sample_rate)
+        peaks = frequencies[1 + np.argmax(spectrum[:, 1:], axis=1)]
+        payload["frequencies"] = frequencies.tolist()
+        payload["data"] = dict(zip(self.channels, spectrum.tolist()))
+        payload["peak_hz"] = dict(zip(self.channels, peaks.tolist()))
+        return payload
+
+    @classmethod
+    def handle_sensor_update(cls, event_data):
+        """
+        Feed the analyzer of an updated sensor (Event Bus callback).
+
+        The ring is read once a hop of samples is pending, or half the ring
+        when it is smaller, so the cursor never falls behind.
+
+        Args:
+            event_data (dict): Event data containing device_id and sensor_type
+        """
+        key = (event_data["device_id"], event_data["sensor_type"])
+        analyzer = cls.analyzers.get(key)
+        if analyzer is None:
+            return
+        if time.time() - analyzer.last_used > analyzer.idle:
+            del cls.analyzers[key]
+            return
+
+        from src.connection.bluetooth_server import DeviceManager
+
+        sensor = DeviceManager.get_all_devices().get(key[0], {}).get("sensors", {}).get(key[1])
+        if sensor is None:
+            return
+        if sensor is not analyzer.sensor:
+            analyzer._reset(sensor)
+        pending = sensor.sample_count - analyzer.cursor
+        if pending < min(analyzer.hop, max(sensor.ring.capacity // 2, 1)):
+            return
+        if analyzer.update():
+            EventBus.publish("spectrum_update", {"device_id": key[0], "sensor_type": key[1]})
+
+    @classmethod
+    def handle_device_disconnected(cls, event_data):
+        """
+        Drop the analyzers of a removed device (Event Bus callback).
+
+        Args:
+            event_data (dict): Event data containing device_id
+        """
+        device_id = event_data.get("device_id")
+        for key in [key for key in cls.analyzers if key[0] == device_id]:
+            del cls.analyzers[key]
+
+
+Metrics.gauge("pub_spectrum_analyzers", "Sensors followed by a spectrum analyzer",
+              function=lambda: {(): len(SpectrumAnalyzer.analyzers)})
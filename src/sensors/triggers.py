@@ -0,0 +1,474 @@
+import math
+import os
+from collections import deque
+from datetime import datetime
+from src.connection.event_bus import EventBus
+from src.sensors.recording import RecordingWriter
+from src.utils.logging import Logger
+from src.utils.metrics import Metrics
+
+# Trigger kinds accepted in SENSOR_TRIGGERS and their parameters, optional ones last
+TRIGGER_KINDS = {
+    "above": ("channel", "value"),
+    "below": ("channel", "value"),
+    "magnitude": ("value",),
+    "zscore": ("channel", "value", "window?"),
+    "freefall": ("value", "seconds"),
+}
+
+# Samples in the rolling window of zscore triggers
+DEFAULT_ZSCORE_WINDOW = 100
+
+# Seconds after a trigger fires during which it cannot fire again
+DEFAULT_HOLDOFF = 1.0
+
+# Events kept in memory per device for the triggers API
+DEFAULT_HISTORY = 1000
+
+FIRED = Metrics.counter("pub_triggers_fired_total", "Trigger events fired", ("device_id", "sensor_type", "trigger"))
+
+
+def parse_trigger_specs(sensor_type, env_value=None):
+    """
+    Read the triggers configured for a sensor type.
+
+    SENSOR_TRIGGERS is a comma-separated list of sensor.name=kind:params
+    entries, e.g. "accelerometer.shake=magnitude:25,*.spike=zscore:x:4,
+    accelerometer.fall=freefall:2:0.1, orientation.tilt=above:pitch:60",
+    where * matches every sensor. Kinds and their params:
+
+    - above:channel:value / below:channel:value: channel crosses value
+    - magnitude:value: length of the x, y, z vector exceeds value
+    - zscore:channel:value[:window]: channel (or magnitude) deviates more
+      than value standard deviations from the previous window samples
+    - freefall:value:seconds: magnitude stays below value for seconds
+
+    Args:
+        sensor_type (str): Sensor type
+        env_value (str, optional): Specification, defaults to SENSOR_TRIGGERS
+
+    Returns:
+        list: (name, kind, params) tuples in configuration order, params a dict
+    """
+    if env_value is None:
+        env_value = os.getenv("SENSOR_TRIGGERS", "")
+    specs = []
+    for entry in env_value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            target, definition = entry.split("=", 1)
+            sensor, name = target.strip().split(".", 1)
+            kind, *values = definition.strip().split(":")
+            names = TRIGGER_KINDS.get(kind)
+            required = [param for param in names or () if not param.endswith("?")]
+            if names is None or not name.isidentifier() or not len(required) <= len(values) <= len(names):
+                raise ValueError(entry)
+            params = {}
+            for param, value in zip(names, values):
+                param = param.rstrip("?")
+                params[param] = value if param == "channel" else float(value)
+            if params.get("seconds", 1) <= 0 or params.get("window", 2) < 2:
+                raise ValueError(entry)
+        except ValueError:
+            Logger.log_error(f"Invalid SENSOR_TRIGGERS entry: '{entry}'. Expected sensor.name=kind:params "
+                             f"with kind one of {', '.join(TRIGGER_KINDS)}", key="sensor_triggers_error")
+            continue
+        if sensor in (sensor_type, "*") and name not in (spec[0] for spec in specs):
+            specs.append((name, kind, params))
+    return specs
+
+
+class Trigger:
+    """
+    Edge-triggered condition on one value per sample.
+
+    A trigger fires when its condition becomes true and rearms once it is
+    false again, so a sustained condition is one event. After firing it
+    stays silent for TRIGGER_HOLDOFF seconds. The value is a channel, or
+    the magnitude of x, y and z when channel is "magnitude".
+    """
+
+    def __init__(self, name, kind, params, channels, holdoff):
+        """
+        Initialize the trigger.
+
+        Args:
+            name (str): Trigger name
+            kind (str): Trigger kind
+            params (dict): Parsed parameters
+            channels (tuple): Channel names of the sensor, in storage order
+            holdoff (float): Seconds during which the trigger cannot fire again
+
+        Raises:
+            ValueError: If the channel (or x, y, z for magnitudes) is not stored by the sensor
+        """
+        self.name = name
+        self.kind = kind
+        self.threshold = params["value"]
+        self.channel = params.get("channel", "magnitude")
+        if self.channel == "magnitude":
+            if not all(axis in channels for axis in ("x", "y", "z")):
+                raise ValueError("magnitude needs x, y and z channels")
+            self.index = None
+            self.axes = tuple(channels.index(axis) for axis in ("x", "y", "z"))
+        elif self.channel in channels:
+            self.index = channels.index(self.channel)
+        else:
+            raise ValueError(f"unknown channel {self.channel}")
+        self.holdoff = holdoff
+        self.active = False
+        self.last_fired = None
+
+    def value(self, values):
+        """
+        Get the value the trigger watches.
+
+        Args:
+            values (tuple): One value per channel
+
+        Returns:
+            float: Channel value or x, y, z magnitude
+        """
+        if self.index is not None:
+            return values[self.index]
+        x, y, z = values[self.axes[0]], values[self.axes[1]], values[self.axes[2]]
+        return math.sqrt(x * x + y * y + z * z)
+
+    def condition(self, timestamp, value):
+        """
+        Evaluate the condition on one sample.
+
+        Args:
+            timestamp (float): Sample time in seconds
+            value (float): Watched value
+
+        Returns:
+            bool: True while the condition holds
+        """
+        if self.kind == "below":
+            return value < self.threshold
+        return value > self.threshold
+
+    def step(self, timestamp, values):
+        """
+        Evaluate one sample.
+
+        Args:
+            timestamp (float): Sample time in seconds
+            values (tuple): One value per channel
+
+        Returns:
+            float: Watched value if the trigger fired on this sample, else None
+        """
+        value = self.value(values)
+        active = self.condition(timestamp, value)
+        rising = active and not self.active
+        self.active = active
+        if not rising or (self.last_fired is not None and timestamp - self.last_fired < self.holdoff):
+            return None
+        self.last_fired = timestamp
+        return value
+
+    def describe(self):
+        """
+        Describe the trigger.
+
+        Returns:
+            dict: Name, kind, channel and threshold
+        """
+        return {"name": self.name, "kind": self.kind, "channel": self.channel, "threshold": self.threshold}
+
+
+class ZScoreTrigger(Trigger):
+    """
+    Fires when a value deviates from the mean of the previous window samples.
+
+    The window is kept with running sums, resummed once per window to
+    shed rounding error, so each sample costs constant amortized work.
+    """
+
+    def __init__(self, name, kind, params, channels, holdoff):
+        """
+        Initialize the trigger.
+
+        Args:
+            name (str): Trigger name
+            kind (str): "zscore"
+            params (dict): Parsed parameters, with the window in samples
+            channels (tuple): Channel names of the sensor, in storage order
+            holdoff (float): Seconds during which the trigger cannot fire again
+        """
+        super().__init__(name, kind, params, channels, holdoff)
+        self.window = deque(maxlen=int(params.get("window", DEFAULT_ZSCORE_WINDOW)))
+        self.total = 0.0
+        self.squares = 0.0
+        self.until_resum = self.window.maxlen
+
+    def condition(self, timestamp, value):
+        """
+        Compare a value with the window before adding it.
+
+        Args:
+            timestamp (float): Sample time in seconds
+            value (float): Watched value
+
+        Returns:
+            bool: True if the window is full and |z| exceeds the threshold
+        """
+        window = self.window
+        active = False
+        if len(window) == window.maxlen:
+            mean = self.total / len(window)
+            variance = self.squares / len(window) - mean * mean
+            active = variance > 0 and abs(value - mean) > self.threshold * math.sqrt(variance)
+            oldest = window[0]
+            self.total -= oldest
+            self.squares -= oldest * oldest
+        window.append(value)
+        self.total += value
+        self.squares += value * value
+        self.until_resum -= 1
+        if self.until_resum == 0:
+            self.until_resum = window.maxlen
+            self.total = math.fsum(window)
+            self.squares = math.fsum(v * v for v in window)
+        return active
+
+    def describe(self):
+        """
+        Describe the trigger.
+
+        Returns:
+            dict: Name, kind, channel, threshold and window
+        """
+        return dict(super().describe(), window=self.window.maxlen)
+
+
+class FreeFallTrigger(Trigger):
+    """Fires when the x, y, z magnitude stays below a threshold for a minimum time."""
+
+    def __init__(self, name, kind, params, channels, holdoff):
+        """
+        Initialize the trigger.
+
+        Args:
+            name (str): Trigger name
+            kind (str): "freefall"
+            params (dict): Parsed parameters, with the minimum duration in seconds
+            channels (tuple): Channel names of the sensor, in storage order
+            holdoff (float): Seconds during which the trigger cannot fire again
+        """
+        super().__init__(name, kind, params, channels, holdoff)
+        self.seconds = params["seconds"]
+        self.low_since = None
+
+    def condition(self, timestamp, value):
+        """
+        Track how long the magnitude has been below the threshold.
+
+        Args:
+            timestamp (float): Sample time in seconds
+            value (float): Magnitude
+
+        Returns:
+            bool: True once the magnitude has stayed low for the minimum time
+        """
+        if value >= self.threshold:
+            self.low_since = None
+            return False
+        if self.low_since is None:
+            self.low_since = timestamp
+        return timestamp - self.low_since >= self.seconds
+
+    def describe(self):
+        """
+        Describe the trigger.
+
+        Returns:
+            dict: Name, kind, channel, threshold and minimum duration
+        """
+        return dict(super().describe(), seconds=self.seconds)
+
+
+class TriggerSet:
+    """
+    Triggers configured for one sensor, evaluated as samples are stored.
+
+    Every trigger keeps constant state and does constant work per sample,
+    in order, so batches and single samples fire the same events. Triggers
+    see the stored channels: calibrated raw values and derived channels.
+    """
+
+    def __init__(self, sensor_type, channels):
+        """
+        Initialize the set from SENSOR_TRIGGERS.
+
+        Args:
+            sensor_type (str): Sensor type
+            channels (tuple): Stored channel names
+        """
+        holdoff = float(os.getenv("TRIGGER_HOLDOFF", DEFAULT_HOLDOFF))
+        classes = {"zscore": ZScoreTrigger, "freefall": FreeFallTrigger}
+        self.triggers = []
+        for name, kind, params in parse_trigger_specs(sensor_type):
+            if kind in ("magnitude", "freefall"):
+                params = dict(params, channel="magnitude")
+            try:
+                self.triggers.append(classes.get(kind, Trigger)(name, kind, params, tuple(channels), holdoff))
+            except ValueError as e:
+                Logger.log_error(f"Trigger {sensor_type}.{name} ignored: {e}", key=f"sensor_triggers_{sensor_type}")
+
+    def __bool__(self):
+        """bool: True if any trigger is configured."""
+        return bool(self.triggers)
+
+    def process(self, timestamp, values):
+        """
+        Evaluate one sample.
+
+        Args:
+            timestamp (float): Sample time in seconds since sensor start
+            values (tuple): One value per stored channel
+
+        Returns:
+            list: Fired events (trigger, kind, channel, time, value, threshold), usually empty
+        """
+        fired = []
+        for trigger in self.triggers:
+            value = trigger.step(timestamp, values)
+            if value is not None:
+                fired.append({"trigger": trigger.name, "kind": trigger.kind, "channel": trigger.channel,
+                              "time": timestamp, "value": value, "threshold": trigger.threshold})
+        return fired
+
+    def process_batch(self, times, columns):
+        """
+        Evaluate a batch sample by sample.
+
+        Args:
+            times (list): Sample times in seconds since sensor start
+            columns (list): One sequence of values per stored channel, aligned with times
+
+        Returns:
+            list: Fired events, in sample order
+        """
+        fired = []
+        for timestamp, *values in zip(times, *columns):
+            fired.extend(self.process(timestamp, values))
+        return fired
+
+    def describe(self):
+        """
+        Describe the configured triggers.
+
+        Returns:
+            list: One description per trigger
+        """
+        return [trigger.describe() for trigger in self.triggers]
+
+
+class TriggerLog:
+    """
+    Fired trigger events of every device.
+
+    The ingest process numbers each event per device, writes it to the
+    device's trigger CSV through the RecordingWriter, keeps the latest
+    TRIGGER_HISTORY in memory and publishes a trigger event. Web workers
+    receive the published events and only keep them in memory.
+    """
+    events = {}
+    counts = {}
+    files = {}
+
+    @classmethod
+    def record(cls, sensor, fired):
+        """
+        Number, store, write and publish events fired by a sensor.
+
+        Args:
+            sensor (Sensor): Sensor whose triggers fired
+            fired (list): Events from TriggerSet.process
+        """
+        from src.connection.bluetooth_server import DeviceManager
+        from src.sensors.base_sensor import DIVIDER, EXTENSION
+
+        device_id = sensor.device_id
+        device = DeviceManager.get_all_devices().get(device_id)
+        device_name = device["name"] if device else "Unknown"
+        file_path = cls.files.get(device_id)
+        if file_path is None:
+            connected_at = datetime.fromisoformat(device["connected_at"]) if device else datetime.now()
+            file_path = cls.files[device_id] = (
+                os.getenv("DATA_FILE_PATH", "") + "triggers" + DIVIDER + device_name + DIVIDER + device_id
+                + DIVIDER + connected_at.strftime('%d_%m_%y___%H_%M_%S') + EXTENSION
+            )
+
+        for event in fired:
+            cls.counts[device_id] = cls.counts.get(device_id, 0) + 1
+            event = dict(event, seq=cls.counts[device_id], device_id=device_id, sensor_type=sensor.sensor_type,
+                         timestamp=sensor.start_time + event["time"])
+            if sensor.date_in_milliseconds:
+                written_time = round(event["time"], 4)
+            else:
+                written_time = datetime.fromtimestamp(event["timestamp"]).isoformat()
+            RecordingWriter.write(
+                file_path,
+                "timestamp,sensor,trigger,kind,channel,value,threshold\n",
+                f"{written_time},{sensor.sensor_type},{event['trigger']},{event['kind']},{event['channel']},"
+                f"{event['value']},{event['threshold']}\n"
+            )
+            FIRED.inc(device_id, sensor.sensor_type, event["trigger"])
+            Logger.log_message(f"Trigger {sensor.sensor_type}.{event['trigger']} fired on {device_name} "
+                               f"({event['value']:.4g})", key=f"trigger_{device_id}_{event['trigger']}")
+            cls.remember(event)
+            EventBus.publish("trigger", event)
+
+    @classmethod
+    def remember(cls, event):
+        """
+        Keep a numbered event in the device's history.
+
+        Args:
+            event (dict): Event with device_id and seq
+        """
+        device_id = event["device_id"]
+        history = cls.events.get(device_id)
+        if history is None:
+            history = cls.events[device_id] = deque(maxlen=int(os.getenv("TRIGGER_HISTORY", DEFAULT_HISTORY)))
+        history.append(event)
+        cls.counts[device_id] = event["seq"]
+
+    @classmethod
+    def since(cls, device_id, since=0, limit=None):
+        """
+        Get the events of a device newer than a cursor, oldest first.
+
+        Args:
+            device_id (str): Device identifier
+            since (int): Sequence number of the last event already received
+            limit (int, optional): Maximum number of events returned
+
+        Returns:
+            tuple: (events, cursor), the cursor being the sequence number of the last returned event
+        """
+        if since > cls.counts.get(device_id, 0):
+            # Cursor from a previous connection of the device: restart from the oldest event
+            since = 0
+        events = [event for event in cls.events.get(device_id, ()) if event["seq"] > since]
+        if limit is not None:
+            events = events[:max(limit, 0)]
+        return events, events[-1]["seq"] if events else max(since, 0)
+
+    @classmethod
+    def forget_device(cls, device_id):
+        """
+        Drop the in-memory events of a removed device; its CSV is kept.
+
+        Args:
+            device_id (str): Device identifier
+        """
+        cls.events.pop(device_id, None)
+        cls.counts.pop(device_id, None)
+        cls.files.pop(device_id, None)
@@ -0,0 +1,160 @@
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.logging import Logger
+from src.utils.metrics import Metrics
+
+# Health states, from best to worst; the overall state is the worst of all checks
+STATUSES = ("healthy", "degraded", "unhealthy")
+
+# Event-loop lag probe: seconds between probes and seconds of probes kept for the report
+DEFAULT_LAG_INTERVAL = 0.25
+DEFAULT_LAG_WINDOW = 10.0
+
+LOOP_LAG_SECONDS = Metrics.histogram(
+    "pub_event_loop_lag_seconds", "Delay of the event loop in running a scheduled callback",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+
+class HealthMonitor:
+    """
+    Collects the health of the server's subsystems into one report.
+
+    Subsystems register a check returning a dict with a "status" entry;
+    the monitor adds its own event-loop lag probe and default executor
+    queue depth, which together show whether the single event loop that
+    receives, stores and fans out samples is keeping up.
+
+    Thresholds are read from HEALTH_<NAME>_DEGRADED and
+    HEALTH_<NAME>_UNHEALTHY environment variables when the report is built.
+    """
+    checks = {}
+    executor = None
+    started_at = None
+    lag_interval = DEFAULT_LAG_INTERVAL
+    _lags = deque()
+
+    @classmethod
+    def register_check(cls, name, check):
+        """
+        Register a subsystem health check.
+
+        Args:
+            name (str): Check name in the report
+            check (callable): Returns a dict with at least a "status" entry
+        """
+        cls.checks[name] = check
+
+    @staticmethod
+    def classify(value, name, degraded, unhealthy):
+        """
+        Map a measurement to a health state.
+
+        Args:
+            value (float): Measured value, higher is worse
+            name (str): Threshold name, e.g. LOOP_LAG for HEALTH_LOOP_LAG_DEGRADED
+            degraded (float): Default degraded threshold
+            unhealthy (float): Default unhealthy threshold
+
+        Returns:
+            str: One of STATUSES
+        """
+        if value >= float(os.getenv(f"HEALTH_{name}_UNHEALTHY", unhealthy)):
+            return "unhealthy"
+        if value >= float(os.getenv(f"HEALTH_{name}_DEGRADED", degraded)):
+            return "degraded"
+        return "healthy"
+
+    @classmethod
+    def start(cls):
+        """Install a measurable default executor and start the lag probe (call from the running loop)."""
+        loop = asyncio.get_running_loop()
+        max_workers = os.getenv("EXECUTOR_MAX_WORKERS")
+        cls.executor = ThreadPoolExecutor(max_workers=int(max_workers) if max_workers else None)
+        loop.set_default_executor(cls.executor)
+        cls.started_at = time.time()
+        asyncio.create_task(cls.monitor_event_loop())
+
+    @classmethod
+    async def monitor_event_loop(cls):
+        """Measure how late the event loop wakes up from a fixed sleep, forever."""
+        cls.lag_interval = float(os.getenv("HEALTH_LAG_INTERVAL", DEFAULT_LAG_INTERVAL))
+        window = float(os.getenv("HEALTH_LAG_WINDOW", DEFAULT_LAG_WINDOW))
+        cls._lags = deque(maxlen=max(1, int(window / cls.lag_interval)))
+        loop = asyncio.get_running_loop()
+        Logger.log_message(f"Event loop lag probe started (interval {cls.lag_interval}s, window {window}s)")
+
+        while True:
+            expected = loop.time() + cls.lag_interval
+            await asyncio.sleep(cls.lag_interval)
+            lag = max(0.0, loop.time() - expected)
+            cls._lags.append(lag)
+            LOOP_LAG_SECONDS.observe(lag)
+
+    @classmethod
+    def _event_loop_check(cls):
+        """
+        Report the event-loop lag over the probe window.
+
+        Returns:
+            dict: Status, latest and maximum lag in milliseconds
+        """
+        if not cls._lags:
+            return {"status": "healthy", "lag_ms": None, "max_lag_ms": None}
+        max_lag = max(cls._lags)
+        return {
+            "status": cls.classify(max_lag, "LOOP_LAG", 0.1, 1.0),
+            "lag_ms": round(cls._lags[-1] * 1000, 3),
+            "max_lag_ms": round(max_lag * 1000, 3),
+            "window_seconds": round(len(cls._lags) * cls.lag_interval, 3),
+        }
+
+    @classmethod
+    def _executor_check(cls):
+        """
+        Report calls waiting for a thread in the default executor (blocking socket reads).
+
+        Returns:
+            dict: Status, queue depth, busy threads and thread limit
+        """
+        if cls.executor is None:
+            return {"status": "healthy", "queue_depth": None}
+        # ThreadPoolExecutor exposes no public queue size; its work queue is a plain SimpleQueue
+        queue_depth = cls.executor._work_queue.qsize()
+        return {
+            "status": cls.classify(queue_depth, "EXECUTOR_QUEUE", 1, 50),
+            "queue_depth": queue_depth,
+            "threads": len(cls.executor._threads),
+            "max_workers": cls.executor._max_workers,
+        }
+
+    @classmethod
+    def report(cls):
+        """
+        Run every check and combine them.
+
+        Returns:
+            dict: Overall status, uptime and the result of each check
+        """
+        results = {
+            "event_loop": cls._event_loop_check(),
+            "executor": cls._executor_check(),
+        }
+        for name, check in list(cls.checks.items()):
+            try:
+                results[name] = check()
+            except Exception as e:
+                Logger.log_error(f"Health check {name} failed: {e}", key=f"health_check_{name}")
+                results[name] = {"status": "unhealthy", "error": str(e)}
+
+        status = max((result.get("status", "healthy") for result in results.values()), key=STATUSES.index)
+        current_time = time.time()
+        return {
+            "status": status,
+            "timestamp": current_time,
+            "uptime_seconds": round(current_time - cls.started_at, 3) if cls.started_at else 0,
+            "checks": results,
+        }
@@ -1,43 +1,247 @@
 from datetime import datetime
+import atexit
+import json
 import logging
+import logging.handlers
+import multiprocessing
 import os
+import queue
+import sys
+import time
+
+# Root of the loggers used by the server; children are named after the calling module
+ROOT_LOGGER_NAME = "server"
+
+# Defaults for the rotating log file
+DEFAULT_LOG_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_LOG_BACKUP_COUNT = 5
+
+# Default window (seconds) in which a rate limited key is logged at most once
+DEFAULT_RATE_LIMIT_INTERVAL = 10.0
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record):
+        """
+        Format a log record.
+
+        Args:
+            record (LogRecord): Record to format
+
+        Returns:
+            str: JSON line
+        """
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "subsystem": record.name[len(ROOT_LOGGER_NAME) + 1:] or None,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "suppressed", 0):
+            entry["suppressed"] = record.suppressed
+        return json.dumps(entry)
+
+
+class _TextFormatter(logging.Formatter):
+    """Formats records like the original log file lines."""
+
+    def format(self, record):
+        """
+        Format a log record.
+
+        Args:
+            record (LogRecord): Record to format
+
+        Returns:
+            str: Text line
+        """
+        message = record.getMessage()
+        if getattr(record, "suppressed", 0):
+            message += f" ({record.suppressed} similar messages suppressed)"
+        return f"{datetime.fromtimestamp(record.created).isoformat()} - [{record.levelname}] - {message}"
 
 
 class Logger:
-    """System logging management class."""
+    """
+    System logging management class.
+
+    Calls only build a record and put it on a queue; a background thread
+    formats it and writes it to the console and to a single open, rotating
+    log file. Only the main process rotates the file; web and ingest worker
+    processes append to it and reopen it after each rotation. Each calling
+    module logs under its own subsystem name, so levels can be set per
+    subsystem, and repetitive messages can pass a key to be logged at most
+    once per rate limit interval.
+
+    Configuration (environment):
+        SERVER_LOG_FILE_PATH: Log file path (default server.log)
+        LOG_LEVEL: Default level (default INFO)
+        LOG_LEVELS: Per subsystem levels, e.g. "connection.bluetooth_server=WARNING,web=DEBUG"
+        LOG_FORMAT: "text" or "json" (JSON lines) for the log file
+        LOG_MAX_BYTES / LOG_BACKUP_COUNT: Log file rotation (main process)
+        LOG_RATE_LIMIT_INTERVAL: Seconds between messages sharing a key
+    """
+
+    _listener = None
+    _rate_limit_interval = DEFAULT_RATE_LIMIT_INTERVAL
+    _rate_limits = {}
+    _rate_limits_pruned_at = 0.0
+
+    @classmethod
+    def configure(cls):
+        """Set up the queue, the writer thread and subsystem levels (idempotent)."""
+        if cls._listener is not None:
+            return
+
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+        root.propagate = False
+
+        for entry in os.getenv("LOG_LEVELS", "").split(","):
+            if "=" not in entry:
+                continue
+            subsystem, level = entry.split("=", 1)
+            try:
+                logging.getLogger(f"{ROOT_LOGGER_NAME}.{subsystem.strip()}").setLevel(level.strip().upper())
+            except ValueError:
+                pass
+
+        cls._rate_limit_interval = float(os.getenv("LOG_RATE_LIMIT_INTERVAL", DEFAULT_RATE_LIMIT_INTERVAL))
+
+        log_path = os.getenv("SERVER_LOG_FILE_PATH", "server.log")
+        if multiprocessing.parent_process() is None:
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_path,
+                maxBytes=int(os.getenv("LOG_MAX_BYTES", DEFAULT_LOG_MAX_BYTES)),
+                backupCount=int(os.getenv("LOG_BACKUP_COUNT", DEFAULT_LOG_BACKUP_COUNT)),
+                encoding="utf-8"
+            )
+        else:
+            # Rotating from several processes loses lines and overwrites backups
+            file_handler = logging.handlers.WatchedFileHandler(log_path, encoding="utf-8")
+        if os.getenv("LOG_FORMAT", "text").lower() == "json":
+            file_handler.setFormatter(JsonLineFormatter())
+        else:
+            file_handler.setFormatter(_TextFormatter())
+
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+
+        log_queue = queue.SimpleQueue()
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        cls._listener = logging.handlers.QueueListener(
+            log_queue, console_handler, file_handler, respect_handler_level=True
+        )
+        cls._listener.start()
+        atexit.register(cls.shutdown)
+
+    @classmethod
+    def shutdown(cls):
+        """Flush queued records and stop the writer thread."""
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
 
     @staticmethod
-    def log_message(message):
+    def _subsystem_logger():
+        """
+        Get the logger of the module calling Logger.
+
+        Returns:
+            logging.Logger: Logger named after the caller's module
+        """
+        module = sys._getframe(3).f_globals.get("__name__", "")
+        if module.startswith("src."):
+            module = module[4:]
+        elif module in ("__main__", "__mp_main__"):
+            module = "app"
+        return logging.getLogger(f"{ROOT_LOGGER_NAME}.{module}")
+
+    @classmethod
+    def _log(cls, level, message, key):
+        """
+        Queue a message if its level is enabled and its key is not rate limited.
+
+        Args:
+            level (int): Logging level
+            message (str): Message to be logged
+            key (str, optional): Rate limit key for repetitive messages
+        """
+        if cls._listener is None:
+            cls.configure()
+
+        logger = cls._subsystem_logger()
+        if not logger.isEnabledFor(level):
+            return
+
+        suppressed = 0
+        if key is not None:
+            now = time.monotonic()
+            window = cls._rate_limits.get(key)
+            if window is not None and now - window[0] < cls._rate_limit_interval:
+                window[1] += 1
+                return
+            suppressed = window[1] if window is not None else 0
+            cls._rate_limits[key] = [now, 0]
+            if now - cls._rate_limits_pruned_at > cls._rate_limit_interval:
+                cls._prune_rate_limits(now)
+
+        logger.log(level, message, extra={"suppressed": suppressed})
+
+    @classmethod
+    def _prune_rate_limits(cls, now):
+        """
+        Drop rate limit windows that have expired, so per device and per connection keys do not accumulate.
+
+        Args:
+            now (float): Current monotonic time
+        """
+        cls._rate_limits = {key: window for key, window in cls._rate_limits.items()
+                            if now - window[0] < cls._rate_limit_interval}
+        cls._rate_limits_pruned_at = now
+
+    @classmethod
+    def log_debug(cls, message, key=None):
+        """
+        Log a debug message to console and log file.
+
+        Args:
+            message (str): Message to be logged
+            key (str, optional): Rate limit key for repetitive messages
+        """
+        cls._log(logging.DEBUG, message, key)
+
+    @classmethod
+    def log_message(cls, message, key=None):
         """
         Log an info message to console and log file.
 
         Args:
             message (str): Message to be logged
+            key (str, optional): Rate limit key for repetitive messages
         """
-        logging.info(message)
-        with open(os.getenv("SERVER_LOG_FILE_PATH", "server.log"), "a+") as f:
-            f.write(f"{datetime.now().isoformat()} - [INFO] - {message}\n")
+        cls._log(logging.INFO, message, key)
 
-    @staticmethod
-    def log_error(message):
+    @classmethod
+    def log_error(cls, message, key=None):
         """
         Log an error message to console and log file.
 
         Args:
             message (str): Error message to be logged
+            key (str, optional): Rate limit key for repetitive messages
         """
-        logging.error(message)
-        with open(os.getenv("SERVER_LOG_FILE_PATH", "server.log"), "a+") as f:
-            f.write(f"{datetime.now().isoformat()} - [ERROR] - {message}\n")
+        cls._log(logging.ERROR, message, key)
 
-    @staticmethod
-    def log_warning(message):
+    @classmethod
+    def log_warning(cls, message, key=None):
         """
         Log a warning message to console and log file.
 
         Args:
             message (str): Warning message to be logged
+            key (str, optional): Rate limit key for repetitive messages
         """
-        logging.warning(message)
-        with open(os.getenv("SERVER_LOG_FILE_PATH", "server.log"), "a+") as f:
-            f.write(f"{datetime.now().isoformat()} - [WARNING] - {message}\n")
\ No newline at end of file
+        cls._log(logging.WARNING, message, key)
@@ -0,0 +1,430 @@
+import math
+import os
+import resource
+import sys
+from bisect import bisect_left
+
+# Default histogram buckets (seconds) for latencies on the hot paths
+DEFAULT_LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _format_labels(labelnames, labels, extra=None):
+    """
+    Format a label set in Prometheus text syntax.
+
+    Args:
+        labelnames (tuple): Label names
+        labels (tuple): Label values, aligned with labelnames
+        extra (tuple, optional): Additional (name, value) pair
+
+    Returns:
+        str: Label block, empty if there are no labels
+    """
+    pairs = list(zip(labelnames, labels))
+    if extra is not None:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    """
+    Format a sample value in Prometheus text syntax.
+
+    Args:
+        value (float): Sample value
+
+    Returns:
+        str: Formatted value
+    """
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base class of metrics: a name, help text and one series per label value tuple."""
+
+    type_name = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        """
+        Initialize a metric.
+
+        Args:
+            name (str): Metric name
+            documentation (str): Help text
+            labelnames (tuple): Label names; values are passed positionally when recording
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def remove(self, label, value):
+        """
+        Drop every series whose label has a given value.
+
+        Args:
+            label (str): Label name
+            value (str): Label value
+        """
+        if label not in self.labelnames:
+            return
+        index = self.labelnames.index(label)
+        for labels in [labels for labels in self.values if labels[index] == value]:
+            del self.values[labels]
+
+    def collect(self):
+        """
+        Get the current series.
+
+        Returns:
+            dict: Value (or histogram state) per label value tuple
+        """
+        return self.values
+
+    def render(self):
+        """
+        Render the metric in Prometheus text format.
+
+        Returns:
+            list: Output lines
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for labels, value in self.collect().items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing value, incremented directly or read at scrape time."""
+
+    type_name = "counter"
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        """
+        Initialize a counter.
+
+        Args:
+            name (str): Metric name
+            documentation (str): Help text
+            labelnames (tuple): Label names
+            function (callable, optional): Returns {label value tuple: total} when scraped
+        """
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def inc(self, *labels, amount=1):
+        """
+        Increase the series of the given label values.
+
+        Args:
+            *labels: Label values, in labelnames order
+            amount (float): Increment
+        """
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def collect(self):
+        """
+        Get the current series, calling the counter function if there is one.
+
+        Returns:
+            dict: Value per label value tuple
+        """
+        if self.function is not None:
+            return self.function()
+        return self.values
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, set directly or computed at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        """
+        Initialize a gauge.
+
+        Args:
+            name (str): Metric name
+            documentation (str): Help text
+            labelnames (tuple): Label names
+            function (callable, optional): Returns {label value tuple: value} when scraped
+        """
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def set(self, value, *labels):
+        """
+        Set the series of the given label values.
+
+        Args:
+            value (float): New value
+            *labels: Label values, in labelnames order
+        """
+        self.values[labels] = value
+
+    def inc(self, *labels, amount=1):
+        """
+        Increase the series of the given label values.
+
+        Args:
+            *labels: Label values, in labelnames order
+            amount (float): Increment, negative to decrease
+        """
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def collect(self):
+        """
+        Get the current series, calling the gauge function if there is one.
+
+        Returns:
+            dict: Value per label value tuple
+        """
+        if self.function is not None:
+            return self.function()
+        return self.values
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        """
+        Initialize a histogram.
+
+        Args:
+            name (str): Metric name
+            documentation (str): Help text
+            labelnames (tuple): Label names
+            buckets (tuple): Sorted upper bounds; +Inf is implied
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        """
+        Record one observation.
+
+        Args:
+            value (float): Observed value
+            *labels: Label values, in labelnames order
+        """
+        state = self.values.get(labels)
+        if state is None:
+            # Per bucket counts (not cumulative), then sum and count
+            state = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def render(self):
+        """
+        Render the histogram with cumulative buckets, sum and count.
+
+        Returns:
+            list: Output lines
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for labels, (counts, total, count) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                label_block = _format_labels(self.labelnames, labels, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{label_block} {cumulative}")
+            label_block = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_block} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_block} {count}")
+        return lines
+
+
+class Metrics:
+    """
+    Process-wide metrics registry rendered in Prometheus text format.
+
+    Recording is a dict update on the calling thread with no locking, which
+    is safe because every instrumented path runs on the event loop. Series
+    are per process; ingest workers periodically drain() theirs and the
+    main process merge()s them, while each web worker serves its own.
+    """
+    _metrics = {}
+
+    @classmethod
+    def _register(cls, metric_class, name, documentation, labelnames=(), **kwargs):
+        """
+        Get a registered metric or register a new one.
+
+        Args:
+            metric_class (type): Metric class
+            name (str): Metric name
+            documentation (str): Help text
+            labelnames (tuple): Label names
+
+        Returns:
+            _Metric: Registered metric
+
+        Raises:
+            ValueError: If the name is registered with another type
+        """
+        metric = cls._metrics.get(name)
+        if metric is None:
+            metric = cls._metrics[name] = metric_class(name, documentation, labelnames, **kwargs)
+        elif not isinstance(metric, metric_class):
+            raise ValueError(f"Metric {name} already registered as {metric.type_name}")
+        return metric
+
+    @classmethod
+    def counter(cls, name, documentation, labelnames=(), function=None):
+        """
+        Get or create a counter.
+
+        Args:
+            name (str): Metric name
+            documentation (str): Help text
+            labelnames (tuple): Label names
+            function (callable, optional): Returns {label value tuple: total} when scraped,
+                for totals kept elsewhere (e.g. by the operating system)
+
+        Returns:
+            Counter: Registered counter
+        """
+        counter = cls._register(Counter, name, documentation, labelnames)
+        if function is not None:
+            counter.function = function
+        return counter
+
+    @classmethod
+    def gauge(cls, name, documentation, labelnames=(), function=None):
+        """
+        Get or create a gauge.
+
+        Args:
+            name (str): Metric name
+            documentation (str): Help text
+            labelnames (tuple): Label names
+            function (callable, optional): Returns {label value tuple: value} when scraped
+
+        Returns:
+            Gauge: Registered gauge
+        """
+        gauge = cls._register(Gauge, name, documentation, labelnames)
+        if function is not None:
+            gauge.function = function
+        return gauge
+
+    @classmethod
+    def histogram(cls, name, documentation, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        """
+        Get or create a histogram.
+
+        Args:
+            name (str): Metric name
+            documentation (str): Help text
+            labelnames (tuple): Label names
+            buckets (tuple): Sorted upper bounds
+
+        Returns:
+            Histogram: Registered histogram
+        """
+        return cls._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    @classmethod
+    def remove_label(cls, label, value):
+        """
+        Drop series of every metric whose label has a given value (e.g. a removed device).
+
+        Args:
+            label (str): Label name
+            value (str): Label value
+        """
+        for metric in cls._metrics.values():
+            metric.remove(label, value)
+
+    @classmethod
+    def drain(cls):
+        """
+        Take and reset the recorded counter and histogram series, e.g. to forward them to another process.
+
+        Returns:
+            dict: Series per metric name
+        """
+        drained = {}
+        for name, metric in cls._metrics.items():
+            if isinstance(metric, (Counter, Histogram)) and metric.values:
+                drained[name] = metric.values
+                metric.values = {}
+        return drained
+
+    @classmethod
+    def merge(cls, drained):
+        """
+        Add series drained in another process to the local metrics.
+
+        Args:
+            drained (dict): Output of drain()
+        """
+        for name, series in drained.items():
+            metric = cls._metrics.get(name)
+            if isinstance(metric, Counter):
+                for labels, value in series.items():
+                    metric.inc(*labels, amount=value)
+            elif isinstance(metric, Histogram):
+                for labels, (counts, total, count) in series.items():
+                    state = metric.values.get(labels)
+                    if state is None:
+                        metric.values[labels] = [list(counts), total, count]
+                    else:
+                        state[0] = [a + b for a, b in zip(state[0], counts)]
+                        state[1] += total
+                        state[2] += count
+
+    @classmethod
+    def render(cls):
+        """
+        Render every metric in Prometheus text exposition format.
+
+        Returns:
+            str: Exposition text
+        """
+        lines = []
+        for metric in cls._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _process_cpu_seconds():
+    """
+    Get the CPU time used by this process.
+
+    Returns:
+        dict: User plus system CPU seconds, keyed by the empty label tuple
+    """
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return {(): usage.ru_utime + usage.ru_stime}
+
+
+def _process_resident_bytes():
+    """
+    Get the resident memory of this process.
+
+    Returns:
+        dict: Resident set size in bytes (peak size where /proc is unavailable), keyed by the empty label tuple
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return {(): int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")}
+    except OSError:
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        scale = 1 if sys.platform == "darwin" else 1024
+        return {(): resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale}
+
+
+Metrics.counter("pub_process_cpu_seconds_total", "CPU time used by this process", function=_process_cpu_seconds)
+Metrics.gauge("pub_process_resident_memory_bytes", "Resident memory of this process", function=_process_resident_bytes)
@@ -0,0 +1,283 @@
+import asyncio
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import types
+from src.utils.logging import Logger
+
+PROFILE_MODES = ("sampling", "cprofile")
+
+# Seconds between stack samples of the event loop thread
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Lines of the pstats report, sorted by cumulative time
+PSTATS_LINES = 60
+
+
+@types.coroutine
+def _drive(coro, stats):
+    """
+    Run a coroutine step by step, measuring the time each step holds the event loop.
+
+    Args:
+        coro (coroutine): Coroutine to run
+        stats (list): [calls, wall seconds, busy seconds, max busy seconds], updated in place
+
+    Returns:
+        Any: The coroutine's result
+    """
+    started = time.perf_counter()
+    busy = 0.0
+    value = None
+    error = None
+    try:
+        while True:
+            step = time.perf_counter()
+            try:
+                if error is not None:
+                    yielded = coro.throw(error)
+                else:
+                    yielded = coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                busy += time.perf_counter() - step
+                error = None
+            try:
+                value = yield yielded
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as e:
+                value = None
+                error = e
+    finally:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - started
+        stats[2] += busy
+        stats[3] = max(stats[3], busy)
+
+
+async def _timed(coro, stats):
+    """
+    Await a coroutine through _drive, so it can be scheduled as a task.
+
+    Args:
+        coro (coroutine): Coroutine to run
+        stats (list): Timing accumulator of the coroutine's name
+
+    Returns:
+        Any: The coroutine's result
+    """
+    return await _drive(coro, stats)
+
+
+class Profiler:
+    """
+    Profiles the running server on demand.
+
+    Two modes are available: "sampling" captures the event loop thread's
+    stack from a background thread at a fixed interval and reports it as
+    collapsed stacks (one "frame;frame;frame count" line per stack, the
+    input of flame graph tools), with near-constant overhead; "cprofile"
+    runs cProfile on the event loop thread and reports pstats output.
+    While a profile runs, coroutines decorated with Profiler.timed also
+    record their wall time and the time they actually held the event loop.
+
+    Configuration (environment):
+        PROFILING: Mode started with the server ("sampling" or "cprofile"), off by default
+        PROFILE_DURATION: Seconds after which the startup profile stops, unlimited by default
+        PROFILE_SAMPLE_INTERVAL: Seconds between stack samples (default 0.005)
+    """
+    active = False
+    mode = None
+    started_at = None
+    last_result = None
+    coroutine_stats = {}
+    _profile = None
+    _stacks = {}
+    _sample_count = 0
+    _sampler = None
+    _stop_event = None
+    _stop_handle = None
+
+    @classmethod
+    def start(cls, mode="sampling", duration=None, interval=None):
+        """
+        Start profiling the event loop thread (call from the running loop).
+
+        Args:
+            mode (str): "sampling" or "cprofile"
+            duration (float, optional): Stop automatically after this many seconds
+            interval (float, optional): Sampling interval in seconds
+
+        Raises:
+            ValueError: If the mode is unknown
+            RuntimeError: If a profile is already running
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profiling mode '{mode}', expected one of {', '.join(PROFILE_MODES)}")
+        if cls.active:
+            raise RuntimeError(f"A {cls.mode} profile is already running")
+
+        cls.mode = mode
+        cls.started_at = time.time()
+        cls.coroutine_stats = {}
+        if mode == "cprofile":
+            cls._profile = cProfile.Profile()
+            cls._profile.enable()
+        else:
+            if interval is None:
+                interval = float(os.getenv("PROFILE_SAMPLE_INTERVAL", DEFAULT_SAMPLE_INTERVAL))
+            cls._stacks = {}
+            cls._sample_count = 0
+            cls._stop_event = threading.Event()
+            cls._sampler = threading.Thread(
+                target=cls._sample, args=(threading.get_ident(), interval, cls._stop_event),
+                name="profiler-sampler", daemon=True
+            )
+            cls._sampler.start()
+        cls.active = True
+
+        if duration:
+            cls._stop_handle = asyncio.get_running_loop().call_later(duration, cls.stop)
+        Logger.log_message(f"Profiling started ({mode}" + (f", {duration}s)" if duration else ")"))
+
+    @classmethod
+    def start_from_env(cls):
+        """Start the profile requested by PROFILING, if any (call from the running loop)."""
+        mode = os.getenv("PROFILING", "").lower()
+        if mode not in PROFILE_MODES:
+            return
+        duration = os.getenv("PROFILE_DURATION")
+        cls.start(mode, float(duration) if duration else None)
+
+    @classmethod
+    def stop(cls):
+        """
+        Stop the running profile and keep its result.
+
+        Returns:
+            dict: Mode, start time, duration, sample count (function calls for cprofile),
+                coroutine timings and the collapsed-stack or pstats output; None if no profile was running
+        """
+        if not cls.active:
+            return None
+        cls.active = False
+        if cls._stop_handle is not None:
+            cls._stop_handle.cancel()
+            cls._stop_handle = None
+
+        if cls.mode == "cprofile":
+            cls._profile.disable()
+            stream = io.StringIO()
+            stats = pstats.Stats(cls._profile, stream=stream)
+            stats.sort_stats("cumulative").print_stats(PSTATS_LINES)
+            output = stream.getvalue()
+            samples = stats.total_calls
+            cls._profile = None
+        else:
+            cls._stop_event.set()
+            cls._sampler.join()
+            cls._sampler = None
+            ordered = sorted(cls._stacks.items(), key=lambda item: item[1], reverse=True)
+            output = "".join(f"{stack} {count}\n" for stack, count in ordered)
+            samples = cls._sample_count
+
+        cls.last_result = {
+            "mode": cls.mode,
+            "started_at": cls.started_at,
+            "duration_seconds": round(time.time() - cls.started_at, 3),
+            "samples": samples,
+            "coroutines": cls.coroutine_report(),
+            "output": output,
+        }
+        Logger.log_message(f"Profiling stopped ({cls.mode}, {cls.last_result['duration_seconds']}s)")
+        return cls.last_result
+
+    @classmethod
+    def _sample(cls, thread_id, interval, stop_event):
+        """
+        Sampler thread: record the target thread's stack every interval until stopped.
+
+        Args:
+            thread_id (int): Identifier of the profiled thread
+            interval (float): Seconds between samples
+            stop_event (threading.Event): Set to stop sampling
+        """
+        stacks = cls._stacks
+        while not stop_event.wait(interval):
+            frame = sys._current_frames().get(thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack = ";".join(reversed(frames))
+            stacks[stack] = stacks.get(stack, 0) + 1
+            cls._sample_count += 1
+
+    @classmethod
+    def timed(cls, name):
+        """
+        Decorate a coroutine function to record its timing while a profile runs.
+
+        Args:
+            name (str): Name in the coroutine report
+
+        Returns:
+            callable: Decorator
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                coro = func(*args, **kwargs)
+                if not cls.active:
+                    return coro
+                stats = cls.coroutine_stats.get(name)
+                if stats is None:
+                    stats = cls.coroutine_stats[name] = [0, 0.0, 0.0, 0.0]
+                return _timed(coro, stats)
+            return wrapper
+        return decorator
+
+    @classmethod
+    def coroutine_report(cls):
+        """
+        Summarize the timing of decorated coroutines.
+
+        Returns:
+            dict: Per coroutine name, completed calls and wall / event-loop (busy) time in milliseconds
+        """
+        report = {}
+        for name, (calls, wall, busy, max_busy) in cls.coroutine_stats.items():
+            report[name] = {
+                "calls": calls,
+                "wall_ms": round(wall * 1000, 3),
+                "busy_ms": round(busy * 1000, 3),
+                "mean_busy_ms": round(busy / calls * 1000, 3) if calls else 0.0,
+                "max_busy_ms": round(max_busy * 1000, 3),
+            }
+        return report
+
+    @classmethod
+    def status(cls):
+        """
+        Get the profiler state.
+
+        Returns:
+            dict: Whether a profile runs, its mode, start time, samples and coroutine timings so far
+        """
+        return {
+            "active": cls.active,
+            "mode": cls.mode if cls.active else None,
+            "started_at": cls.started_at if cls.active else None,
+            "samples": cls._sample_count if cls.active and cls.mode == "sampling" else None,
+            "coroutines": cls.coroutine_report() if cls.active else {},
+            "has_result": cls.last_result is not None,
+        }
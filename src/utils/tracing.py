@@ -0,0 +1,172 @@
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+from src.utils.metrics import Metrics
+
+# Stages of a sample's path, in order; all but parse/process/record are measured from receive time
+STAGES = ("parse", "process", "record", "handoff", "dispatch", "send", "delivered", "browser")
+
+# Latency samples kept per stage and device for percentile reports
+DEFAULT_RESERVOIR_SIZE = 2048
+
+PERCENTILES = (50, 95, 99)
+
+STAGE_SECONDS = Metrics.histogram(
+    "pub_sample_latency_seconds", "Sample latency per pipeline stage", ("stage",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+
+class LatencyTracker:
+    """
+    Tracks per-stage latency of samples from radio receive to browser.
+
+    The ingest path marks the wall-clock receive time of the data it is
+    handling in a context variable; because EventBus dispatch is
+    synchronous and asyncio tasks copy the context, the WebSocket fan-out
+    of the resulting update sees the same receive time without threading
+    it through every call. Wall-clock times keep stages comparable across
+    ingest and web worker processes.
+
+    Stages:
+        parse: receive to decoded message
+        process: time spent in Sensor.process_data
+        record: time spent queueing the sample for the CSV writer
+        handoff: receive (in an ingest worker) to storage in the main process
+        dispatch: receive to the start of the WebSocket fan-out
+        send: time spent sending one update to every client
+        delivered: receive to the update sent to every client
+        browser: receive to the browser's acknowledgment after rendering
+    """
+    enabled = None
+    reservoir_size = DEFAULT_RESERVOIR_SIZE
+    _samples = {}
+    _received_at = ContextVar("received_at", default=None)
+
+    @classmethod
+    def mark_received(cls, timestamp=None):
+        """
+        Set the receive time of the data being handled in the current context.
+
+        Args:
+            timestamp (float, optional): Wall-clock receive time, defaults to now
+
+        Returns:
+            Token: Token to restore the previous value with reset()
+        """
+        return cls._received_at.set(time.time() if timestamp is None else timestamp)
+
+    @classmethod
+    def reset(cls, token):
+        """
+        Restore the receive time that was current before mark_received.
+
+        Args:
+            token (Token): Token returned by mark_received
+        """
+        cls._received_at.reset(token)
+
+    @classmethod
+    def received_at(cls):
+        """
+        Get the receive time of the data being handled in the current context.
+
+        Returns:
+            float: Wall-clock receive time or None outside a traced path
+        """
+        return cls._received_at.get()
+
+    @classmethod
+    def record(cls, stage, device_id, seconds):
+        """
+        Record one latency observation.
+
+        Args:
+            stage (str): Stage name
+            device_id (str): Device identifier
+            seconds (float): Latency in seconds
+        """
+        if cls.enabled is None:
+            cls.enabled = os.getenv("LATENCY_TRACING", "True") == "True"
+        if not cls.enabled:
+            return
+        key = (stage, device_id)
+        samples = cls._samples.get(key)
+        if samples is None:
+            samples = cls._samples[key] = deque(maxlen=cls.reservoir_size)
+        samples.append(seconds)
+        STAGE_SECONDS.observe(seconds, stage)
+
+    @classmethod
+    def record_since_received(cls, stage, device_id, received_at=None):
+        """
+        Record the time elapsed since a sample was received.
+
+        Args:
+            stage (str): Stage name
+            device_id (str): Device identifier
+            received_at (float, optional): Receive time, defaults to the current context's
+        """
+        if received_at is None:
+            received_at = cls._received_at.get()
+        if received_at is not None:
+            cls.record(stage, device_id, time.time() - received_at)
+
+    @classmethod
+    def forget_device(cls, device_id):
+        """
+        Drop the latency samples of a removed device.
+
+        Args:
+            device_id (str): Device identifier
+        """
+        for key in [key for key in cls._samples if key[1] == device_id]:
+            del cls._samples[key]
+
+    @staticmethod
+    def _summarize(samples):
+        """
+        Compute percentiles of latency samples.
+
+        Args:
+            samples (list): Latencies in seconds
+
+        Returns:
+            dict: Sample count and p50/p95/p99/max in milliseconds
+        """
+        ordered = sorted(samples)
+        summary = {"count": len(ordered)}
+        for percentile in PERCENTILES:
+            index = min(len(ordered) - 1, max(0, round(percentile / 100 * len(ordered)) - 1))
+            summary[f"p{percentile}_ms"] = round(ordered[index] * 1000, 3)
+        summary["max_ms"] = round(ordered[-1] * 1000, 3)
+        return summary
+
+    @classmethod
+    def report(cls, device_id=None):
+        """
+        Get latency percentiles per stage, overall and per device.
+
+        Args:
+            device_id (str, optional): Restrict the report to one device
+
+        Returns:
+            dict: "stages" with percentiles over all selected devices and "devices"
+                with percentiles per device and stage
+        """
+        overall = {}
+        devices = {}
+        for (stage, sample_device), samples in list(cls._samples.items()):
+            if not samples or (device_id is not None and sample_device != device_id):
+                continue
+            overall.setdefault(stage, []).extend(samples)
+            devices.setdefault(sample_device, {})[stage] = cls._summarize(samples)
+
+        order = {stage: index for index, stage in enumerate(STAGES)}
+        stages = sorted(overall, key=lambda stage: order.get(stage, len(order)))
+        return {
+            "enabled": cls.enabled is not False,
+            "stages": {stage: cls._summarize(overall[stage]) for stage in stages},
+            "devices": devices,
+        }
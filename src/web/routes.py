@@ -1,12 +1,321 @@
 from src.connection.bluetooth_server import DeviceManager
+from src.connection.event_bus import EventBus
 from fastapi import Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
 import json
+import os
+import secrets
 import time
+from typing import Optional
+from src.sensors.base_sensor import DEFAULT_OVERVIEW_POINTS
+from src.sensors.calibration import Calibration
+from src.sensors.capture import Capture, valid_window
+from src.sensors.clock_sync import ClockSync
+from src.sensors.sample_stats import SampleStats
+from src.sensors.spectrum import SpectrumAnalyzer, SPECTRUM_METHODS
+from src.sensors.triggers import TriggerLog
+from src.utils.health import HealthMonitor
 from src.utils.logging import Logger
+from src.utils.metrics import Metrics
+from src.utils.profiling import Profiler
+from src.utils.tracing import LatencyTracker
+
+# Upper bound on points a client may request from an overview query
+MAX_OVERVIEW_POINTS = 10000
+
+# Seconds without data before a sensor is reported inactive by the info API
+RECENT_DATA_THRESHOLD = 4.0
+
+# Batch query limits and accepted selector options
+MAX_BATCH_QUERIES = 200
+QUERY_OPTIONS = ("start", "end", "span", "points", "since", "since_time", "limit", "fields")
+
+
+def _query_sensor(sensor, current_time, start=None, end=None, span=None, points=None,
+                  since=None, since_time=None, limit=None, fields=None):
+    """
+    Select data from a sensor according to range or cursor options.
+
+    Without options the latest raw samples are returned. Range options
+    (start, end, span, points) return a downsampled overview; cursor
+    options (since, since_time, limit) return only samples after the cursor.
+
+    Args:
+        sensor (Sensor): Sensor to read
+        current_time (float): Reference time for recency metadata
+        start (float, optional): Range start in seconds since sensor start
+        end (float, optional): Range end in seconds since sensor start
+        span (float, optional): Range length ending at end or at the latest sample
+        points (int, optional): Maximum number of overview points
+        since (int, optional): Sample sequence cursor
+        since_time (float, optional): Relative time cursor
+        limit (int, optional): Maximum number of samples returned
+        fields (list, optional): Channels to include
+
+    Returns:
+        dict: Data, data point count, metadata and cursor information when applicable
+    """
+    resolution = None
+    cursor_info = None
+    if any(param is not None for param in (start, end, span, points)):
+        max_points = min(max(points or DEFAULT_OVERVIEW_POINTS, 1), MAX_OVERVIEW_POINTS)
+        data = sensor.get_overview(start=start, end=end, max_points=max_points, span=span)
+        resolution = data.pop("resolution", None)
+        if fields is not None:
+            for key in ("min", "max"):
+                data[key] = {c: v for c, v in data.get(key, {}).items() if c in fields}
+            data = {k: v for k, v in data.items() if k in ("time", "min", "max") or k in fields}
+    elif any(param is not None for param in (since, since_time, limit, fields)):
+        if limit is not None:
+            limit = max(limit, 0)
+        cursor_info = sensor.get_data_since(since=since, since_time=since_time, limit=limit, fields=fields)
+        data = cursor_info.pop("data")
+    else:
+        data = sensor.get_data()
+
+    last_update_time = None
+    time_since_update = None
+
+    summary = sensor.get_summary()
+    if summary["last_time"] is not None:
+        sensor_start_time = getattr(sensor, 'start_time', current_time)
+        last_update_time = sensor_start_time + summary["last_time"]
+        time_since_update = current_time - last_update_time
+
+    result = {
+        "data_points": len(data.get("time", [])),
+        "data": data,
+        "metadata": {
+            "last_update_time": last_update_time,
+            "time_since_update": time_since_update,
+            "sensor_start_time": getattr(sensor, 'start_time', None),
+            "is_recent": time_since_update < 5.0 if time_since_update else False,
+            "current_server_time": current_time,
+            "resolution": resolution
+        }
+    }
+
+    if cursor_info is not None:
+        result.update(cursor_info)
+
+    return result
+
+
+def _coerce_option(key, value):
+    """
+    Convert a batch selector option to the type expected by _query_sensor.
+
+    Args:
+        key (str): Option name
+        value: Raw JSON value
+
+    Returns:
+        Converted value or None
+    """
+    if value is None:
+        return None
+    if key == "fields":
+        if isinstance(value, str):
+            return [f.strip() for f in value.split(",") if f.strip()]
+        return [str(f) for f in value]
+    if key in ("points", "since", "limit"):
+        return int(value)
+    return float(value)
+
+
+def _build_device_info(device_id, device, current_time):
+    """
+    Build the detailed information payload of a device.
+
+    Args:
+        device_id (str): Device identifier
+        device (dict): Registered device entry
+        current_time (float): Reference time for recency checks
+
+    Returns:
+        dict: Detailed device information with sensor status
+    """
+    sensor_info = {}
+    for sensor_type, sensor in device.get("sensors", {}).items():
+        try:
+            data = sensor.get_data()
+
+            has_data = len(data.get("time", [])) > 0
+
+            last_data_time = None
+            time_since_update = None
+            is_recent = False
+
+            if has_data and data.get("time"):
+                last_relative_time = data["time"][-1]
+                sensor_start_time = getattr(sensor, 'start_time', current_time)
+                last_data_time = sensor_start_time + last_relative_time
+
+                time_since_update = current_time - last_data_time
+
+                is_recent = time_since_update < RECENT_DATA_THRESHOLD
+
+            data_stats = None
+            if has_data and data.get("x") and data.get("y") and data.get("z"):
+                try:
+                    import statistics
+                    data_stats = {
+                        "x": {
+                            "latest": data["x"][-1] if data["x"] else None
+                        },
+                        "y": {
+                            "latest": data["y"][-1] if data["y"] else None
+                        },
+                        "z": {
+                            "latest": data["z"][-1] if data["z"] else None
+                        }
+                    }
+                except Exception:
+                    data_stats = None
+
+            sensor_info[sensor_type] = {
+                "type": sensor_type,
+                "status": DeviceManager.get_sensor_status(device_id, sensor_type),
+                "has_data": has_data,
+                "is_active": has_data and is_recent,
+                "data_points": len(data.get("time", [])),
+                "last_update_absolute": last_data_time,
+                "time_since_last_update": time_since_update,
+                "is_recent": is_recent,
+                "recent_threshold": RECENT_DATA_THRESHOLD,
+                "time_range": {
+                    "start": data.get("time", [None])[0],
+                    "end": data.get("time", [None])[-1],
+                    "duration": data.get("time", [None])[-1] - data.get("time", [None])[0]
+                    if len(data.get("time", [])) > 0 else None
+                } if data.get("time") else None,
+                "data_stats": data_stats,
+                "timing": SampleStats.report(device_id, sensor_type, current_time),
+                "sensor_start_time": getattr(sensor, 'start_time', None)
+            }
+
+            sensor_info[sensor_type]["debug_info"] = {
+                "sensor_start_time": getattr(sensor, 'start_time', None),
+                "current_time": current_time,
+                "last_relative_time": data.get("time", [None])[-1] if data.get("time") else None,
+                "calculated_absolute_time": last_data_time,
+                "threshold_used": RECENT_DATA_THRESHOLD
+            }
+
+        except Exception as e:
+            Logger.log_message(f"Error processing sensor {sensor_type}: {e}", key=f"sensor_info_error_{sensor_type}")
+            sensor_info[sensor_type] = {
+                "type": sensor_type,
+                "has_data": False,
+                "is_active": False,
+                "data_points": 0,
+                "error": str(e),
+                "time_since_last_update": None,
+                "is_recent": False
+            }
+
+    active_sensors = len([s for s in sensor_info.values() if s.get("is_active", False)])
+    total_sensors = len(sensor_info)
+
+    response_data = {
+        "device_id": device_id,
+        "device_name": device["name"],
+        "connected_at": device["connected_at"],
+        "sensors": sensor_info,
+        "total_sensors": total_sensors,
+        "active_sensors": active_sensors,
+        "clock": ClockSync.states.get(device_id, {}),
+        "calibration": Calibration.states.get(device_id, {}),
+        "timestamp": current_time,
+        "server_config": {
+            "recent_data_threshold": RECENT_DATA_THRESHOLD,
+            "check_time": current_time
+        }
+    }
+
+    return response_data
+
+
+def _status_key(device_id, device):
+    """
+    Get the liveness status of every sensor of a device as a compact key.
+
+    Liveness depends on the clock, not only on stored data, so it is part
+    of the info ETag to make the cached payload expire when a sensor goes quiet.
+
+    Args:
+        device_id (str): Device identifier
+        device (dict): Registered device entry
+
+    Returns:
+        str: First letter of each sensor status, in sensor order
+    """
+    return "".join(
+        DeviceManager.get_sensor_status(device_id, sensor_type)[0]
+        for sensor_type in device.get("sensors", {})
+    )
+
+
+def _etag_matches(request, etag):
+    """
+    Check a request If-None-Match header against an entity tag.
+
+    Args:
+        request (Request): FastAPI request object
+        etag (str): Current entity tag
+
+    Returns:
+        bool: True if the client already has this version
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    weak_etag = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == weak_etag:
+            return True
+    return False
+
+
+def _admin_authorized(request):
+    """
+    Check whether a request may use the admin endpoints.
+
+    With ADMIN_TOKEN set the request must send it in an X-Admin-Token
+    header; without it only clients on the local host are accepted.
+
+    Args:
+        request (Request): FastAPI request object
+
+    Returns:
+        bool: True if the request is authorized
+    """
+    token = os.getenv("ADMIN_TOKEN")
+    if token:
+        return secrets.compare_digest(request.headers.get("x-admin-token", ""), token)
+    return request.client is not None and request.client.host in ("127.0.0.1", "::1")
 
 
 def register_routes(app, templates, websocket_manager):
+    # Cached /info payloads keyed by device id, as (etag, payload)
+    device_info_cache = {}
+
+    def forget_device_info(event_data):
+        """
+        Drop the cached /info payload of a removed device (Event Bus callback).
+
+        Args:
+            event_data (dict): Event data containing device_id
+        """
+        device_info_cache.pop(event_data.get("device_id"), None)
+
+    EventBus.subscribe("device_disconnected", forget_device_info)
+
     @app.get("/", response_class=HTMLResponse)
     async def index(request: Request):
         """
@@ -56,22 +365,40 @@ def register_routes(app, templates, websocket_manager):
         })
 
     @app.get("/api/devices")
-    async def get_all_devices():
+    async def get_all_devices(request: Request):
         """
         API to get list of all devices.
 
+        Supports conditional requests: responds 304 when the If-None-Match
+        header matches the current device list ETag.
+
+        Args:
+            request (Request): FastAPI request object
+
         Returns:
             dict: All devices with serializable data
         """
+        DeviceManager.refresh_sensor_status()
+        etag = DeviceManager.get_devices_etag()
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
+
         devices = DeviceManager.get_serializable_devices()
-        return devices
+        return JSONResponse(devices, headers=headers)
 
     @app.get("/api/device/{device_id}/info")
-    async def get_device_info(device_id: str):
+    async def get_device_info(request: Request, device_id: str):
         """
         API to get detailed device information including sensor status.
 
+        The payload is cached per device and rebuilt only when the device
+        version, its stored data or sensor liveness changed; matching
+        If-None-Match headers get a 304 response.
+
         Args:
+            request (Request): FastAPI request object
             device_id (str): Device identifier
 
         Returns:
@@ -85,148 +412,369 @@ def register_routes(app, templates, websocket_manager):
         device = devices[device_id]
         current_time = time.time()
 
-        RECENT_DATA_THRESHOLD = 4.0
+        etag = DeviceManager.get_device_etag(device_id)[:-1] + f'-{_status_key(device_id, device)}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
 
-        sensor_info = {}
-        for sensor_type, sensor in device.get("sensors", {}).items():
-            try:
-                data = sensor.get_data()
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers=headers)
 
-                has_data = len(data.get("time", [])) > 0
+        cached = device_info_cache.get(device_id)
+        if cached is None or cached[0] != etag:
+            cached = (etag, _build_device_info(device_id, device, current_time))
+            device_info_cache[device_id] = cached
 
-                last_data_time = None
-                time_since_update = None
-                is_recent = False
+        return JSONResponse(cached[1], headers=headers)
 
-                if has_data and data.get("time"):
-                    last_relative_time = data["time"][-1]
-                    sensor_start_time = getattr(sensor, 'start_time', current_time)
-                    last_data_time = sensor_start_time + last_relative_time
+    @app.get("/api/device/{device_id}/data/{sensor_type}")
+    async def get_device_data(device_id: str, sensor_type: str, start: Optional[float] = None,
+                              end: Optional[float] = None, span: Optional[float] = None,
+                              points: Optional[int] = None, since: Optional[int] = None,
+                              since_time: Optional[float] = None, limit: Optional[int] = None,
+                              fields: Optional[str] = None):
+        """
+        API route to get data from specific sensor.
 
-                    time_since_update = current_time - last_data_time
+        Without parameters the latest raw samples are returned. With any of
+        start, end, span or points, a downsampled overview of the range is
+        returned instead, using the finest pyramid level that fits the range
+        in the requested number of points. With since, since_time or limit,
+        only samples after the cursor are returned together with the next
+        cursor, so polling clients transfer each sample once.
 
-                    is_recent = time_since_update < RECENT_DATA_THRESHOLD
+        Args:
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type
+            start (float, optional): Range start in seconds since sensor start
+            end (float, optional): Range end in seconds since sensor start
+            span (float, optional): Range length ending at end or at the latest sample
+            points (int, optional): Maximum number of points (typically the plot width in pixels)
+            since (int, optional): Cursor returned by a previous call (sample sequence number)
+            since_time (float, optional): Return samples newer than this relative time
+            limit (int, optional): Maximum number of samples returned
+            fields (str, optional): Comma-separated channels to include, e.g. "x,z"
 
-                data_stats = None
-                if has_data and data.get("x") and data.get("y") and data.get("z"):
-                    try:
-                        import statistics
-                        data_stats = {
-                            "x": {
-                                "latest": data["x"][-1] if data["x"] else None
-                            },
-                            "y": {
-                                "latest": data["y"][-1] if data["y"] else None
-                            },
-                            "z": {
-                                "latest": data["z"][-1] if data["z"] else None
-                            }
-                        }
-                    except Exception:
-                        data_stats = None
-
-                sensor_info[sensor_type] = {
-                    "type": sensor_type,
-                    "has_data": has_data,
-                    "is_active": has_data and is_recent,
-                    "data_points": len(data.get("time", [])),
-                    "last_update_absolute": last_data_time,
-                    "time_since_last_update": time_since_update,
-                    "is_recent": is_recent,
-                    "recent_threshold": RECENT_DATA_THRESHOLD,
-                    "time_range": {
-                        "start": data.get("time", [None])[0],
-                        "end": data.get("time", [None])[-1],
-                        "duration": data.get("time", [None])[-1] - data.get("time", [None])[0]
-                        if len(data.get("time", [])) > 0 else None
-                    } if data.get("time") else None,
-                    "data_stats": data_stats,
-                    "sensor_start_time": getattr(sensor, 'start_time', None)
-                }
-
-                sensor_info[sensor_type]["debug_info"] = {
-                    "sensor_start_time": getattr(sensor, 'start_time', None),
-                    "current_time": current_time,
-                    "last_relative_time": data.get("time", [None])[-1] if data.get("time") else None,
-                    "calculated_absolute_time": last_data_time,
-                    "threshold_used": RECENT_DATA_THRESHOLD
-                }
-
-            except Exception as e:
-                Logger.log_message(f"Error processing sensor {sensor_type}: {e}")
-                sensor_info[sensor_type] = {
-                    "type": sensor_type,
-                    "has_data": False,
-                    "is_active": False,
-                    "data_points": 0,
-                    "error": str(e),
-                    "time_since_last_update": None,
-                    "is_recent": False
-                }
-
-        active_sensors = len([s for s in sensor_info.values() if s.get("is_active", False)])
-        total_sensors = len(sensor_info)
-
-        response_data = {
-            "device_id": device_id,
-            "device_name": device["name"],
-            "connected_at": device["connected_at"],
-            "sensors": sensor_info,
-            "total_sensors": total_sensors,
-            "active_sensors": active_sensors,
-            "timestamp": current_time,
-            "server_config": {
-                "recent_data_threshold": RECENT_DATA_THRESHOLD,
-                "check_time": current_time
-            }
-        }
+        Returns:
+            dict: Sensor data with metadata
+        """
+        devices = DeviceManager.get_all_devices()
+
+        if device_id not in devices or sensor_type not in devices[device_id]["sensors"]:
+            return JSONResponse({"error": "Device or sensor not found"}, status_code=404)
+
+        sensor = devices[device_id]["sensors"][sensor_type]
 
-        return response_data
+        selected_fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
 
-    @app.get("/api/device/{device_id}/data/{sensor_type}")
-    async def get_device_data(device_id: str, sensor_type: str):
+        response = {"device_id": device_id, "sensor_type": sensor_type}
+        response.update(_query_sensor(sensor, time.time(), start=start, end=end, span=span,
+                                      points=points, since=since, since_time=since_time,
+                                      limit=limit, fields=selected_fields))
+        return response
+
+    @app.get("/api/device/{device_id}/spectrum/{sensor_type}")
+    async def get_device_spectrum(device_id: str, sensor_type: str, method: str = "welch",
+                                  fields: Optional[str] = None):
         """
-        API route to get data from specific sensor.
+        API route to get the current spectrum of a sensor.
+
+        The first request starts a SpectrumAnalyzer following the sensor;
+        later requests and spectrum WebSocket clients share its cached
+        result, refreshed once per hop of new samples.
 
         Args:
             device_id (str): Device identifier
             sensor_type (str): Sensor type
+            method (str): "welch" for the power spectral density, "fft" for the amplitude
+                spectrum of the latest segment
+            fields (str, optional): Comma-separated channels to include, e.g. "x,z"
 
         Returns:
-            dict: Sensor data with metadata
+            dict: Frequencies, per channel spectra and peaks, and the analysis parameters
         """
         devices = DeviceManager.get_all_devices()
 
         if device_id not in devices or sensor_type not in devices[device_id]["sensors"]:
             return JSONResponse({"error": "Device or sensor not found"}, status_code=404)
+        if method not in SPECTRUM_METHODS:
+            return JSONResponse({"error": f"method must be one of {', '.join(SPECTRUM_METHODS)}"},
+                                status_code=400)
 
         sensor = devices[device_id]["sensors"][sensor_type]
-        data = sensor.get_data()
+        selected_fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
 
-        current_time = time.time()
-        last_update_time = None
-        time_since_update = None
+        analyzer = SpectrumAnalyzer.get(device_id, sensor_type, sensor)
+        response = {"device_id": device_id, "sensor_type": sensor_type}
+        response.update(analyzer.result(method, selected_fields))
+        return response
+
+    @app.get("/api/device/{device_id}/triggers")
+    async def get_device_triggers(device_id: str, since: int = 0, limit: Optional[int] = None):
+        """
+        API route to get the trigger events fired by a device's sensors.
+
+        Events are numbered per device; passing back the returned cursor
+        as since returns only newer events.
+
+        Args:
+            device_id (str): Device identifier
+            since (int): Sequence number of the last event already received
+            limit (int, optional): Maximum number of events returned
+
+        Returns:
+            dict: Events oldest first, next cursor, and the triggers configured per sensor
+        """
+        devices = DeviceManager.get_all_devices()
 
-        if data.get("time") and len(data["time"]) > 0:
-            last_relative_time = data["time"][-1]
-            sensor_start_time = getattr(sensor, 'start_time', current_time)
-            last_update_time = sensor_start_time + last_relative_time
-            time_since_update = current_time - last_update_time
+        if device_id not in devices:
+            return JSONResponse({"error": "Device not found"}, status_code=404)
 
+        events, cursor = TriggerLog.since(device_id, since, limit)
         return {
             "device_id": device_id,
-            "sensor_type": sensor_type,
-            "data_points": len(data.get("time", [])),
-            "data": data,
-            "metadata": {
-                "last_update_time": last_update_time,
-                "time_since_update": time_since_update,
-                "sensor_start_time": getattr(sensor, 'start_time', None),
-                "is_recent": time_since_update < 5.0 if time_since_update else False,
-                "current_server_time": current_time
-            }
+            "events": events,
+            "cursor": cursor,
+            "triggers": {sensor_type: sensor.triggers.describe()
+                         for sensor_type, sensor in devices[device_id]["sensors"].items() if sensor.triggers},
         }
 
+    @app.post("/api/device/{device_id}/capture")
+    async def start_device_capture(device_id: str, pre: Optional[float] = None, post: Optional[float] = None,
+                                   reason: Optional[str] = None):
+        """
+        API route to start a triggered recording of a device, or extend the running one.
+
+        Only available with RECORDING_MODE=triggered. With several web
+        workers the request is forwarded to the ingest process and
+        answered with 202.
+
+        Args:
+            device_id (str): Device identifier
+            pre (float, optional): Seconds before now to include, at most RECORDING_PRE_TRIGGER
+            post (float, optional): Seconds after now to record, defaults to RECORDING_POST_TRIGGER,
+                at most RECORDING_MAX_POST_TRIGGER
+            reason (str, optional): Free text stored with the capture
+
+        Returns:
+            dict: The capture with its window, files and rows written so far
+        """
+        if device_id not in DeviceManager.get_all_devices():
+            return JSONResponse({"error": "Device not found"}, status_code=404)
+        if not valid_window(pre) or not valid_window(post):
+            return JSONResponse({"error": "pre and post must be finite and not negative"}, status_code=400)
+
+        capture = Capture.request(device_id, "api", reason, pre, post)
+        if capture is None:
+            return JSONResponse({"error": "Device is not recording in triggered mode"}, status_code=409)
+        if capture.get("forwarded"):
+            return JSONResponse(capture, status_code=202)
+        return {"device_id": device_id, "capture": capture}
+
+    @app.get("/api/device/{device_id}/captures")
+    async def get_device_captures(device_id: str):
+        """
+        API route to get the recording mode and captures of a device.
+
+        Args:
+            device_id (str): Device identifier
+
+        Returns:
+            dict: Recording mode, buffer lengths, active capture and the latest finished captures
+        """
+        if device_id not in DeviceManager.get_all_devices():
+            return JSONResponse({"error": "Device not found"}, status_code=404)
+
+        response = {"device_id": device_id}
+        response.update(Capture.states.get(device_id, {"mode": "continuous"}))
+        return response
+
+    @app.post("/api/query")
+    async def batch_query(request: Request):
+        """
+        Batch API to read several device/sensor selections in one request.
+
+        The body is {"queries": [selector, ...], "include_info": bool}, where
+        each selector has device_id and sensor_type ("*" or omitted for all)
+        plus the same range/cursor options as the data route (start, end,
+        span, points, since, since_time, limit, fields). All results are
+        computed without yielding to the event loop, so they come from one
+        consistent snapshot and share the same server timestamp.
+
+        Args:
+            request (Request): FastAPI request object
+
+        Returns:
+            dict: One result per matched sensor, plus device summaries if requested
+        """
+        try:
+            body = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return JSONResponse({"error": "Invalid JSON body"}, status_code=400)
+
+        queries = body.get("queries") if isinstance(body, dict) else None
+        if not isinstance(queries, list) or not queries:
+            return JSONResponse({"error": "Body must contain a non-empty 'queries' list"}, status_code=400)
+        if len(queries) > MAX_BATCH_QUERIES:
+            return JSONResponse({"error": f"At most {MAX_BATCH_QUERIES} queries per request"}, status_code=400)
+
+        devices = DeviceManager.get_all_devices()
+        current_time = time.time()
+        results = []
+
+        for selector in queries:
+            if not isinstance(selector, dict):
+                results.append({"error": "Selector must be an object", "selector": selector})
+                continue
+
+            device_id = selector.get("device_id", "*")
+            sensor_type = selector.get("sensor_type", "*")
+            if not isinstance(device_id, str) or not isinstance(sensor_type, str):
+                results.append({"error": "device_id and sensor_type must be strings", "selector": selector})
+                continue
+            device_ids = list(devices) if device_id == "*" else [device_id]
+
+            try:
+                options = {key: _coerce_option(key, selector.get(key)) for key in QUERY_OPTIONS}
+            except (TypeError, ValueError) as e:
+                results.append({"error": f"Invalid selector option: {e}", "selector": selector})
+                continue
+
+            matched = False
+            for selected_device in device_ids:
+                sensors = devices.get(selected_device, {}).get("sensors", {})
+                sensor_types = list(sensors) if sensor_type == "*" else [sensor_type]
+                for selected_sensor in sensor_types:
+                    if selected_sensor not in sensors:
+                        continue
+                    matched = True
+                    result = {"device_id": selected_device, "sensor_type": selected_sensor}
+                    result.update(_query_sensor(sensors[selected_sensor], current_time, **options))
+                    results.append(result)
+
+            if not matched:
+                results.append({"error": "Device or sensor not found", "selector": selector})
+
+        response = {"timestamp": current_time, "results": results}
+
+        if body.get("include_info"):
+            selected_devices = {r["device_id"] for r in results if "device_id" in r}
+            response["devices"] = {
+                device_id: DeviceManager.get_device_summary(device_id)
+                for device_id in selected_devices
+            }
+
+        return response
+
+    @app.get("/api/latency")
+    async def get_latency(device_id: Optional[str] = None):
+        """
+        Get sample latency percentiles per pipeline stage, overall and per device.
+
+        Args:
+            device_id (str, optional): Restrict the report to one device
+
+        Returns:
+            JSONResponse: p50/p95/p99 latencies in milliseconds
+        """
+        return JSONResponse(LatencyTracker.report(device_id))
+
+    @app.get("/health")
+    async def health():
+        """
+        Report the health of connections, fan-out, event loop, executor, ingest and recording.
+
+        Returns:
+            JSONResponse: Overall and per-check status, with HTTP 503 when unhealthy
+        """
+        report = HealthMonitor.report()
+        return JSONResponse(report, status_code=503 if report["status"] == "unhealthy" else 200)
+
+    @app.get("/metrics")
+    async def metrics():
+        """
+        Expose server metrics in Prometheus text format.
+
+        Returns:
+            Response: Metrics exposition text
+        """
+        return Response(Metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    @app.get("/admin/profile")
+    async def profile_status(request: Request):
+        """
+        Get the profiler state and the coroutine timings of the running profile.
+
+        Args:
+            request (Request): FastAPI request object
+
+        Returns:
+            JSONResponse: Profiler status
+        """
+        if not _admin_authorized(request):
+            return JSONResponse({"error": "Forbidden"}, status_code=403)
+        return JSONResponse(Profiler.status())
+
+    @app.post("/admin/profile/start")
+    async def start_profile(request: Request, mode: str = "sampling", duration: Optional[float] = None,
+                            interval: Optional[float] = None):
+        """
+        Start profiling the server's event loop.
+
+        Args:
+            request (Request): FastAPI request object
+            mode (str): "sampling" (collapsed stacks) or "cprofile" (pstats)
+            duration (float, optional): Stop automatically after this many seconds
+            interval (float, optional): Sampling interval in seconds
+
+        Returns:
+            JSONResponse: Profiler status, 409 if a profile is already running
+        """
+        if not _admin_authorized(request):
+            return JSONResponse({"error": "Forbidden"}, status_code=403)
+        if interval is not None and interval <= 0:
+            return JSONResponse({"error": "interval must be positive"}, status_code=400)
+        try:
+            Profiler.start(mode, duration, interval)
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        except RuntimeError as e:
+            return JSONResponse({"error": str(e)}, status_code=409)
+        return JSONResponse(Profiler.status())
+
+    @app.post("/admin/profile/stop")
+    async def stop_profile(request: Request):
+        """
+        Stop the running profile and return its dump.
+
+        Args:
+            request (Request): FastAPI request object
+
+        Returns:
+            Response: Collapsed stacks or pstats text, 409 if no profile was running
+        """
+        if not _admin_authorized(request):
+            return JSONResponse({"error": "Forbidden"}, status_code=403)
+        result = Profiler.stop()
+        if result is None:
+            return JSONResponse({"error": "No profile is running"}, status_code=409)
+        return Response(result["output"], media_type="text/plain; charset=utf-8")
+
+    @app.get("/admin/profile/result")
+    async def profile_result(request: Request):
+        """
+        Get the last finished profile, including its coroutine timings.
+
+        Args:
+            request (Request): FastAPI request object
+
+        Returns:
+            JSONResponse: Last profile result, 404 if none finished yet
+        """
+        if not _admin_authorized(request):
+            return JSONResponse({"error": "Forbidden"}, status_code=403)
+        if Profiler.last_result is None:
+            return JSONResponse({"error": "No profile has finished yet"}, status_code=404)
+        return JSONResponse(Profiler.last_result)
+
     @app.websocket("/ws/device/{device_id}/sensor/{sensor_type}")
     async def websocket_endpoint(websocket: WebSocket, device_id: str, sensor_type: str):
         """
@@ -238,18 +786,113 @@ def register_routes(app, templates, websocket_manager):
             sensor_type (str): Sensor type
         """
         Logger.log_message(f"WebSocket connection: {device_id}_{sensor_type}")
-        await websocket_manager.connect(websocket, device_id, sensor_type)
+
+        # Optional overview history, e.g. ?history_points=2000&history_span=3600
+        history_points = None
+        history_span = None
+        try:
+            if websocket.query_params.get("history_points"):
+                history_points = min(int(websocket.query_params["history_points"]), MAX_OVERVIEW_POINTS)
+            if websocket.query_params.get("history_span"):
+                history_span = float(websocket.query_params["history_span"])
+        except ValueError:
+            Logger.log_warning(f"Invalid history parameters for {device_id}_{sensor_type}")
+
+        await websocket_manager.connect(websocket, device_id, sensor_type,
+                                        history_points=history_points, history_span=history_span)
 
         try:
             while True:
                 message = await websocket.receive_text()
-                Logger.log_message(f"WebSocket message received: {message}")
+                Logger.log_debug(f"WebSocket message received: {message}", key=f"ws_message_{device_id}_{sensor_type}")
                 if message == "ping":
                     await websocket.send_text("pong")
+                elif message.startswith("{"):
+                    # Browser acknowledgment of a rendered update: {"type": "ack", "received_at": ...}
+                    try:
+                        cmd = json.loads(message)
+                        if cmd.get("type") == "ack" and isinstance(cmd.get("received_at"), (int, float)):
+                            LatencyTracker.record_since_received("browser", device_id, cmd["received_at"])
+                    except json.JSONDecodeError:
+                        pass
         except WebSocketDisconnect:
             Logger.log_message(f"WebSocket disconnected: {device_id}_{sensor_type}")
             websocket_manager.disconnect(websocket, device_id, sensor_type)
 
+    @app.websocket("/ws/device/{device_id}/spectrum/{sensor_type}")
+    async def spectrum_websocket(websocket: WebSocket, device_id: str, sensor_type: str):
+        """
+        WebSocket streaming the spectrum of a sensor, one message per hop.
+
+        Accepts the method and fields query parameters of the spectrum API,
+        e.g. ?method=fft&fields=x,z.
+
+        Args:
+            websocket (WebSocket): WebSocket connection
+            device_id (str): Device identifier
+            sensor_type (str): Sensor type
+        """
+        method = websocket.query_params.get("method", "welch")
+        if method not in SPECTRUM_METHODS:
+            await websocket.close(code=1008)
+            return
+        fields = websocket.query_params.get("fields")
+        selected_fields = tuple(f.strip() for f in fields.split(",") if f.strip()) if fields else None
+
+        await websocket_manager.connect_spectrum(websocket, device_id, sensor_type, method, selected_fields)
+
+        try:
+            while True:
+                message = await websocket.receive_text()
+                if message == "ping":
+                    await websocket.send_text("pong")
+        except WebSocketDisconnect:
+            websocket_manager.disconnect_spectrum(websocket, device_id, sensor_type, method, selected_fields)
+
+    @app.websocket("/ws/device/{device_id}/status")
+    async def device_status_websocket(websocket: WebSocket, device_id: str):
+        """
+        WebSocket pushing sensor liveness transitions, trigger and capture events of a device.
+
+        Sends a snapshot of every sensor status on connect, then one
+        sensor_status message per transition (active, stale, inactive),
+        one trigger message per fired trigger and one capture message per
+        capture start, extension and end. Clients start a capture by
+        sending {"type": "capture", "pre": ..., "post": ..., "reason": ...},
+        answered with a capture_requested message.
+
+        Args:
+            websocket (WebSocket): WebSocket connection
+            device_id (str): Device identifier
+        """
+        await websocket_manager.connect_status(websocket, device_id)
+
+        try:
+            while True:
+                message = await websocket.receive_text()
+                if message == "ping":
+                    await websocket.send_text("pong")
+                elif message.startswith("{"):
+                    try:
+                        cmd = json.loads(message)
+                    except json.JSONDecodeError:
+                        continue
+                    if cmd.get("type") == "capture":
+                        pre, post = cmd.get("pre"), cmd.get("post")
+                        capture = Capture.request(
+                            device_id, "websocket", cmd.get("reason"),
+                            pre if valid_window(pre) else None,
+                            post if valid_window(post) else None
+                        )
+                        await websocket.send_text(json.dumps({
+                            "type": "capture_requested",
+                            "device_id": device_id,
+                            "accepted": capture is not None,
+                            "capture": capture
+                        }))
+        except WebSocketDisconnect:
+            websocket_manager.disconnect_status(websocket, device_id)
+
     @app.websocket("/ws/devices")
     async def device_list_websocket(websocket: WebSocket):
         """
@@ -264,7 +907,7 @@ def register_routes(app, templates, websocket_manager):
         try:
             while True:
                 message = await websocket.receive_text()
-                Logger.log_message(f"Device list WebSocket message received: {message}")
+                Logger.log_debug(f"Device list WebSocket message received: {message}", key="ws_message_device_list")
 
                 if message == "ping":
                     await websocket.send_text("pong")
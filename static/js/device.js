@@ -13,7 +13,10 @@ let currentScreen = 'selection';
 let currentSensor = null;
 let currentGraph = null;
 let sensorStates = {};
-let monitoringGraphs = {};
+let statusSocket = null;
+let statusConnected = false;
+let statusReconnectAttempts = 0;
+let statusReconnectTimer = null;
 
 const sensorConfigs = {
     accelerometer: {
@@ -40,88 +43,100 @@ const sensorConfigs = {
 };
 
 function initializeApp() {
-    console.log('App initialized: generic class + active data');
+    console.log('App initialized: server-pushed sensor status');
 
     availableSensors.forEach(sensor => {
         sensorStates[sensor] = {
-            hasData: false,
+            status: 'no_data',
             dataPoints: 0,
-            isActive: false,
-            lastDataTime: 0
+            isActive: false
         };
     });
 
     setupEventListeners();
-    createMonitoringGraphs();
-    startActiveCheck();
+    connectStatusSocket();
     updateOverallStatus();
 }
 
 /**
- * Creates hidden SensorGraph instances for monitoring each sensor
+ * Opens the status WebSocket: the server sends a snapshot on connect and
+ * then one message per sensor liveness transition, so no polling is needed.
  */
-function createMonitoringGraphs() {
-    availableSensors.forEach(sensorType => {
-        const tempContainer = document.createElement('div');
-        tempContainer.id = `monitoring-${sensorType}`;
-        tempContainer.style.display = 'none';
-        document.body.appendChild(tempContainer);
-
-        monitoringGraphs[sensorType] = new SensorGraph({
-            deviceId: device_id,
-            sensorType: sensorType,
-            containerId: `monitoring-${sensorType}`,
-            mode: 'monitoring',
-            ...sensorConfigs[sensorType]
-        });
+function connectStatusSocket() {
+    if (statusSocket && statusSocket.readyState <= WebSocket.OPEN) return;
+
+    const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    const wsUrl = `${wsProtocol}//${window.location.host}/ws/device/${device_id}/status`;
 
-        const originalUpdateData = monitoringGraphs[sensorType].updateData;
-        monitoringGraphs[sensorType].updateData = function(data) {
-            handleMonitoringData(sensorType, data);
-            originalUpdateData.call(this, data);
+    try {
+        statusSocket = new WebSocket(wsUrl);
+
+        statusSocket.onopen = () => {
+            console.log('Status WebSocket connected');
+            statusConnected = true;
+            statusReconnectAttempts = 0;
         };
-    });
-}
 
-function handleMonitoringData(sensorType, data) {
-    const dataPoints = data?.time?.length || 0;
-    const now = Date.now();
+        statusSocket.onmessage = (event) => {
+            try {
+                handleStatusMessage(JSON.parse(event.data));
+            } catch (error) {
+                console.error('Error processing status message:', error);
+            }
+        };
 
-    sensorStates[sensorType].dataPoints = dataPoints;
-    sensorStates[sensorType].hasData = dataPoints > 0;
-    sensorStates[sensorType].lastDataTime = now;
-    sensorStates[sensorType].isActive = dataPoints > 0;
+        statusSocket.onerror = (error) => {
+            console.error('Status WebSocket error:', error);
+        };
 
-    updateSensorCard(sensorType);
-    updateOverallStatus();
-}
+        statusSocket.onclose = (event) => {
+            console.log(`Status WebSocket disconnected (${event.code})`);
+            statusConnected = false;
+            availableSensors.forEach(updateSensorCard);
+            updateOverallStatus();
 
-/**
- * Checks if sensor data is recent to determine active status
- */
-function startActiveCheck() {
-    setInterval(() => {
-        const now = Date.now();
-        let anyChanged = false;
-
-        availableSensors.forEach(sensorType => {
-            const state = sensorStates[sensorType];
-            const timeSinceData = now - state.lastDataTime;
-            const wasActive = state.isActive;
-
-            // Inactive if no data for >3s
-            state.isActive = state.hasData && timeSinceData < 3000;
-
-            if (wasActive !== state.isActive) {
-                anyChanged = true;
-                updateSensorCard(sensorType);
+            if (event.code !== 1000 && !statusReconnectTimer) {
+                statusReconnectAttempts++;
+                const delay = Math.min(1000 * Math.pow(2, statusReconnectAttempts - 1), 10000);
+                statusReconnectTimer = setTimeout(() => {
+                    statusReconnectTimer = null;
+                    connectStatusSocket();
+                }, delay);
             }
+        };
+    } catch (error) {
+        console.error('Error creating status WebSocket:', error);
+        statusConnected = false;
+    }
+}
+
+function handleStatusMessage(message) {
+    if (message.type === 'sensor_status_snapshot') {
+        Object.entries(message.sensors || {}).forEach(([sensorType, info]) => {
+            applySensorStatus(sensorType, info.status, info.data_points);
         });
+    } else if (message.type === 'sensor_status') {
+        applySensorStatus(message.sensor_type, message.status, message.data_points);
+    } else if (message.type === 'device_disconnected') {
+        availableSensors.forEach(sensorType => applySensorStatus(sensorType, 'inactive'));
+    } else {
+        return;
+    }
 
-        if (anyChanged) {
-            updateOverallStatus();
-        }
-    }, 1000);
+    updateOverallStatus();
+}
+
+function applySensorStatus(sensorType, status, dataPoints) {
+    const state = sensorStates[sensorType];
+    if (!state) return;
+
+    state.status = status;
+    state.isActive = status === 'active' || status === 'stale';
+    if (dataPoints !== undefined) {
+        state.dataPoints = dataPoints;
+    }
+
+    updateSensorCard(sensorType);
 }
 
 function updateSensorCard(sensorType) {
@@ -132,26 +147,32 @@ function updateSensorCard(sensorType) {
     if (!card || !status || !button) return;
 
     const state = sensorStates[sensorType];
-    const graph = monitoringGraphs[sensorType];
 
-    if (!graph?.isConnected) {
+    if (!statusConnected) {
         card.className = 'sensor-card inactive';
         status.className = 'sensor-status inactive';
         status.textContent = 'Connecting...';
         button.disabled = true;
         button.textContent = 'Connecting...';
 
-    } else if (!state.hasData) {
+    } else if (state.status === 'no_data') {
         card.className = 'sensor-card inactive';
         status.className = 'sensor-status inactive';
         status.textContent = 'No data';
         button.disabled = true;
         button.textContent = 'No Data';
 
-    } else if (state.isActive) {
+    } else if (state.status === 'active') {
         card.className = 'sensor-card active';
         status.className = 'sensor-status active';
-        status.textContent = `Active (${state.dataPoints} points)`;
+        status.textContent = 'Active';
+        button.disabled = false;
+        button.textContent = 'View Graph';
+
+    } else if (state.status === 'stale') {
+        card.className = 'sensor-card active';
+        status.className = 'sensor-status inactive';
+        status.textContent = 'Delayed (no recent data)';
         button.disabled = false;
         button.textContent = 'View Graph';
 
@@ -172,14 +193,14 @@ function updateOverallStatus() {
     if (!statusElement) return;
 
     const activeSensors = availableSensors.filter(sensor => sensorStates[sensor]?.isActive).length;
-    const connectedGraphs = Object.values(monitoringGraphs).filter(g => g?.isConnected).length;
 
     if (activeSensors > 0) {
         statusElement.innerHTML = `<strong>${activeSensors}/${availableSensors.length} active sensors</strong>`;
         if (noSensorsMessage) noSensorsMessage.style.display = 'none';
         if (sensorGrid) sensorGrid.style.display = 'grid';
     } else {
-        statusElement.innerHTML = `<strong>No active sensors (${connectedGraphs} connected)</strong>`;
+        const connection = statusConnected ? 'connected' : 'connecting';
+        statusElement.innerHTML = `<strong>No active sensors (${connection})</strong>`;
         if (noSensorsMessage) noSensorsMessage.style.display = 'block';
     }
 }
@@ -287,17 +308,13 @@ function setupGraphControls() {
 
 function setupEventListeners() {
     window.addEventListener('beforeunload', () => {
-        Object.values(monitoringGraphs).forEach(graph => graph?.disconnect());
+        statusSocket?.close(1000, 'Page closed');
         currentGraph?.disconnect();
     });
 
     document.addEventListener('visibilitychange', () => {
-        if (document.visibilityState === 'visible') {
-            Object.values(monitoringGraphs).forEach(graph => {
-                if (!graph?.isConnected) {
-                    graph?.reconnect();
-                }
-            });
+        if (document.visibilityState === 'visible' && !statusConnected) {
+            connectStatusSocket();
         }
     });
 }
@@ -307,6 +324,5 @@ window.returnToSelection = returnToSelection;
 window.reconnectCurrentGraph = reconnectCurrentGraph;
 
 window.sensorStates = sensorStates;
-window.monitoringGraphs = monitoringGraphs;
 
 document.addEventListener('DOMContentLoaded', initializeApp);
\ No newline at end of file
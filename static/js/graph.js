@@ -13,6 +13,10 @@ class SensorGraph {
         this.websocket = null;
         this.isConnected = false;
 
+        // Latency tracing: acknowledge rendered updates when the page is opened with ?trace=1
+        this.traceAck = new URLSearchParams(window.location.search).get('trace') === '1';
+        this.lastAckTime = 0;
+
         this.graphData = { time: [], x: [], y: [], z: [] };
 
         this.layout = {
@@ -105,6 +109,9 @@ class SensorGraph {
                     if (message.type === 'historical' || message.type === 'update') {
                         this.updateData(message.data);
                     }
+                    if (message.type === 'update') {
+                        this.acknowledgeUpdate(message.metadata);
+                    }
                 } catch (error) {
                     console.error(`Error processing ${this.mode} data:`, error);
                 }
@@ -126,6 +133,21 @@ class SensorGraph {
         }
     }
 
+    acknowledgeUpdate(metadata) {
+        if (!this.traceAck || !metadata || metadata.received_at == null) return;
+
+        const now = Date.now();
+        if (now - this.lastAckTime < 1000) return;
+        this.lastAckTime = now;
+
+        // Ack after the next frame so the measurement includes rendering
+        requestAnimationFrame(() => {
+            if (this.websocket && this.websocket.readyState === WebSocket.OPEN) {
+                this.websocket.send(JSON.stringify({ type: 'ack', received_at: metadata.received_at }));
+            }
+        });
+    }
+
     updateData(data) {
         if (!data) return;
 
@@ -5,6 +5,7 @@ let reconnectAttempts = 0;
 let maxReconnectAttempts = 10;
 let fallbackPollingInterval = null;
 let currentDevices = new Map();
+let deviceListVersion = null;
 let connectionStats = {
     connected_at: null,
     reconnections: 0,
@@ -67,8 +68,13 @@ function connectWebSocket() {
                 connectionStats.message_count++;
 
                 if (message.type === 'device_list_update') {
+                    currentDevices = new Map(Object.entries(message.devices));
+                    deviceListVersion = message.version ?? null;
                     updateDeviceList(message.devices);
                     updateDebugInfo(`Last update: ${connectionStats.last_message.toLocaleTimeString()}`);
+                } else if (message.type === 'device_list_patch') {
+                    applyDeviceListPatch(message);
+                    updateDebugInfo(`Last update: ${connectionStats.last_message.toLocaleTimeString()}`);
                 }
             } catch (error) {
                 console.error('Error processing message:', error);
@@ -145,6 +151,23 @@ function startFallbackPolling() {
     }, 2000);
 }
 
+function applyDeviceListPatch(patch) {
+    if (deviceListVersion === null || patch.base_version > deviceListVersion) {
+        // A patch was missed: resynchronize with a full snapshot
+        console.log('Device list out of sync, requesting full update');
+        websocket.send(JSON.stringify({ type: 'request_update' }));
+        return;
+    }
+
+    if (patch.version <= deviceListVersion) return;
+
+    patch.removed.forEach(deviceId => currentDevices.delete(deviceId));
+    Object.entries(patch.changed).forEach(([deviceId, device]) => currentDevices.set(deviceId, device));
+    deviceListVersion = patch.version;
+
+    updateDeviceList(Object.fromEntries(currentDevices));
+}
+
 function updateDeviceList(devices) {
     const deviceList = document.getElementById('deviceList');
     const noDevices = document.getElementById('noDevices');
@@ -162,6 +185,7 @@ function updateDeviceList(devices) {
     currentDeviceIds.forEach(deviceId => {
         if (!newDeviceIds.has(deviceId)) {
             const deviceElement = deviceList.querySelector(`[data-device-id="${deviceId}"]`);
+            currentDevices.delete(deviceId);
             if (deviceElement) {
                 console.log(`Removing device: ${deviceId}`);
                 deviceElement.classList.add('removing');
@@ -0,0 +1,331 @@
+"""
+WebSocket fan-out load test against a running server.
+
+Opens many concurrent sensor (/ws/device/{id}/sensor/{type}) and device
+list (/ws/devices) connections, spread over every connected device and
+sensor, and reports delivered message rates, end-to-end lag (server
+receive time to client receive time) and the server's CPU and resident
+memory read from /metrics. A fraction of the sensor clients can read
+slowly, like an overloaded browser tab, to show how they affect the rest.
+
+Start the server with simulated devices, e.g.
+    SIMULATED_DEVICES=3 SIMULATED_SAMPLE_RATE=50 python app.py
+then run
+    python tools/load_test.py --sensor-clients 300 --device-list-clients 30 --slow-fraction 0.1
+
+Lag is computed against the server's wall clock, so run the tool on the
+server host (or a host with a synchronized clock). With WEB_WORKERS > 1
+/metrics reports whichever worker answers the scrape.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import urllib.request
+
+import websockets
+
+PERCENTILES = (50, 95, 99)
+
+
+class LoadStats:
+    """Counters shared by every client, reset after each report."""
+
+    def __init__(self):
+        """Initialize the counters."""
+        self.connected = {"sensor": 0, "slow": 0, "devices": 0}
+        self.messages = {"sensor": 0, "slow": 0, "devices": 0}
+        self.total_messages = {"sensor": 0, "slow": 0, "devices": 0}
+        self.lags = {"sensor": [], "slow": []}
+        self.all_lags = {"sensor": [], "slow": []}
+        self.errors = 0
+        self.disconnects = 0
+
+    def record(self, kind, lag=None):
+        """
+        Count one received update.
+
+        Args:
+            kind (str): "sensor", "slow" or "devices"
+            lag (float, optional): Seconds from server receive to client receive
+        """
+        self.messages[kind] += 1
+        self.total_messages[kind] += 1
+        if lag is not None:
+            self.lags[kind].append(lag)
+            self.all_lags[kind].append(lag)
+
+    def take_interval(self):
+        """
+        Take and reset the counters of the current report interval.
+
+        Returns:
+            tuple: (messages per kind, lags per kind)
+        """
+        messages, lags = self.messages, self.lags
+        self.messages = {kind: 0 for kind in messages}
+        self.lags = {kind: [] for kind in lags}
+        return messages, lags
+
+
+def summarize(lags):
+    """
+    Compute lag percentiles.
+
+    Args:
+        lags (list): Lags in seconds
+
+    Returns:
+        dict: Percentiles and maximum in milliseconds, empty without samples
+    """
+    if not lags:
+        return {}
+    ordered = sorted(lags)
+    summary = {}
+    for percentile in PERCENTILES:
+        index = min(len(ordered) - 1, max(0, round(percentile / 100 * len(ordered)) - 1))
+        summary[f"p{percentile}_ms"] = round(ordered[index] * 1000, 1)
+    summary["max_ms"] = round(ordered[-1] * 1000, 1)
+    summary["mean_ms"] = round(statistics.fmean(ordered) * 1000, 1)
+    return summary
+
+
+def http_get(url, timeout=5):
+    """
+    Fetch a URL.
+
+    Args:
+        url (str): URL
+        timeout (float): Seconds before giving up
+
+    Returns:
+        bytes: Response body
+    """
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read()
+
+
+def scrape_process(base_url):
+    """
+    Read the server's CPU time and resident memory from /metrics.
+
+    Args:
+        base_url (str): Server base URL
+
+    Returns:
+        tuple: (CPU seconds, resident bytes), None for metrics that are missing
+    """
+    cpu = rss = None
+    for line in http_get(f"{base_url}/metrics").decode().splitlines():
+        if line.startswith("pub_process_cpu_seconds_total "):
+            cpu = float(line.split()[1])
+        elif line.startswith("pub_process_resident_memory_bytes "):
+            rss = float(line.split()[1])
+    return cpu, rss
+
+
+async def wait_for_targets(base_url, timeout):
+    """
+    Wait until the server reports connected devices and list their sensors.
+
+    Args:
+        base_url (str): Server base URL
+        timeout (float): Seconds to wait for a device
+
+    Returns:
+        list: (device_id, sensor_type) pairs
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        devices = json.loads(await asyncio.to_thread(http_get, f"{base_url}/api/devices"))
+        targets = [(device_id, sensor_type)
+                   for device_id, device in sorted(devices.items())
+                   for sensor_type in sorted(device.get("sensors", {}))]
+        if targets:
+            return targets
+        if time.monotonic() > deadline:
+            raise SystemExit("No devices connected; start the server with SIMULATED_DEVICES or connect a phone")
+        await asyncio.sleep(1)
+
+
+async def sensor_client(ws_url, stats, kind, slow_delay):
+    """
+    Receive sensor updates until cancelled.
+
+    Args:
+        ws_url (str): Sensor WebSocket URL
+        stats (LoadStats): Shared counters
+        kind (str): "sensor" or "slow"
+        slow_delay (float): Seconds to stall after every message for slow clients
+    """
+    try:
+        async with websockets.connect(ws_url, max_size=None, open_timeout=30) as ws:
+            stats.connected[kind] += 1
+            try:
+                async for raw in ws:
+                    message = json.loads(raw)
+                    if message.get("type") != "update":
+                        continue
+                    metadata = message.get("metadata", {})
+                    sent_at = metadata.get("received_at") or metadata.get("timestamp")
+                    stats.record(kind, time.time() - sent_at if sent_at else None)
+                    if kind == "slow":
+                        await asyncio.sleep(slow_delay)
+            finally:
+                stats.connected[kind] -= 1
+        stats.disconnects += 1
+    except websockets.ConnectionClosed:
+        stats.disconnects += 1
+    except (OSError, asyncio.TimeoutError, websockets.InvalidHandshake):
+        stats.errors += 1
+
+
+async def device_list_client(ws_url, stats):
+    """
+    Receive device list updates until cancelled.
+
+    Args:
+        ws_url (str): Device list WebSocket URL
+        stats (LoadStats): Shared counters
+    """
+    try:
+        async with websockets.connect(ws_url, max_size=None, open_timeout=30) as ws:
+            stats.connected["devices"] += 1
+            try:
+                async for _ in ws:
+                    stats.record("devices")
+            finally:
+                stats.connected["devices"] -= 1
+        stats.disconnects += 1
+    except websockets.ConnectionClosed:
+        stats.disconnects += 1
+    except (OSError, asyncio.TimeoutError, websockets.InvalidHandshake):
+        stats.errors += 1
+
+
+async def report(base_url, stats, interval, samples):
+    """
+    Print one line of rates, lags and server usage per interval until cancelled.
+
+    Args:
+        base_url (str): Server base URL
+        stats (LoadStats): Shared counters
+        interval (float): Seconds between reports
+        samples (list): Receives one dict per report
+    """
+    last_time = time.monotonic()
+    last_cpu, _ = await asyncio.to_thread(scrape_process, base_url)
+    while True:
+        await asyncio.sleep(interval)
+        now = time.monotonic()
+        elapsed = now - last_time
+        messages, lags = stats.take_interval()
+        try:
+            cpu, rss = await asyncio.to_thread(scrape_process, base_url)
+        except OSError:
+            cpu = rss = None
+        cpu_percent = (cpu - last_cpu) / elapsed * 100 if cpu is not None and last_cpu is not None else None
+        last_time, last_cpu = now, cpu
+
+        sample = {
+            "time": time.time(),
+            "connected": dict(stats.connected),
+            "rates": {kind: round(count / elapsed, 1) for kind, count in messages.items()},
+            "lag": {kind: summarize(values) for kind, values in lags.items()},
+            "server_cpu_percent": round(cpu_percent, 1) if cpu_percent is not None else None,
+            "server_rss_mb": round(rss / 1e6, 1) if rss is not None else None,
+            "errors": stats.errors,
+            "disconnects": stats.disconnects,
+        }
+        samples.append(sample)
+        fast_lag = sample["lag"]["sensor"]
+        slow_lag = sample["lag"]["slow"]
+        print(f"clients {sum(stats.connected.values()):>4} | "
+              f"msg/s sensor {sample['rates']['sensor']:>8} slow {sample['rates']['slow']:>7} "
+              f"devices {sample['rates']['devices']:>6} | "
+              f"lag p50/p95/max {fast_lag.get('p50_ms', '-')}/{fast_lag.get('p95_ms', '-')}/"
+              f"{fast_lag.get('max_ms', '-')} ms (slow p95 {slow_lag.get('p95_ms', '-')} ms) | "
+              f"cpu {sample['server_cpu_percent']}% rss {sample['server_rss_mb']} MB | "
+              f"errors {stats.errors} disconnects {stats.disconnects}", flush=True)
+
+
+async def run(args):
+    """
+    Open the clients, report while the test runs and print the summary.
+
+    Args:
+        args (argparse.Namespace): Parsed arguments
+
+    Returns:
+        dict: Summary of the run
+    """
+    base_url = args.url.rstrip("/")
+    ws_base = base_url.replace("http://", "ws://", 1).replace("https://", "wss://", 1)
+    targets = await wait_for_targets(base_url, args.wait)
+    print(f"Targets: {len(targets)} sensors on {len({device for device, _ in targets})} devices")
+
+    stats = LoadStats()
+    samples = []
+    tasks = [asyncio.create_task(report(base_url, stats, args.report_interval, samples))]
+    slow_count = round(args.sensor_clients * args.slow_fraction)
+    total = args.sensor_clients + args.device_list_clients
+    ramp_delay = args.ramp / total if total else 0
+
+    for index in range(args.sensor_clients):
+        device_id, sensor_type = targets[index % len(targets)]
+        ws_url = f"{ws_base}/ws/device/{device_id}/sensor/{sensor_type}"
+        kind = "slow" if index < slow_count else "sensor"
+        tasks.append(asyncio.create_task(sensor_client(ws_url, stats, kind, args.slow_delay)))
+        await asyncio.sleep(ramp_delay)
+    for _ in range(args.device_list_clients):
+        tasks.append(asyncio.create_task(device_list_client(f"{ws_base}/ws/devices", stats)))
+        await asyncio.sleep(ramp_delay)
+
+    try:
+        await asyncio.sleep(args.duration)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    summary = {
+        "sensor_clients": args.sensor_clients,
+        "slow_clients": slow_count,
+        "device_list_clients": args.device_list_clients,
+        "duration_seconds": args.duration,
+        "messages": dict(stats.total_messages),
+        "lag": {kind: summarize(values) for kind, values in stats.all_lags.items()},
+        "errors": stats.errors,
+        "disconnects": stats.disconnects,
+        "peak_server_cpu_percent": max((s["server_cpu_percent"] or 0 for s in samples), default=None),
+        "peak_server_rss_mb": max((s["server_rss_mb"] or 0 for s in samples), default=None),
+        "intervals": samples,
+    }
+    print(json.dumps({key: value for key, value in summary.items() if key != "intervals"}, indent=2))
+    return summary
+
+
+def main():
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(description="WebSocket fan-out load test")
+    parser.add_argument("--url", default="http://localhost:5000", help="Server base URL")
+    parser.add_argument("--sensor-clients", type=int, default=200, help="Sensor WebSocket clients")
+    parser.add_argument("--device-list-clients", type=int, default=20, help="Device list WebSocket clients")
+    parser.add_argument("--slow-fraction", type=float, default=0.1, help="Fraction of sensor clients reading slowly")
+    parser.add_argument("--slow-delay", type=float, default=0.5, help="Seconds a slow client stalls per message")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to run after the ramp")
+    parser.add_argument("--ramp", type=float, default=10, help="Seconds over which clients connect")
+    parser.add_argument("--report-interval", type=float, default=5, help="Seconds between report lines")
+    parser.add_argument("--wait", type=float, default=30, help="Seconds to wait for a connected device")
+    parser.add_argument("--json", help="Write the summary and per-interval samples to this file")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()